@@ -0,0 +1,101 @@
+"""
+Benchmark: duplicate-image search over stored perceptual hashes
+
+Compares the original full scan (rebuilding two ImageHash objects from hex for every
+stored hash, as hash_service.find_similar_hashes used to do) with the in-memory
+uint64 index (services.hash_index.HammingIndex), which computes every distance in
+one vectorized XOR + popcount.
+
+Usage:
+    python benchmark_hash_index.py
+    python benchmark_hash_index.py --sizes 10000 100000 1000000 --queries 200 --scan-queries 3
+"""
+
+import argparse
+import random
+import time
+
+import imagehash
+
+from services.hash_index import HammingIndex, int_to_hex
+from services.hash_service import HASH_SIMILARITY_THRESHOLD
+
+
+def perturb(hash_int: int, flips: int, rng: random.Random) -> int:
+    """Flip `flips` random bits of a hash."""
+    for position in rng.sample(range(64), flips):
+        hash_int ^= 1 << position
+    return hash_int
+
+
+def make_queries(stored, count, rng):
+    """Half near-duplicates of stored hashes, half random hashes."""
+    queries = []
+    for i in range(count):
+        if i % 2 == 0:
+            queries.append(perturb(rng.choice(stored), rng.randint(0, HASH_SIMILARITY_THRESHOLD), rng))
+        else:
+            queries.append(rng.getrandbits(64))
+    return queries
+
+
+def full_scan(query_hex, documents, threshold):
+    """The original algorithm: compare against every stored document."""
+    return [
+        doc["issue_id"]
+        for doc in documents
+        if imagehash.hex_to_hash(query_hex) - imagehash.hex_to_hash(doc["image_hash"]) <= threshold
+    ]
+
+
+def run(size, queries, scan_queries, threshold, rng):
+    stored = [rng.getrandbits(64) for _ in range(size)]
+    documents = [
+        {"issue_id": f"GG-{i}", "image_hash": int_to_hex(h)}
+        for i, h in enumerate(stored)
+    ]
+
+    start = time.perf_counter()
+    index = HammingIndex()
+    index.add_many([(doc["issue_id"], hash_int, None) for doc, hash_int in zip(documents, stored)])
+    build_s = time.perf_counter() - start
+
+    query_hashes = make_queries(stored, queries, rng)
+
+    start = time.perf_counter()
+    index_results = [index.search(q, threshold) for q in query_hashes]
+    index_ms = (time.perf_counter() - start) * 1000 / len(query_hashes)
+
+    scan_sample = query_hashes[:scan_queries]
+    start = time.perf_counter()
+    scan_results = [full_scan(int_to_hex(q), documents, threshold) for q in scan_sample]
+    scan_ms = (time.perf_counter() - start) * 1000 / len(scan_sample)
+
+    # Both approaches must return the same matches
+    for index_matches, scan_matches in zip(index_results, scan_results):
+        assert sorted(key for key, _, _ in index_matches) == sorted(scan_matches)
+
+    print(
+        f"{size:>9,} hashes | build {build_s:6.2f}s | array {index.nbytes / 2**20:6.1f} MiB | "
+        f"full scan {scan_ms:10.2f} ms/query | index {index_ms:8.3f} ms/query | "
+        f"speedup {scan_ms / index_ms:9.0f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200, help="queries timed against the index")
+    parser.add_argument("--scan-queries", type=int, default=3, help="queries timed against the full scan")
+    parser.add_argument("--threshold", type=int, default=HASH_SIMILARITY_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"Hamming radius {args.threshold}, 64-bit pHashes\n")
+    for size in args.sizes:
+        run(size, args.queries, args.scan_queries, args.threshold, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Query, Request, Form
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Query, Request, Form, Response
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Optional, Dict
@@ -29,7 +30,11 @@ from models import (
 )
 
 # Import image validation services (AFTER load_dotenv)
-from services import sightengine_service, exif_service, hash_service, decision_engine, vision_service, officer_routing
+from services import sightengine_service, exif_service, hash_service, decision_engine, vision_service, officer_routing, validation_pipeline, http_client, forensics_pool, result_cache, geocode_cache, ward_geocoder, verification_counters, stats_snapshot, supervisor_dashboard, db_indexes, directory_cache, complaint_rerouting, conversation_store, llm_router
+from services.image_context import ImageContext
+from utils.upload_stream import read_upload, UploadRejected, RequestSizeLimitMiddleware
+from utils.pagination import KeysetPage, PaginationError, projection
+from pymongo import ASCENDING, DESCENDING
 
 # Debug: Print environment variables
 print("\n" + "="*60)
@@ -59,8 +64,61 @@ if not mongo_url:
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ.get('DB_NAME', 'grievance_genie')]
 
-# In-memory conversation storage
-conversations: Dict[str, List[dict]] = {}
+async def _prepare_database():
+    """Startup steps needing MongoDB: indexes, caches and migrations"""
+    # Indexes backing the endpoint queries, checked against their query plans
+    ready_indexes = await db_indexes.ensure_indexes(db)
+    print(f"🗂️  Indexes ready: {ready_indexes}/{sum(len(specs) for specs in db_indexes.INDEXES.values())}")
+    for entry in await db_indexes.explain_report(db):
+        if entry["collscan"]:
+            print(f"⚠️  COLLSCAN: {entry['name']} ({entry['collection']})")
+    
+    # Officer and supervisor directory for routing and escalation
+    try:
+        directory = await directory_cache.load(db)
+        print(f"📇 Directory ready: {len(directory.officers_by_id)} officer(s), {len(directory.supervisors_by_id)} supervisor(s)")
+    except Exception as e:
+        print(f"⚠️  Directory not loaded, will retry on first lookup: {str(e)}")
+    
+    # Routing table checked against the officer directory
+    if await officer_routing.reload_validated():
+        unknown_officers = officer_routing.ROUTING_TABLE.unknown_officers
+        print(f"🧭 Routing table ready: {len(officer_routing.ROUTING_TABLE.routes)} ward/department route(s)")
+        if unknown_officers:
+            print(f"⚠️  Routing config names {len(unknown_officers)} unknown officer(s): {', '.join(sorted(unknown_officers))}")
+    
+    # In-process index of resolved image hashes for duplicate detection
+    # (backfill int64 hashes on documents stored as hex only, then load them)
+    await hash_service.migrate_hex_hashes()
+    indexed_hashes = await hash_service.build_index()
+    print(f"🔎 Hash index ready: {indexed_hashes} resolved image hash(es)")
+    
+    # MongoDB tiers of the validation result cache, chat histories and geocoding cache
+    await result_cache.create_indexes()
+    await conversation_store.create_indexes()
+    await geocode_cache.create_indexes()
+    
+    # Verification counters on issue documents: repair drift now (and periodically, below)
+    reconciled_issues = await verification_counters.reconcile()
+    print(f"🗳️  Verification counters reconciled: {reconciled_issues} issue(s) corrected")
+    
+    # Escalated complaint dates as BSON dates for the supervisor dashboard counters
+    normalized_complaints = await supervisor_dashboard.normalize_complaint_dates()
+    if normalized_complaints:
+        print(f"📅 Normalized dates of {normalized_complaints} escalated complaint(s)")
+
+
+async def _prepare_database_when_available(interval: float = 30):
+    """Run the MongoDB startup steps once the database becomes reachable"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await client.admin.command('ping')
+        except Exception:
+            continue
+        print("✅ MongoDB reachable - finishing deferred startup steps")
+        await _prepare_database()
+        return
 
 # Create the FastAPI app with lifespan event handler
 @asynccontextmanager
@@ -70,6 +128,7 @@ async def lifespan(app: FastAPI):
     print("🚀 Starting GrievanceGenie Backend")
     print("="*60)
     
+    mongo_ready = False
     try:
         # Test MongoDB connection
         print(f"\n📡 Connecting to MongoDB...")
@@ -78,6 +137,7 @@ async def lifespan(app: FastAPI):
         
         # Ping the database
         await client.admin.command('ping')
+        mongo_ready = True
         
         # Get server info
         server_info = await client.server_info()
@@ -113,11 +173,64 @@ async def lifespan(app: FastAPI):
         print(f"   3. For Atlas: Check network access settings")
         print("="*60 + "\n")
     
+    # Startup steps needing MongoDB; each would wait out the server selection
+    # timeout if it is down, so they are deferred until it is reachable
+    if mongo_ready:
+        await _prepare_database()
+        database_startup_task = None
+    else:
+        print("⏳ MongoDB unavailable - indexes, migrations and cache collections deferred until it is reachable")
+        database_startup_task = asyncio.create_task(_prepare_database_when_available())
+    
+    # Shared pooled HTTP session for outbound API calls (Sightengine, Nominatim)
+    await http_client.start_session()
+    
+    # Gemini chat model handles, created once and routed by health
+    chat_models = llm_router.start_pool()
+    print(f"💬 Chat model pool ready: {chat_models} model(s)")
+    
+    # Background upkeep: directory and routing config watchers, re-routing of
+    # unassigned complaints, hash index sync, chat history writer, geocode
+    # refresher, verification counter reconciler and the stats snapshot
+    directory_watch_task = asyncio.create_task(directory_cache.run_watcher())
+    routing_watch_task = asyncio.create_task(officer_routing.run_config_watcher())
+    rerouting_task = asyncio.create_task(complaint_rerouting.run_rerouter())
+    hash_index_sync_task = asyncio.create_task(hash_service.run_index_sync())
+    conversation_writer_task = asyncio.create_task(conversation_store.run_writer())
+    geocode_refresh_task = asyncio.create_task(geocode_cache.run_refresher(exif_service.fetch_address))
+    verification_reconcile_task = asyncio.create_task(verification_counters.run_reconciler())
+    
+    # Materialized dashboard stats, recomputed periodically and after issue writes
+    stats_snapshot_task = asyncio.create_task(stats_snapshot.run_refresher())
+    
+    # Worker processes for CPU-heavy image forensics
+    forensics_workers = await forensics_pool.start_pool()
+    print(f"🧮 Forensics pool ready: {forensics_workers} worker process(es)")
+    
     yield
     
-    # Shutdown: close the database client
+    if database_startup_task is not None:
+        database_startup_task.cancel()
+    hash_index_sync_task.cancel()
+    geocode_refresh_task.cancel()
+    verification_reconcile_task.cancel()
+    stats_snapshot_task.cancel()
+    directory_watch_task.cancel()
+    routing_watch_task.cancel()
+    rerouting_task.cancel()
+    conversation_writer_task.cancel()
+    # Let an in-progress flush finish before the final one
+    try:
+        await conversation_writer_task
+    except asyncio.CancelledError:
+        pass
+    await conversation_store.flush()
+    await forensics_pool.shutdown_pool()
+    
+    # Shutdown: close the database client and the shared HTTP session
     print("\n🔌 Closing MongoDB connection...")
     client.close()  # Synchronous method, no await needed
+    await http_client.close_session()
     print("✅ Backend shutdown complete.\n")
 
 # Create the main app with lifespan handler
@@ -135,8 +248,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Cap upload request bodies before they are buffered (MAX_UPLOAD_REQUEST_MB)
+app.add_middleware(RequestSizeLimitMiddleware)
+
 # Mount static files for uploads
 app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
@@ -288,6 +405,19 @@ def _generate_forensics_ui_feedback(forensics_analysis: Dict) -> Dict:
             'type': 'neutral'
         }
 
+async def _save_upload(file_path: Path, content: bytes) -> None:
+    """Write an accepted upload to disk in a single write, off the event loop"""
+    await asyncio.to_thread(file_path.write_bytes, content)
+
+async def _resolve_ward(content: bytes, latitude: float, longitude: float) -> Optional[int]:
+    """Ward of a complaint from the photo GPS, falling back to the reported location"""
+    photo_gps = await asyncio.to_thread(exif_service.extract_gps_coordinates, ImageContext(content))
+    for coordinates in (photo_gps, (latitude, longitude)):
+        area = ward_geocoder.locate(*coordinates) if coordinates else None
+        if area:
+            return area["ward"]
+    return None
+
 def _map_vision_severity(vision_severity: str) -> str:
     """Map vision severity to user severity format"""
     mapping = {
@@ -347,25 +477,25 @@ def fallback_conversation(user_message: str, conversation_history: List[dict]) -
         "nextQuestion": "Please provide more details." if needs_more_info else None
     }
 
+def _parse_model_reply(text: str) -> dict:
+    """Parse the JSON reply of the chat model"""
+    # Clean up potential markdown code blocks
+    clean_json = text.replace('```json', '').replace('```', '').strip()
+    return json.loads(clean_json)
+
 async def handle_conversation(conversation_id: str, user_message: str, conversation_history: List[dict] = []) -> dict:
-    """Handle conversation with Gemini AI"""
-    models_to_try = ["gemini-2.5-flash", "gemini-2.0-flash", "gemini-1.5-flash"]
+    """
+    Handle conversation with Gemini AI (healthiest pooled model first),
+    falling back to the rules-based assistant when no model answers
+    within the chat latency budget
+    """
+    # Build conversation context
+    conversation_context = "\n".join([
+        f"{msg.get('role', 'user')}: {msg.get('content', '')}" 
+        for msg in conversation_history
+    ])
     
-    for model_name in models_to_try:
-        try:
-            print(f"Attempting conversation with model: {model_name}")
-            if not GEMINI_API_KEY:
-                raise Exception("API Key missing")
-            
-            model = genai.GenerativeModel(model_name)
-            
-            # Build conversation context
-            conversation_context = "\n".join([
-                f"{msg.get('role', 'user')}: {msg.get('content', '')}" 
-                for msg in conversation_history
-            ])
-            
-            prompt = f"""You are a helpful civic issue reporting assistant. Your job is to have a natural conversation with citizens to collect information about civic problems like water leaks, potholes, garbage issues, etc.
+    prompt = f"""You are a helpful civic issue reporting assistant. Your job is to have a natural conversation with citizens to collect information about civic problems like water leaks, potholes, garbage issues, etc.
 
 IMPORTANT RULES:
 1. Have a natural conversation - don't immediately ask for all details at once
@@ -394,23 +524,12 @@ Respond in this JSON format:
 }}
 
 Be conversational and natural. Don't sound robotic."""
-
-            response = await model.generate_content_async(prompt)
-            text_str = response.text
-            print(f"Success with {model_name}. Response length: {len(text_str)}")
-            
-            # Clean up potential markdown code blocks
-            clean_json = text_str.replace('```json', '').replace('```', '').strip()
-            
-            return json.loads(clean_json)
-            
-        except Exception as e:
-            print(f"Failed with model {model_name}: {str(e)}")
-            if model_name == models_to_try[-1]:
-                print("All models failed. Using fallback conversation system.")
-                return fallback_conversation(user_message, conversation_history)
     
-    return fallback_conversation(user_message, conversation_history)
+    return await llm_router.respond(
+        prompt,
+        parse=_parse_model_reply,
+        fallback=lambda: fallback_conversation(user_message, conversation_history)
+    )
 
 
 # Routes
@@ -433,8 +552,8 @@ async def chat_endpoint(request: ChatRequest):
         conv_id = request.conversationId or f"conv_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
         
         # Get conversation history
-        # Prioritize request history, then memory, then empty
-        history = request.history or conversations.get(conv_id, [])
+        # Prioritize request history, then the conversation store, then empty
+        history = request.history or await conversation_store.get(conv_id)
         
         # Add user message to history
         # We need to adapt the structure to what our handle_conversation expects
@@ -456,7 +575,7 @@ async def chat_endpoint(request: ChatRequest):
             "extractedData": ai_response.get("extractedData")
         })
         
-        conversations[conv_id] = new_history
+        conversation_store.save(conv_id, new_history)
         
         extracted_data = ai_response.get("extractedData", {})
         
@@ -536,13 +655,17 @@ async def validate_image(
     
     Pipeline:
     1. File format and size validation
-    2. AI-generated image detection (Sightengine)
-    3. EXIF metadata extraction and GPS validation
-    4. Perceptual hash generation and duplicate detection
-    5. Issue-image consistency check (placeholder)
-    6. Final decision from decision engine
+    2-6. Run concurrently (services.validation_pipeline):
+       - AI-generated image detection (Sightengine)
+       - EXIF metadata extraction, GPS validation and reverse geocoding
+       - Perceptual hash generation and duplicate detection
+       - Image source forensics
+       - Vision analysis / issue-image consistency check
+    7. Final decision from decision engine
+    
+    The upload is validated in memory; only accepted images are written to disk.
     """
-    temp_file_path = None
+    saved_file_path = None
     
     try:
         # STEP 1: Validate file format and size
@@ -557,167 +680,35 @@ async def validate_image(
                 detail=f"Invalid file format. Allowed formats: {', '.join(allowed_formats)}"
             )
         
-        # Save to temporary location
-        temp_filename = f"temp_{uuid.uuid4().hex}.{file_ext}"
-        temp_file_path = UPLOAD_DIR / temp_filename
-        
-        # Save and check file size
-        with open(temp_file_path, "wb") as buffer:
-            content = await image.read()
-            size_mb = len(content) / (1024 * 1024)
-            
-            if size_mb > max_size_mb:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File size ({size_mb:.2f}MB) exceeds limit of {max_size_mb}MB"
-                )
-            
-            buffer.write(content)
+        # Stream into memory, stopping as soon as the size limit or a non-image is detected
+        try:
+            content = await read_upload(image, max_size_mb * 1024 * 1024, allowed_formats)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.reason)
+        size_mb = len(content) / (1024 * 1024)
         
         logger.info(f"Validating image: {image.filename} ({size_mb:.2f}MB)")
         
-        # STEP 2: AI-Generated Image Detection
-        logger.info("Step 2: AI-generated image detection")
-        ai_detection = sightengine_service.detect_ai_generated(str(temp_file_path))
-        
-        # STEP 3: EXIF Metadata Analysis
-        logger.info("Step 3: EXIF metadata extraction")
-        image_gps = exif_service.extract_gps_coordinates(str(temp_file_path))
-        image_timestamp = exif_service.extract_timestamp(str(temp_file_path))
-        camera_info = exif_service.extract_camera_info(str(temp_file_path))
-        
-        # Validate location if both GPS data and user location are available
-        location_valid = False
-        distance_km = None
-        gps_address = None
-        
-        if image_gps and latitude is not None and longitude is not None:
-            user_coords = (latitude, longitude)
-            location_valid = exif_service.validate_location(image_gps, user_coords)
-            distance_km = exif_service.calculate_distance(image_gps, user_coords)
-        
-        # Get human-readable address from GPS coordinates
-        if image_gps:
-            gps_address = exif_service.reverse_geocode(image_gps[0], image_gps[1])
-        
-        exif_data = {
-            "has_gps": image_gps is not None,
-            "gps_coordinates": {
-                "latitude": image_gps[0] if image_gps else None,
-                "longitude": image_gps[1] if image_gps else None
-            } if image_gps else None,
-            "gps_address": gps_address.get("address") if gps_address else None,
-            "gps_city": gps_address.get("city") if gps_address else None,
-            "gps_state": gps_address.get("state") if gps_address else None,
-            "gps_country": gps_address.get("country") if gps_address else None,
-            "location_valid": location_valid if image_gps else False,
-            "timestamp": image_timestamp.isoformat() if image_timestamp else None,
-            "distance_km": distance_km,
-            "camera_make": camera_info.get("camera_make"),
-            "camera_model": camera_info.get("camera_model"),
-            "max_allowed_km": float(os.environ.get("LOCATION_RADIUS_KM", "10"))
-        }
-        
-        # STEP 4: Perceptual Hash and Duplicate Detection
-        logger.info("Step 4: Perceptual hash generation and duplicate check")
-        image_phash = hash_service.generate_phash(str(temp_file_path))
-        similar_hashes = await hash_service.find_similar_hashes(image_phash)
-        
-        hash_match_data = {
-            "is_duplicate": len(similar_hashes) > 0,
-            "similarity_score": similar_hashes[0]["similarity_score"] if similar_hashes else 0.0,
-            "original_issue_id": similar_hashes[0]["issue_id"] if similar_hashes else None
-        }
-        
-        # STEP 5: Image Source Forensics (AFTER AI detection, BEFORE issue classification)
-        logger.info("Step 5: Image source forensics classification")
-        try:
-            from utils.imageForensics import ImageSourceForensics
-            
-            # Read image buffer for forensics
-            with open(temp_file_path, 'rb') as f:
-                image_buffer = f.read()
-            
-            # Run complete forensics classification
-            forensics = ImageSourceForensics()
-            classification_result = forensics.classify_image(image_buffer, str(temp_file_path), image.filename)
-            
-            # Create forensics analysis for backward compatibility
-            source_mapping = {
-                'WHATSAPP': 'WHATSAPP_IMAGE',
-                'SCREENSHOT': 'SCREENSHOT_IMAGE', 
-                'ORIGINAL_PHOTO': 'ORIGINAL_PHONE_PHOTO',
-                'UNKNOWN': 'UNKNOWN'
-            }
-            
-            forensics_analysis = {
-                'source_type': source_mapping.get(classification_result['source'], 'UNKNOWN'),
-                'confidence_score': classification_result['confidence'] / 100.0,
-                'evidence': [],
-                'classification_result': classification_result,
-                'forensics_version': '3.0'
-            }
-            
-            # Extract evidence from best match
-            if classification_result['source'] != 'UNKNOWN':
-                breakdown = classification_result['breakdown']
-                best_source = classification_result['source'].lower()
-                if best_source in breakdown:
-                    forensics_analysis['evidence'] = breakdown[best_source].get('evidence', [])
-            
-            logger.info(f"Forensics: {classification_result['source']} "
-                       f"({classification_result['confidence']}% confidence, "
-                       f"{classification_result['recommendation']})")
-            
-            # SAFETY: Never reject based solely on image source
-            # This is for confidence scoring, audit trail, and user feedback only
-            
-        except Exception as e:
-            logger.warning(f"Forensics analysis failed gracefully: {str(e)}")
-            # Graceful fallback - never block submission due to forensics failure
-            forensics_analysis = {
-                'source_type': 'UNKNOWN',
-                'confidence_score': 0.0,
-                'evidence': [f'Analysis failed: {str(e)}'],
-                'classification_result': {
-                    'source': 'UNKNOWN',
-                    'confidence': 0,
-                    'recommendation': 'ACCEPT',  # Default to accept on failure
-                    'breakdown': {},
-                    'error': str(e)
-                },
-                'forensics_version': '3.0'
-            }
-
-        # STEP 6: Image Content Understanding & Issue Extraction (Gemini Vision)
-        logger.info("Step 6: Vision analysis - content understanding")
-        vision_analysis = vision_service.analyze_image_content(
-            image_path=str(temp_file_path),
-            user_issue_type=issue_type,
-            additional_context={
-                "latitude": latitude,
-                "longitude": longitude
-            }
+        # STEPS 2-6: AI detection, EXIF/GPS, duplicate check, forensics and vision
+        # analysis are independent, so they run concurrently and are joined here
+        logger.info("Steps 2-6: Running validation checks concurrently")
+        # Validate from memory: decode once and share the image across checks
+        validation_results = await validation_pipeline.run_validation(
+            image_path=ImageContext(content, filename=image.filename),
+            filename=image.filename,
+            issue_type=issue_type,
+            latitude=latitude,
+            longitude=longitude
         )
         
-        # Legacy issue_match for backward compatibility
-        issue_match = {
-            "is_match": vision_analysis.get("issue_match_status") == "MATCH" if not vision_analysis.get("skipped") else True,
-            "expected_type": issue_type,
-            "detected_type": vision_analysis.get("issue_type_detected") if not vision_analysis.get("skipped") else None
-        }
+        ai_detection = validation_results["ai_detection"]
+        exif_data = validation_results["exif_data"]
+        hash_match_data = validation_results["hash_match"]
+        vision_analysis = validation_results["vision_analysis"]
+        forensics_analysis = validation_results["forensics_analysis"]
         
         # STEP 7: Decision Engine
         logger.info("Step 7: Running decision engine")
-        validation_results = {
-            "ai_detection": ai_detection,
-            "exif_data": exif_data,
-            "hash_match": hash_match_data,
-            "issue_match": issue_match,
-            "vision_analysis": vision_analysis,
-            "forensics_analysis": forensics_analysis  # NEW
-        }
-        
         decision = decision_engine.make_decision(validation_results)
         
         # Generate user-friendly message
@@ -761,6 +752,11 @@ async def validate_image(
         else:
             print("\n⚠️  Vision analysis skipped - no extracted data available\n")
         
+        # Only accepted images reach disk
+        if decision["status"] != "rejected":
+            saved_file_path = UPLOAD_DIR / f"validated_{uuid.uuid4().hex}.{file_ext}"
+            await _save_upload(saved_file_path, content)
+        
         # SAVE TO DATABASE - Store complete validation record
         try:
             validation_id = f"VAL-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
@@ -773,7 +769,7 @@ async def validate_image(
                 # Image info
                 "image": {
                     "filename": image.filename,
-                    "path": str(temp_file_path) if temp_file_path else None,
+                    "path": str(saved_file_path) if saved_file_path else None,
                     "url": None,  # Will be set when moved to permanent location
                     "size_bytes": size_mb * 1024 * 1024,
                     "format": image.content_type
@@ -804,7 +800,7 @@ async def validate_image(
                         "make": exif_data.get("camera_make"),
                         "model": exif_data.get("camera_model")
                     },
-                    "timestamp": image_timestamp.isoformat() if image_timestamp else None,
+                    "timestamp": exif_data.get("timestamp"),
                     "gps": {
                         "has_gps": exif_data.get("has_gps", False),
                         "coordinates": exif_data.get("gps_coordinates"),
@@ -813,7 +809,9 @@ async def validate_image(
                             "city": exif_data.get("gps_city"),
                             "state": exif_data.get("gps_state"),
                             "country": exif_data.get("gps_country"),
-                            "postcode": None  # Can be extracted from address if needed
+                            "postcode": None,  # Can be extracted from address if needed
+                            "ward": exif_data.get("gps_ward"),
+                            "locality": exif_data.get("gps_locality")
                         } if exif_data.get("has_gps") else None,
                         "location_valid": exif_data.get("location_valid", False),
                         "distance_km": exif_data.get("distance_km"),
@@ -884,11 +882,6 @@ async def validate_image(
             print(f"⚠️  Database save failed: {str(e)}")
             # Don't fail the entire validation if database save fails
         
-        # Clean up temporary file if rejected
-        if decision["status"] == "rejected" and temp_file_path and temp_file_path.exists():
-            temp_file_path.unlink()
-            logger.info("Removed temporary file for rejected image")
-        
         logger.info(f"Validation complete: {decision['status'].upper()}")
         
         # Console log the complete response for debugging
@@ -938,14 +931,8 @@ async def validate_image(
         
     except HTTPException:
         # Re-raise HTTP exceptions
-        if temp_file_path and temp_file_path.exists():
-            temp_file_path.unlink()
         raise
     except Exception as e:
-        # Clean up on error
-        if temp_file_path and temp_file_path.exists():
-            temp_file_path.unlink()
-        
         logger.error(f"Image validation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Image validation failed: {str(e)}")
 
@@ -957,7 +944,7 @@ async def create_complaint(
     category: str = Form(...),
     severity: str = Form(...),
     description: str = Form(...),
-    ward: int = Form(...),
+    ward: Optional[int] = Form(None),
     location: str = Form(...),
     latitude: float = Form(...),
     longitude: float = Form(...),
@@ -969,7 +956,8 @@ async def create_complaint(
     
     Flow:
     1. Save image to permanent storage
-    2. Assign officer based on ward + department
+    2. Assign officer based on ward + department (when no ward is given, it is
+       resolved from the photo GPS or the reported location via ward boundaries)
     3. Create complaint in MongoDB
     4. Return complaint ID + officer details
     """
@@ -992,10 +980,24 @@ async def create_complaint(
         
         image_path = complaints_dir / image_filename
         
-        # Save image
-        with open(image_path, "wb") as buffer:
-            content = await image.read()
-            buffer.write(content)
+        # Save image (streamed with the same size and format limits as validation)
+        allowed_formats = os.environ.get("ALLOWED_IMAGE_FORMATS", "jpg,jpeg,png,webp").split(",")
+        max_size_mb = int(os.environ.get("MAX_IMAGE_SIZE_MB", "10"))
+        try:
+            content = await read_upload(image, max_size_mb * 1024 * 1024, allowed_formats)
+        except UploadRejected as e:
+            raise HTTPException(status_code=e.status_code, detail=e.reason)
+        
+        if ward is None:
+            ward = await _resolve_ward(content, latitude, longitude)
+            if ward is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Could not determine the ward from the photo or location. Please select a ward."
+                )
+            logger.info(f"Ward {ward} resolved from location")
+        
+        await _save_upload(image_path, content)
         
         image_url = f"/uploads/complaints/{image_filename}"
         logger.info(f"✅ Image saved: {image_url}")
@@ -1080,6 +1082,9 @@ async def create_complaint(
             message=response_message
         )
         
+    except HTTPException:
+        # Re-raise HTTP exceptions (e.g. rejected uploads)
+        raise
     except Exception as e:
         logger.error(f"Complaint creation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create complaint: {str(e)}")
@@ -1088,6 +1093,17 @@ async def create_complaint(
 # PHASE 2: OFFICER DASHBOARD ENDPOINTS
 # ================================================================
 
+# Default (slim) list views - timelines and status histories are left to the
+# detail endpoints
+COMPLAINT_LIST_FIELDS = [
+    "complaint_id", "citizen", "category", "severity", "description", "location",
+    "image_url", "assigned_officer", "status", "created_at", "updated_at"
+]
+SUPERVISOR_LIST_FIELDS = COMPLAINT_LIST_FIELDS + [
+    "supervisor_id", "supervisor_status", "supervisor_deadline"
+]
+ISSUE_LIST_FIELDS = [field for field in Issue.model_fields if field != "timeline"] + ["verifications"]
+
 @api_router.post("/officer/login")
 async def officer_login(
     officer_id: str = Form(...),
@@ -1126,18 +1142,32 @@ async def officer_login(
     }
 
 @api_router.get("/officer/complaints")
-async def get_officer_complaints(officer_id: str = Query(...)):
+async def get_officer_complaints(
+    officer_id: str = Query(...),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None)
+):
     """
-    Get all complaints assigned to a specific officer.
+    Get the complaints assigned to a specific officer, newest first.
+    
+    Pages are keyset-paginated on created_at: pass the returned next_cursor as
+    `cursor` for the following page. `fields` is a comma-separated projection
+    ("all" for whole documents); the default is the slim list view.
     """
     logger.info(f"Fetching complaints for officer: {officer_id}")
     
-    # Find complaints assigned to this officer
-    cursor = db.complaints.find(
-        {"assigned_officer.officer_id": officer_id}
-    ).sort("created_at", -1)
+    try:
+        page = KeysetPage("created_at", DESCENDING, limit, cursor)
+        selected = projection(fields, COMPLAINT_LIST_FIELDS, required=["created_at"])
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    complaints = await cursor.to_list(length=100)
+    # Find complaints assigned to this officer
+    complaints = await db.complaints.find(
+        page.filter({"assigned_officer.officer_id": officer_id}), selected
+    ).sort(page.sort).to_list(length=page.fetch_length)
+    complaints, next_cursor = page.split(complaints)
     
     # Convert ObjectId to string
     for c in complaints:
@@ -1148,9 +1178,19 @@ async def get_officer_complaints(officer_id: str = Query(...)):
     return {
         "officer_id": officer_id,
         "total": len(complaints),
-        "complaints": complaints
+        "complaints": complaints,
+        "next_cursor": next_cursor
     }
 
+@api_router.post("/complaints/reroute")
+async def reroute_complaints():
+    """
+    Queue a re-routing pass over complaints flagged for manual routing
+    (e.g. after seeding officers or editing the routing config).
+    """
+    complaint_rerouting.request_reroute()
+    return {"success": True, "message": "Re-routing queued"}
+
 @api_router.get("/complaints/{complaint_id}")
 async def get_complaint_detail(complaint_id: str):
     """
@@ -1221,24 +1261,31 @@ async def create_issue(issue_data: IssueCreate):
         "timeline": [
             {"status": "Reported", "date": now},
             {"status": "Being verified", "date": now}
-        ]
+        ],
+        "verifications": verification_counters.empty_counts()
     })
     
     await db.issues.insert_one(issue_dict)
+    stats_snapshot.request_refresh()
     logger.info(f"Created issue: {issue_id}")
     
     return Issue(**issue_dict)
 
 @api_router.post("/issues/{issue_id}/photos")
 async def upload_issue_photos(issue_id: str, photos: List[UploadFile] = File(...)):
-    """Upload photos for an issue with validation"""
+    """
+    Upload photos for an issue with validation.
+    
+    Photos are validated concurrently (PHOTO_VALIDATION_CONCURRENCY at a time);
+    photos repeating another photo of the same upload are rejected before any
+    external service is called. Results keep the upload order.
+    """
     # Check if issue exists
     issue = await db.issues.find_one({"id": issue_id})
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     
     photo_urls = []
-    validation_results = []
     backend_url = os.environ.get('BACKEND_URL', 'http://localhost:5000')
     
     # Get issue details for validation
@@ -1247,218 +1294,134 @@ async def upload_issue_photos(issue_id: str, photos: List[UploadFile] = File(...
     user_lat = issue_coords.get("lat") if isinstance(issue_coords, dict) else None
     user_lng = issue_coords.get("lng") if isinstance(issue_coords, dict) else None
     
-    for photo in photos:
+    allowed_formats = os.environ.get("ALLOWED_IMAGE_FORMATS", "jpg,jpeg,png,webp").split(",")
+    max_size_mb = int(os.environ.get("MAX_IMAGE_SIZE_MB", "10"))
+    
+    # One result slot per photo, so the response keeps the upload order
+    photo_results: List[Optional[Dict]] = [None] * len(photos)
+    contexts = []
+    context_photo_indices = []
+    
+    # STEP 1: Check format and size (photos stay in memory)
+    for index, photo in enumerate(photos):
+        file_ext = photo.filename.split(".")[-1].lower()
+        
+        if file_ext not in allowed_formats:
+            photo_results[index] = {
+                "filename": photo.filename,
+                "status": "rejected",
+                "reason": f"Invalid format. Allowed: {', '.join(allowed_formats)}"
+            }
+            continue
+        
         try:
-            # STEP 1: Save to temporary location first
-            allowed_formats = os.environ.get("ALLOWED_IMAGE_FORMATS", "jpg,jpeg,png,webp").split(",")
-            file_ext = photo.filename.split(".")[-1].lower()
-            
-            if file_ext not in allowed_formats:
-                validation_results.append({
-                    "filename": photo.filename,
-                    "status": "rejected",
-                    "reason": f"Invalid format. Allowed: {', '.join(allowed_formats)}"
-                })
-                continue
-            
-            # Save temporarily
-            temp_filename = f"temp_{uuid.uuid4().hex}.{file_ext}"
-            temp_file_path = UPLOAD_DIR / temp_filename
-            
-            with open(temp_file_path, "wb") as buffer:
-                content = await photo.read()
-                size_mb = len(content) / (1024 * 1024)
-                max_size_mb = int(os.environ.get("MAX_IMAGE_SIZE_MB", "10"))
-                
-                if size_mb > max_size_mb:
-                    temp_file_path.unlink() if temp_file_path.exists() else None
-                    validation_results.append({
-                        "filename": photo.filename,
-                        "status": "rejected",
-                        "reason": f"File too large ({size_mb:.2f}MB > {max_size_mb}MB)"
-                    })
-                    continue
-                
-                buffer.write(content)
-            
-            logger.info(f"Validating photo: {photo.filename} for issue {issue_id}")
-            
-            # STEP 2: Run validation pipeline
-            # AI Detection
-            ai_detection = sightengine_service.detect_ai_generated(str(temp_file_path))
-            
-            # EXIF Analysis
-            image_gps = exif_service.extract_gps_coordinates(str(temp_file_path))
-            image_timestamp = exif_service.extract_timestamp(str(temp_file_path))
-            camera_info = exif_service.extract_camera_info(str(temp_file_path))
-            
-            location_valid = False
-            distance_km = None
-            
-            if image_gps and user_lat is not None and user_lng is not None:
-                user_coords = (user_lat, user_lng)
-                location_valid = exif_service.validate_location(image_gps, user_coords)
-                distance_km = exif_service.calculate_distance(image_gps, user_coords)
-            
-            exif_data = {
-                "has_gps": image_gps is not None,
-                "location_valid": location_valid if image_gps else False,
-                "timestamp": image_timestamp.isoformat() if image_timestamp else None,
-                "distance_km": distance_km,
-                "camera_make": camera_info.get("camera_make"),
-                "camera_model": camera_info.get("camera_model"),
-                "max_allowed_km": float(os.environ.get("LOCATION_RADIUS_KM", "10"))
+            content = await read_upload(photo, max_size_mb * 1024 * 1024, allowed_formats)
+        except UploadRejected as e:
+            photo_results[index] = {
+                "filename": photo.filename,
+                "status": "rejected",
+                "reason": e.reason
             }
-            
-            # Perceptual Hash & Duplicate Check
-            image_phash = hash_service.generate_phash(str(temp_file_path))
-            similar_hashes = await hash_service.find_similar_hashes(image_phash)
-            
-            hash_match_data = {
-                "is_duplicate": len(similar_hashes) > 0,
-                "similarity_score": similar_hashes[0]["similarity_score"] if similar_hashes else 0.0,
-                "original_issue_id": similar_hashes[0]["issue_id"] if similar_hashes else None
+            continue
+        except Exception as e:
+            logger.error(f"Error reading photo {photo.filename}: {str(e)}")
+            photo_results[index] = {
+                "filename": photo.filename,
+                "status": "error",
+                "reason": str(e)
             }
+            continue
+        
+        contexts.append(ImageContext(content, filename=photo.filename))
+        context_photo_indices.append(index)
+    
+    # STEP 2: Run validation pipeline for all photos concurrently
+    logger.info(f"Validating {len(contexts)} photo(s) for issue {issue_id}")
+    batch_results = await validation_pipeline.run_batch_validation(
+        contexts,
+        issue_type=issue_type,
+        latitude=user_lat,
+        longitude=user_lng,
+        additional_context={
+            "latitude": user_lat,
+            "longitude": user_lng,
+            "issue_id": issue_id
+        },
+        reverse_geocode=False
+    )
+    
+    # STEPS 3-5: Decide and store, in upload order
+    for context, index, validation_data in zip(contexts, context_photo_indices, batch_results):
+        photo = photos[index]
+        try:
+            if isinstance(validation_data, Exception):
+                raise validation_data
             
-            # Image Source Forensics (AFTER AI detection, BEFORE issue classification)
-            logger.info(f"Running forensics classification for {photo.filename}")
-            try:
-                from utils.imageForensics import ImageSourceForensics
-                
-                # Read image buffer for forensics
-                with open(temp_file_path, 'rb') as f:
-                    image_buffer = f.read()
-                
-                # Run complete forensics classification
-                forensics = ImageSourceForensics()
-                classification_result = forensics.classify_image(image_buffer, str(temp_file_path), photo.filename)
-                
-                # Create forensics analysis for backward compatibility
-                source_mapping = {
-                    'WHATSAPP': 'WHATSAPP_IMAGE',
-                    'SCREENSHOT': 'SCREENSHOT_IMAGE', 
-                    'ORIGINAL_PHOTO': 'ORIGINAL_PHONE_PHOTO',
-                    'UNKNOWN': 'UNKNOWN'
-                }
-                
-                forensics_analysis = {
-                    'source_type': source_mapping.get(classification_result['source'], 'UNKNOWN'),
-                    'confidence_score': classification_result['confidence'] / 100.0,
-                    'evidence': [],
-                    'classification_result': classification_result,
-                    'forensics_version': '3.0'
-                }
-                
-                # Extract evidence from best match
-                if classification_result['source'] != 'UNKNOWN':
-                    breakdown = classification_result['breakdown']
-                    best_source = classification_result['source'].lower()
-                    if best_source in breakdown:
-                        forensics_analysis['evidence'] = breakdown[best_source].get('evidence', [])
-                
-                logger.info(f"Forensics: {classification_result['source']} "
-                           f"({classification_result['confidence']}% confidence)")
-                
-                # SAFETY: Never reject based solely on image source
-                
-            except Exception as e:
-                logger.warning(f"Forensics analysis failed gracefully: {str(e)}")
-                # Graceful fallback - never block submission
-                forensics_analysis = {
-                    'source_type': 'UNKNOWN',
-                    'confidence_score': 0.0,
-                    'evidence': [f'Analysis failed: {str(e)}'],
-                    'classification_result': {
-                        'source': 'UNKNOWN',
-                        'confidence': 0,
-                        'recommendation': 'ACCEPT',
-                        'breakdown': {},
-                        'error': str(e)
-                    },
-                    'forensics_version': '3.0'
-                }
-
-            # Vision Analysis - Content Understanding (NEW)
-            logger.info(f"Running vision analysis for {photo.filename}")
-            vision_analysis = vision_service.analyze_image_content(
-                image_path=str(temp_file_path),
-                user_issue_type=issue_type,
-                additional_context={
-                    "latitude": user_lat,
-                    "longitude": user_lng,
-                    "issue_id": issue_id
+            if "duplicate_of" in validation_data:
+                original = photos[context_photo_indices[validation_data["duplicate_of"]]]
+                photo_results[index] = {
+                    "filename": photo.filename,
+                    "status": "rejected",
+                    "reason": f"Duplicate of {original.filename} in the same upload"
                 }
-            )
+                logger.warning(f"Photo rejected: {photo.filename} duplicates {original.filename}")
+                continue
             
-            # Legacy issue_match for backward compatibility
-            issue_match = {
-                "is_match": vision_analysis.get("issue_match_status") == "MATCH" if not vision_analysis.get("skipped") else True,
-                "expected_type": issue_type,
-                "detected_type": vision_analysis.get("issue_type_detected") if not vision_analysis.get("skipped") else None
-            }
+            image_phash = validation_data["hash_match"]["hash_value"]
             
             # STEP 3: Decision Engine
-            validation_data = {
-                "ai_detection": ai_detection,
-                "exif_data": exif_data,
-                "hash_match": hash_match_data,
-                "issue_match": issue_match,
-                "vision_analysis": vision_analysis,
-                "forensics_analysis": forensics_analysis  # NEW
-            }
-            
             decision = decision_engine.make_decision(validation_data)
             
             # STEP 4: Handle decision
             if decision["status"] == "rejected":
-                # Delete temporary file
-                temp_file_path.unlink() if temp_file_path.exists() else None
-                
                 message = decision_engine.get_rejection_message(decision["reason_codes"])
-                validation_results.append({
+                photo_results[index] = {
                     "filename": photo.filename,
                     "status": "rejected",
                     "reason": message,
                     "details": decision
-                })
+                }
                 logger.warning(f"Photo rejected: {photo.filename} - {message}")
                 continue
             
-            # STEP 5: Photo accepted - move to permanent location
+            # STEP 5: Photo accepted - write it to its permanent location
+            file_ext = photo.filename.split(".")[-1].lower()
             unique_filename = f"{issue_id}_{uuid.uuid4().hex[:8]}.{file_ext}"
             final_file_path = UPLOAD_DIR / unique_filename
             
-            # Rename temp file to final
-            temp_file_path.rename(final_file_path)
+            await _save_upload(final_file_path, context.data)
             
             photo_url = f"{backend_url}/uploads/{unique_filename}"
             photo_urls.append(photo_url)
             
             # Store hash for future duplicate detection
-            await hash_service.store_hash(
-                issue_id=issue_id,
-                phash=image_phash,
-                image_path=str(final_file_path),
-                status="pending"  # Will be updated to 'resolved' when issue is resolved
-            )
+            if image_phash:
+                await hash_service.store_hash(
+                    issue_id=issue_id,
+                    phash=image_phash,
+                    image_path=str(final_file_path),
+                    status="pending"  # Will be updated to 'resolved' when issue is resolved
+                )
             
-            validation_results.append({
+            photo_results[index] = {
                 "filename": photo.filename,
                 "status": "accepted",
                 "url": photo_url,
                 "confidence_score": decision["confidence_score"],
                 "warnings": decision["reason_codes"] if decision["reason_codes"] else []
-            })
+            }
             
             logger.info(f"Photo accepted: {photo.filename} - Confidence: {decision['confidence_score']:.2%}")
             
         except Exception as e:
             logger.error(f"Error processing photo {photo.filename}: {str(e)}")
-            validation_results.append({
+            photo_results[index] = {
                 "filename": photo.filename,
                 "status": "error",
                 "reason": str(e)
-            })
+            }
+    
+    validation_results = [result for result in photo_results if result is not None]
     
     # Update issue with accepted photo URLs only
     if photo_urls:
@@ -1486,13 +1449,33 @@ async def upload_issue_photos(issue_id: str, photos: List[UploadFile] = File(...
         }
     }
 
-@api_router.get("/issues", response_model=List[Issue])
+@api_router.get("/issues")
 async def get_issues(
+    response: Response,
     status: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
-    verification: Optional[str] = Query(None)
+    verification: Optional[str] = Query(None),
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None)
 ):
-    """Get all issues with optional filters"""
+    """
+    Get issues with optional filters, newest first.
+
+    Verification counts come from the counters on the issue documents, so the
+    verified/unverified filter is part of the query and the page is one round trip.
+
+    Pages are keyset-paginated on reported_at; the cursor of the next page is
+    returned in the X-Next-Cursor header. Without `fields` the issues are
+    returned without their timeline; with `fields` ("all" for whole
+    documents) the requested fields are returned as is.
+    """
+    try:
+        page = KeysetPage("reported_at", DESCENDING, limit, cursor)
+        selected = projection(fields, ISSUE_LIST_FIELDS, required=["reported_at"])
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     query = {}
     
     if status and status != "all":
@@ -1501,33 +1484,22 @@ async def get_issues(
     if category and category != "all":
         query["category"] = category
     
-    issues = await db.issues.find(query).sort("reported_at", -1).to_list(1000)
+    if verification in ("verified", "unverified"):
+        query.update(verification_counters.verified_filter(verification == "verified"))
+    
+    issues = await db.issues.find(page.filter(query), selected).sort(page.sort).to_list(page.fetch_length)
+    issues, next_cursor = page.split(issues)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
-    # Filter by verification if needed
-    if verification and verification != "all":
-        filtered_issues = []
+    if fields:
         for issue in issues:
-            # Get verification stats
-            verifications = await db.verifications.find({"issue_id": issue["id"]}).to_list(1000)
-            yes_count = sum(1 for v in verifications if v["response"] == "yes")
-            
-            if verification == "verified" and yes_count >= 3:
-                filtered_issues.append(issue)
-            elif verification == "unverified" and yes_count < 3:
-                filtered_issues.append(issue)
-        
-        issues = filtered_issues
+            issue.pop("_id", None)
+        return issues
     
-    # Add verification counts to each issue
     result_issues = []
     for issue in issues:
-        verifications = await db.verifications.find({"issue_id": issue["id"]}).to_list(1000)
-        issue["verifications"] = {
-            "yes": sum(1 for v in verifications if v["response"] == "yes"),
-            "no": sum(1 for v in verifications if v["response"] == "no"),
-            "not_sure": sum(1 for v in verifications if v["response"] == "not_sure"),
-            "total": len(verifications)
-        }
+        issue["verifications"] = verification_counters.counts(issue)
         result_issues.append(Issue(**issue))
     
     return result_issues
@@ -1540,13 +1512,7 @@ async def get_issue(issue_id: str):
         raise HTTPException(status_code=404, detail="Issue not found")
     
     # Add verification stats
-    verifications = await db.verifications.find({"issue_id": issue_id}).to_list(1000)
-    issue["verifications"] = {
-        "yes": sum(1 for v in verifications if v["response"] == "yes"),
-        "no": sum(1 for v in verifications if v["response"] == "no"),
-        "not_sure": sum(1 for v in verifications if v["response"] == "not_sure"),
-        "total": len(verifications)
-    }
+    issue["verifications"] = verification_counters.counts(issue)
     
     return Issue(**issue)
 
@@ -1586,6 +1552,7 @@ async def update_issue_status(issue_id: str, update_data: IssueStatusUpdate):
                 }
             }
         )
+        stats_snapshot.request_refresh()
     
     # Update hash status if issue is being resolved
     if update_data.status == "resolved":
@@ -1596,13 +1563,7 @@ async def update_issue_status(issue_id: str, update_data: IssueStatusUpdate):
     updated_issue = await db.issues.find_one({"id": issue_id})
     
     # Add verification stats
-    verifications = await db.verifications.find({"issue_id": issue_id}).to_list(1000)
-    updated_issue["verifications"] = {
-        "yes": sum(1 for v in verifications if v["response"] == "yes"),
-        "no": sum(1 for v in verifications if v["response"] == "no"),
-        "not_sure": sum(1 for v in verifications if v["response"] == "not_sure"),
-        "total": len(verifications)
-    }
+    updated_issue["verifications"] = verification_counters.counts(updated_issue)
     
     logger.info(f"Updated issue {issue_id} status to {update_data.status}")
     return Issue(**updated_issue)
@@ -1626,6 +1587,11 @@ async def create_verification(verification_data: VerificationCreate):
     })
     
     await db.verifications.insert_one(verification_dict)
+    await db.issues.update_one(
+        {"id": verification_data.issue_id},
+        verification_counters.increment(verification_data.response)
+    )
+    stats_snapshot.request_refresh()
     logger.info(f"Added verification for issue {verification_data.issue_id}")
     
     return Verification(**verification_dict)
@@ -1633,57 +1599,20 @@ async def create_verification(verification_data: VerificationCreate):
 @api_router.get("/issues/{issue_id}/verifications", response_model=VerificationStats)
 async def get_issue_verifications(issue_id: str):
     """Get verification stats for an issue"""
-    verifications = await db.verifications.find({"issue_id": issue_id}).to_list(1000)
+    issue = await db.issues.find_one({"id": issue_id}, {"verifications": 1})
     
-    stats = VerificationStats(
-        yes=sum(1 for v in verifications if v["response"] == "yes"),
-        no=sum(1 for v in verifications if v["response"] == "no"),
-        not_sure=sum(1 for v in verifications if v["response"] == "not_sure"),
-        total=len(verifications)
-    )
-    
-    return stats
+    return VerificationStats(**verification_counters.counts(issue))
 
 # Statistics
 @api_router.get("/stats", response_model=Stats)
 async def get_stats():
-    """Get dashboard statistics"""
-    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    
-    # New today
-    new_today = await db.issues.count_documents({
-        "reported_at": {"$gte": today}
-    })
-    
-    # In verification
-    verifying = await db.issues.count_documents({"status": "verifying"})
-    
-    # In progress
-    in_progress = await db.issues.count_documents({"status": "in_progress"})
-    
-    # Resolved this week
-    resolved_this_week = await db.issues.count_documents({
-        "status": "resolved",
-        "updated_at": {"$gte": week_ago}
-    })
+    """
+    Get dashboard statistics from the materialized stats snapshot
+    (see services/stats_snapshot.py).
+    """
+    snapshot = await stats_snapshot.read()
     
-    # Unverified (no verifications yet)
-    # This is inefficient for large datasets but works for now; can be optimized with aggregation
-    all_issues = await db.issues.find().to_list(1000)
-    unverified = 0
-    for issue in all_issues:
-        verification_count = await db.verifications.count_documents({"issue_id": issue["id"]})
-        if verification_count == 0:
-            unverified += 1
-    
-    return Stats(
-        new_today=new_today,
-        verifying=verifying,
-        in_progress=in_progress,
-        resolved_this_week=resolved_this_week,
-        unverified=unverified
-    )
+    return Stats(**{counter: snapshot[counter] for counter in stats_snapshot.COUNTERS})
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -1694,6 +1623,7 @@ app.add_middleware(
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ------------------------------------------------------------------
@@ -1726,76 +1656,52 @@ async def supervisor_login(credentials: dict):
 @app.get("/api/supervisor/complaints")
 async def get_supervisor_complaints(
     supervisor_id: str,
-    filter: str = Query("pending", enum=["pending", "overdue", "all"])
+    filter: str = Query("pending", enum=["pending", "overdue", "all"]),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None)
 ):
+    """
+    Get the dashboard stats and the complaints escalated to a supervisor,
+    earliest deadline first.
+    
+    Pages are keyset-paginated on supervisor_deadline: pass the returned
+    next_cursor as `cursor` for the following page. `fields` is a
+    comma-separated projection ("all" for whole documents); the default is
+    the slim list view.
+    """
+    try:
+        page = KeysetPage("supervisor_deadline", ASCENDING, limit, cursor)
+        selected = projection(fields, SUPERVISOR_LIST_FIELDS, required=["supervisor_deadline"])
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Verify supervisor exists
     supervisor = await db.supervisors.find_one({"supervisor_id": supervisor_id})
     if not supervisor:
         raise HTTPException(status_code=404, detail="Supervisor not found")
     
-    # Base query: Complaints escalated to this supervisor
-    query = {"supervisor_id": supervisor_id}
-    
-    # Get current time for deadline checks
+    # Counters over all escalated complaints and the page of the list, in one aggregation
     now = datetime.utcnow()
+    results = await db.complaints.aggregate(
+        supervisor_dashboard.dashboard_pipeline(supervisor_id, filter, page, selected, now)
+    ).to_list(length=1)
+    facets = results[0] if results else {"stats": [], "complaints": []}
+    stats = facets["stats"][0] if facets["stats"] else {}
+    complaints, next_cursor = page.split(facets["complaints"])
     
-    # Calculate stats first (for dashboard cards)
-    all_assigned = await db.complaints.find({"supervisor_id": supervisor_id}).to_list(length=1000)
-    
-    pending_count = 0
-    overdue_count = 0
-    new_today_count = 0
-    
-    for c in all_assigned:
-        s_status = c.get("supervisor_status")
-        deadline = c.get("supervisor_deadline")
-        
-        # Pending logic: Status is PENDING or None
-        if not s_status or s_status == "PENDING":
-            pending_count += 1
-            
-            # Overdue logic
-            # Handle string vs datetime mismatch if any
-            if isinstance(deadline, str):
-                try:
-                    deadline = datetime.fromisoformat(deadline)
-                except ValueError:
-                    pass
-            
-            if isinstance(deadline, datetime) and now > deadline:
-                overdue_count += 1
-        
-        # New today logic (escalated today)
-        timeline = c.get("timeline", [])
-        for event in timeline:
-            if event.get("action") == "sent_to_supervisor":
-                ts = event.get("timestamp") or event.get("datetime")
-                if isinstance(ts, str):
-                    try:
-                        ts = datetime.fromisoformat(ts)
-                    except ValueError:
-                        continue
-                if isinstance(ts, datetime) and (now - ts).days < 1:
-                    new_today_count += 1
-                    break
-    
-    # Filter for the list
-    if filter == "pending":
-        query["$or"] = [{"supervisor_status": "PENDING"}, {"supervisor_status": None}]
-    elif filter == "overdue":
-        query["$or"] = [{"supervisor_status": "PENDING"}, {"supervisor_status": None}]
-        query["supervisor_deadline"] = {"$lt": now}
-    # "all" includes everything (resolved etc)
-    
-    complaints = await db.complaints.find(query).sort("supervisor_deadline", 1).to_list(length=100)
+    # Convert ObjectId to string
+    for c in complaints:
+        c["_id"] = str(c["_id"])
     
     return {
         "stats": {
-            "new_today": new_today_count,
-            "pending": pending_count,
-            "overdue": overdue_count
+            "new_today": stats.get("new_today", 0),
+            "pending": stats.get("pending", 0),
+            "overdue": stats.get("overdue", 0)
         },
-        "complaints": complaints
+        "complaints": complaints,
+        "next_cursor": next_cursor
     }
 
 @app.post("/api/complaints/{complaint_id}/escalate")
@@ -1818,12 +1724,8 @@ async def escalate_complaint(complaint_id: str, data: dict):
         # Using category as department for now
         department = complaint.get("category", "").lower()
         
-        # Try to find supervisor for this department
-        supervisor = await db.supervisors.find_one({"department": department})
-        
-        if not supervisor:
-            # Fallback to any available supervisor
-            supervisor = await db.supervisors.find_one({})
+        # Supervisor for this department, falling back to any available supervisor
+        supervisor = await directory_cache.find_supervisor(department)
             
         if not supervisor:
             # No supervisors in system - return helpful error
@@ -1837,11 +1739,12 @@ async def escalate_complaint(complaint_id: str, data: dict):
         # Calculate deadline
         is_high_severity = complaint.get("severity", "Low") in ["High", "Critical"]
         hours = 24 if is_high_severity else 72
-        deadline = datetime.utcnow() + timedelta(hours=hours)
+        now = datetime.utcnow()
+        deadline = now + timedelta(hours=hours)
         
         # Update timeline
         new_event = {
-            "timestamp": datetime.utcnow(),
+            "timestamp": now,
             "actor": data.get("officer_name", "Officer"),
             "role": "officer",
             "action": "sent_to_supervisor",
@@ -1853,7 +1756,8 @@ async def escalate_complaint(complaint_id: str, data: dict):
             "supervisor_id": supervisor["supervisor_id"],
             "supervisor_status": "PENDING",
             "supervisor_deadline": deadline,
-            "updated_at": datetime.utcnow()
+            "escalated_at": now,
+            "updated_at": now
         }
         
         await db.complaints.update_one(
@@ -0,0 +1,177 @@
+"""
+Complaint Re-Routing - Assign Officers to Complaints Needing Manual Routing
+
+create_complaint flags complaints it cannot route (no officer for the ward
+and department, or an officer missing from the directory) with
+`needs_manual_routing: True`. This worker streams the flagged complaints in
+_id order, resolves their officers through the compiled routing table and
+the officer directory (no per-complaint queries), and applies each batch
+with a single bulk_write.
+
+A pass runs at startup, whenever the routing table or the set of officers
+changes, and on request (request_reroute()). Progress is checkpointed in the
+job_checkpoints collection after every batch, so an interrupted pass resumes
+where it stopped.
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, UpdateOne
+
+from services import directory_cache, officer_routing
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+REROUTE_BATCH_SIZE = int(os.environ.get("REROUTE_BATCH_SIZE", "1000"))
+REROUTE_CHECK_INTERVAL = float(os.environ.get("REROUTE_CHECK_INTERVAL", "10"))
+
+CHECKPOINT_ID = "complaint_rerouting"
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+complaints_collection = db.complaints
+checkpoints_collection = db.job_checkpoints
+
+_reroute_requested: Optional[asyncio.Event] = None
+
+
+def _assignment(complaint: Dict, officer: Dict, now: datetime) -> UpdateOne:
+    """Update assigning an officer to a flagged complaint (skipped if routed meanwhile)."""
+    details = officer_routing.officer_summary(officer)
+    assigned_officer = {
+        "officer_id": details["officer_id"],
+        "name": details["name"],
+        "title": details["title"],
+        "department": details["department"],
+        "ward": details["ward"],
+        "assigned_at": now
+    }
+    return UpdateOne(
+        {"_id": complaint["_id"], "needs_manual_routing": True},
+        {
+            "$set": {
+                "assigned_officer": assigned_officer,
+                "status": "assigned",
+                "needs_manual_routing": False,
+                "updated_at": now
+            },
+            "$push": {"timeline": {
+                "timestamp": now,
+                "actor": "System",
+                "role": "system",
+                "action": "assigned",
+                "details": f"Routed to {details['name']}"
+            }}
+        }
+    )
+
+
+async def reroute(batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Route every complaint flagged needs_manual_routing that the routing table
+    and officer directory can now serve. Resumes from the saved checkpoint.
+
+    Args:
+        batch_size: Complaints read and updated per batch
+
+    Returns:
+        dict: {"scanned": n, "assigned": n}
+    """
+    batch_size = batch_size or REROUTE_BATCH_SIZE
+    scanned = assigned = 0
+
+    checkpoint = await checkpoints_collection.find_one({"_id": CHECKPOINT_ID})
+    query = {"needs_manual_routing": True}
+    if checkpoint and checkpoint.get("last_id") is not None:
+        query["_id"] = {"$gt": checkpoint["last_id"]}
+        logger.info(f"Resuming complaint re-routing after {checkpoint['last_id']}")
+
+    cursor = complaints_collection.find(
+        query, {"location.ward": 1, "category": 1}
+    ).sort([("_id", ASCENDING)]).batch_size(batch_size)
+
+    batch = []
+
+    async def apply(batch):
+        directory = await directory_cache.current()
+        officer_ids = officer_routing.assign_officers(
+            ((complaint.get("location") or {}).get("ward"), complaint.get("category")) for complaint in batch
+        )
+        now = datetime.utcnow()
+        operations = [
+            _assignment(complaint, directory.officers_by_id[officer_id], now)
+            for complaint, officer_id in zip(batch, officer_ids)
+            if officer_id in directory.officers_by_id
+        ]
+        if operations:
+            result = await complaints_collection.bulk_write(operations, ordered=False)
+            count = result.modified_count
+        else:
+            count = 0
+        await checkpoints_collection.update_one(
+            {"_id": CHECKPOINT_ID},
+            {"$set": {"last_id": batch[-1]["_id"], "updated_at": now}},
+            upsert=True
+        )
+        return count
+
+    async for complaint in cursor:
+        batch.append(complaint)
+        if len(batch) >= batch_size:
+            assigned += await apply(batch)
+            scanned += len(batch)
+            batch = []
+
+    if batch:
+        assigned += await apply(batch)
+        scanned += len(batch)
+
+    # Pass complete - the next one starts from the beginning
+    await checkpoints_collection.delete_one({"_id": CHECKPOINT_ID})
+
+    if scanned:
+        logger.info(f"Re-routed {assigned} of {scanned} complaint(s) needing manual routing")
+    return {"scanned": scanned, "assigned": assigned}
+
+
+def request_reroute() -> None:
+    """Ask the background worker for a re-routing pass."""
+    if _reroute_requested is not None:
+        _reroute_requested.set()
+
+
+async def run_rerouter(interval: Optional[float] = None) -> None:
+    """
+    Re-route flagged complaints at startup, on request and whenever the routing
+    table or the set of officers changes (runs until cancelled).
+    Should be started as a background task during app startup.
+    """
+    global _reroute_requested
+
+    interval = interval or REROUTE_CHECK_INTERVAL
+    _reroute_requested = asyncio.Event()
+    routed_with = None
+
+    while True:
+        try:
+            directory = await directory_cache.current()
+            state = (officer_routing.ROUTING_TABLE, frozenset(directory.officers_by_id))
+            if _reroute_requested.is_set() or state != routed_with:
+                _reroute_requested.clear()
+                await reroute()
+                routed_with = state
+        except Exception as e:
+            logger.error(f"Complaint re-routing failed: {str(e)}")
+
+        try:
+            await asyncio.wait_for(_reroute_requested.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,205 @@
+"""
+Conversation Store - Bounded, Persistent /api/chat Histories
+
+Chat histories are kept in two tiers: an in-process LRU (bounded by entry
+count and idle TTL) in front of the `conversations` MongoDB collection, which
+is shared by all workers and survives restarts. Each conversation keeps only
+its last CONVERSATION_MAX_MESSAGES messages, so both memory use and prompt
+size stay flat however long a chat runs.
+
+Writes are write-behind: save() updates memory immediately and a background
+writer flushes changed conversations to MongoDB in one bulk write every
+CONVERSATION_FLUSH_INTERVAL seconds. Every copy carries its `updated_at`, so
+a worker never overwrites a newer copy saved by another worker, and a worker
+holding a conversation in memory picks up a newer copy written elsewhere.
+
+The MongoDB tier is used once create_indexes() has run at app startup; before
+that (scripts, tests) only the in-process tier is used. Store failures never
+fail a chat - they are logged and the conversation stays in memory.
+"""
+
+import os
+import copy
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from services.result_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CONVERSATION_MAX_ENTRIES = int(os.environ.get("CONVERSATION_MAX_ENTRIES", "5000"))
+CONVERSATION_MAX_MESSAGES = int(os.environ.get("CONVERSATION_MAX_MESSAGES", "20"))
+# Seconds an idle conversation is kept (in memory and in MongoDB)
+CONVERSATION_TTL = float(os.environ.get("CONVERSATION_TTL", "86400"))
+CONVERSATION_FLUSH_INTERVAL = float(os.environ.get("CONVERSATION_FLUSH_INTERVAL", "1"))
+
+DUPLICATE_KEY = 11000
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+conversations_collection = db.conversations
+
+_store_ready = False
+
+# conversation_id -> (updated_at, messages)
+_memory = LRUCache(CONVERSATION_MAX_ENTRIES)
+# Conversations saved since the last flush, oldest first
+_pending: "OrderedDict[str, Tuple[datetime, List[dict]]]" = OrderedDict()
+
+
+def _now() -> datetime:
+    # MongoDB stores dates with millisecond precision
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+async def get(conversation_id: str) -> List[dict]:
+    """
+    History of a conversation, in memory first and then in MongoDB.
+
+    Returns:
+        list: A copy of the stored messages (empty for unknown conversations)
+    """
+    entry = _memory.get(conversation_id)
+
+    if _store_ready and conversation_id not in _pending:
+        # Another worker may have saved a newer copy
+        query = {"_id": conversation_id}
+        if entry is not None:
+            query["updated_at"] = {"$gt": entry[0]}
+        try:
+            document = await conversations_collection.find_one(query)
+        except Exception as e:
+            logger.warning(f"Conversation lookup failed: {str(e)}")
+            document = None
+
+        if document is not None:
+            entry = (document["updated_at"], document["messages"])
+            _memory.set(conversation_id, entry, CONVERSATION_TTL)
+
+    return copy.deepcopy(entry[1]) if entry is not None else []
+
+
+def save(conversation_id: str, messages: List[dict]) -> List[dict]:
+    """
+    Store a conversation's history, keeping its last CONVERSATION_MAX_MESSAGES
+    messages. Written to MongoDB by the background writer.
+
+    Returns:
+        list: The stored (windowed) messages
+    """
+    messages = copy.deepcopy(messages[-CONVERSATION_MAX_MESSAGES:])
+    entry = (_now(), messages)
+    _memory.set(conversation_id, entry, CONVERSATION_TTL)
+
+    if _store_ready:
+        _pending[conversation_id] = entry
+        _pending.move_to_end(conversation_id)
+        # Bound the backlog while MongoDB is unreachable
+        while len(_pending) > CONVERSATION_MAX_ENTRIES:
+            dropped, _ = _pending.popitem(last=False)
+            logger.warning(f"Conversation write backlog full, not persisting {dropped}")
+
+    return messages
+
+
+async def flush() -> int:
+    """
+    Write the conversations saved since the last flush to MongoDB.
+
+    Returns:
+        int: Number of conversations written
+    """
+    if not _pending:
+        return 0
+
+    # Entries stay pending until written; a save meanwhile replaces its entry
+    batch = list(_pending.items())
+
+    operations = [
+        ReplaceOne(
+            # Only replace an older copy - a newer one from another worker wins
+            {"_id": conversation_id, "updated_at": {"$lt": updated_at}},
+            {
+                "messages": messages,
+                "updated_at": updated_at,
+                "expires_at": updated_at + timedelta(seconds=CONVERSATION_TTL)
+            },
+            upsert=True
+        )
+        for conversation_id, (updated_at, messages) in batch
+    ]
+
+    failed = set()
+    try:
+        await conversations_collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        # Duplicate keys are upserts that lost to a newer copy
+        failed = {error["index"] for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY}
+    except Exception as e:
+        logger.warning(f"Conversation flush failed: {str(e)}")
+        failed = set(range(len(batch)))
+
+    # Failed writes are retried next time
+    for index, (conversation_id, entry) in enumerate(batch):
+        if index not in failed and _pending.get(conversation_id) is entry:
+            del _pending[conversation_id]
+
+    return len(batch) - len(failed)
+
+
+async def run_writer(interval: Optional[float] = None) -> None:
+    """
+    Flush saved conversations to MongoDB periodically (runs until cancelled).
+    Should be started as a background task during app startup.
+    """
+    interval = interval or CONVERSATION_FLUSH_INTERVAL
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush()
+        except Exception as e:
+            logger.error(f"Conversation writer failed: {str(e)}")
+
+
+def clear() -> None:
+    """Empty the in-process tier and drop unwritten conversations."""
+    _memory.clear()
+    _pending.clear()
+
+
+def stats() -> Dict[str, int]:
+    """Sizes of the in-process tier and of the write backlog."""
+    return {"in_memory": len(_memory), "pending_writes": len(_pending)}
+
+
+async def create_indexes() -> bool:
+    """
+    Create the TTL index of the conversations collection and enable the MongoDB tier.
+    Should be called during app initialization.
+
+    Returns:
+        bool: True if the MongoDB tier is enabled
+    """
+    global _store_ready
+
+    try:
+        # MongoDB deletes conversations once expires_at has passed
+        await conversations_collection.create_index("expires_at", expireAfterSeconds=0)
+        _store_ready = True
+        logger.info("Created indexes for conversations collection")
+    except Exception as e:
+        logger.error(f"Failed to create conversation indexes, keeping conversations in memory only: {str(e)}")
+
+    return _store_ready
@@ -0,0 +1,212 @@
+"""
+Database Indexes - Declared Indexes and Query Plan Checks
+
+Declares the indexes backing each endpoint's filter + sort, creates them at
+startup (idempotent - existing indexes with the same keys and options are left
+as they are) and checks with explain() that the hot queries use them,
+reporting any query that still falls back to a collection scan.
+
+Index keys use MongoDB's default names, so indexes created earlier by
+init_database.py / seed_officers.py are recognised rather than duplicated.
+
+Usage (one-off report):
+    python -m services.db_indexes
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import ConnectionFailure
+
+from services import supervisor_dashboard
+
+logger = logging.getLogger(__name__)
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+
+# collection -> [(keys, options)]
+INDEXES = {
+    "issues": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # GET /api/issues keyset pages, unfiltered and by status / category
+        ([("reported_at", DESCENDING), ("_id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("reported_at", DESCENDING), ("_id", DESCENDING)], {}),
+        ([("category", ASCENDING), ("reported_at", DESCENDING), ("_id", DESCENDING)], {}),
+    ],
+    "verifications": [
+        ([("issue_id", ASCENDING)], {}),
+    ],
+    "complaints": [
+        ([("complaint_id", ASCENDING)], {"unique": True}),
+        # Officer dashboard: assigned complaints, newest first
+        ([("assigned_officer.officer_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], {}),
+        # Supervisor dashboard: pending / overdue lists and counters, by deadline
+        ([("supervisor_id", ASCENDING), ("supervisor_status", ASCENDING),
+          ("supervisor_deadline", ASCENDING), ("_id", ASCENDING)], {}),
+        # Supervisor dashboard: "all" list, by deadline
+        ([("supervisor_id", ASCENDING), ("supervisor_deadline", ASCENDING), ("_id", ASCENDING)], {}),
+        # Re-routing worker: complaints still needing manual routing, in _id order
+        ([("needs_manual_routing", ASCENDING), ("_id", ASCENDING)],
+         {"partialFilterExpression": {"needs_manual_routing": True}}),
+    ],
+    "officers": [
+        ([("officer_id", ASCENDING)], {"unique": True}),
+        ([("department", ASCENDING)], {}),
+        ([("wards", ASCENDING)], {}),
+    ],
+    "supervisors": [
+        ([("supervisor_id", ASCENDING)], {"unique": True}),
+        ([("department", ASCENDING)], {}),
+    ],
+    "image_validations": [
+        ([("validation_id", ASCENDING)], {"unique": True}),
+        ([("created_at", DESCENDING)], {}),
+    ],
+    "image_hashes": [
+        ([("issue_id", ASCENDING)], {"unique": True}),
+        ([("created_at", DESCENDING)], {}),
+        ([("status", ASCENDING)], {}),
+        ([("updated_at", ASCENDING)], {}),
+    ],
+}
+
+
+def hot_queries(now: Optional[datetime] = None) -> List[Dict]:
+    """
+    Representative filter + sort of each hot query, checked by explain_report().
+
+    Returns:
+        list: {"name", "collection", "filter", "sort"} per query
+    """
+    now = now or datetime.utcnow()
+    sample = "__explain__"
+    newest_issues = [("reported_at", DESCENDING), ("_id", DESCENDING)]
+    by_deadline = [("supervisor_deadline", ASCENDING), ("_id", ASCENDING)]
+
+    return [
+        {"name": "issue by id", "collection": "issues", "filter": {"id": sample}, "sort": None},
+        {"name": "issue list", "collection": "issues", "filter": {}, "sort": newest_issues},
+        {"name": "issue list by status", "collection": "issues", "filter": {"status": sample}, "sort": newest_issues},
+        {"name": "issue list by category", "collection": "issues", "filter": {"category": sample}, "sort": newest_issues},
+        {"name": "complaint by id", "collection": "complaints", "filter": {"complaint_id": sample}, "sort": None},
+        {"name": "officer complaints", "collection": "complaints",
+         "filter": {"assigned_officer.officer_id": sample}, "sort": [("created_at", DESCENDING), ("_id", DESCENDING)]},
+        {"name": "supervisor pending complaints", "collection": "complaints",
+         "filter": dict(supervisor_dashboard.list_query("pending", now), supervisor_id=sample), "sort": by_deadline},
+        {"name": "supervisor overdue complaints", "collection": "complaints",
+         "filter": dict(supervisor_dashboard.list_query("overdue", now), supervisor_id=sample), "sort": by_deadline},
+        {"name": "supervisor all complaints", "collection": "complaints",
+         "filter": {"supervisor_id": sample}, "sort": by_deadline},
+        {"name": "complaints needing routing", "collection": "complaints",
+         "filter": {"needs_manual_routing": True}, "sort": [("_id", ASCENDING)]},
+        {"name": "officer by id", "collection": "officers", "filter": {"officer_id": sample}, "sort": None},
+        {"name": "supervisor by id", "collection": "supervisors", "filter": {"supervisor_id": sample}, "sort": None},
+        {"name": "supervisor by department", "collection": "supervisors", "filter": {"department": sample}, "sort": None},
+        {"name": "validation by id", "collection": "image_validations", "filter": {"validation_id": sample}, "sort": None},
+        {"name": "image hash by issue", "collection": "image_hashes", "filter": {"issue_id": sample}, "sort": None},
+        {"name": "resolved image hashes", "collection": "image_hashes", "filter": {"status": "resolved"}, "sort": None},
+        {"name": "image hashes changed since", "collection": "image_hashes",
+         "filter": {"updated_at": {"$gte": now}}, "sort": None},
+    ]
+
+
+async def ensure_indexes(database=None) -> int:
+    """
+    Create every declared index. Idempotent; an index that cannot be created
+    (e.g. duplicates under a unique index) is logged and skipped.
+    Should be called during app initialization.
+
+    Args:
+        database: Motor database (defaults to this module's connection)
+
+    Returns:
+        int: Number of declared indexes in place
+    """
+    database = database if database is not None else db
+    ready = 0
+
+    for collection, indexes in INDEXES.items():
+        for keys, options in indexes:
+            try:
+                await database[collection].create_index(keys, **options)
+                ready += 1
+            except ConnectionFailure as e:
+                logger.error(f"Cannot create indexes, database unavailable: {str(e)}")
+                return ready
+            except Exception as e:
+                logger.error(f"Failed to create index {keys} on {collection}: {str(e)}")
+
+    logger.info(f"Ensured {ready} index(es)")
+    return ready
+
+
+def plan_stages(plan: Dict) -> List[str]:
+    """All stage names of an explain() plan tree, outermost first."""
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop(0)
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(node["stage"])
+        # Classic plans nest inputStage(s); slot-based plans wrap them in queryPlan
+        for key in ("queryPlan", "inputStage"):
+            if key in node:
+                pending.append(node[key])
+        pending.extend(node.get("inputStages", []))
+    return stages
+
+
+async def explain_report(database=None) -> List[Dict]:
+    """
+    Explain every hot query and flag the ones scanning a whole collection.
+
+    Args:
+        database: Motor database (defaults to this module's connection)
+
+    Returns:
+        list: {"name", "collection", "stages", "collscan"} per query
+    """
+    database = database if database is not None else db
+    report = []
+
+    for query in hot_queries():
+        cursor = database[query["collection"]].find(query["filter"])
+        if query["sort"]:
+            cursor = cursor.sort(query["sort"])
+
+        try:
+            explanation = await cursor.limit(1).explain()
+        except ConnectionFailure as e:
+            logger.error(f"Cannot explain queries, database unavailable: {str(e)}")
+            break
+        except Exception as e:
+            logger.error(f"Failed to explain {query['name']}: {str(e)}")
+            continue
+
+        stages = plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+        collscan = "COLLSCAN" in stages
+        if collscan:
+            logger.warning(f"Query '{query['name']}' on {query['collection']} uses a COLLSCAN: {' <- '.join(stages)}")
+
+        report.append({"name": query["name"], "collection": query["collection"], "stages": stages, "collscan": collscan})
+
+    return report
+
+
+if __name__ == "__main__":
+    async def main():
+        print(f"🗂️  {await ensure_indexes()} index(es) in place\n")
+        for entry in await explain_report():
+            print(f"{'❌' if entry['collscan'] else '✅'} {entry['name']:<32} {' <- '.join(entry['stages'])}")
+
+    asyncio.run(main())
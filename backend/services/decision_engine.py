@@ -209,6 +209,8 @@ def make_decision(validation_results: Dict) -> Dict:
             "gps_city": exif_data.get("gps_city"),
             "gps_state": exif_data.get("gps_state"),
             "gps_country": exif_data.get("gps_country"),
+            "gps_ward": exif_data.get("gps_ward"),
+            "gps_locality": exif_data.get("gps_locality"),
             "location_valid": exif_data.get("location_valid", False),
             "timestamp": exif_data.get("timestamp"),
             "distance_km": exif_data.get("distance_km"),
@@ -0,0 +1,195 @@
+"""
+Directory Cache - In-Process Officer and Supervisor Directory
+
+Complaint routing and escalation look up officers by id and supervisors by
+department on every request. The roster rarely changes, so both collections
+are held in memory, indexed by id, department and ward, and lookups never go
+to MongoDB on the hot path.
+
+Freshness:
+- A MongoDB change stream on `officers` and `supervisors` reloads the
+  directory as soon as either changes (replica sets / Atlas).
+- Without change streams (standalone server), the directory is reloaded every
+  DIRECTORY_CACHE_TTL seconds instead.
+- A lookup on a directory older than DIRECTORY_CACHE_TTL is still answered
+  from memory and triggers a background reload.
+
+Passwords are never loaded into the cache.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+DIRECTORY_CACHE_TTL = float(os.environ.get("DIRECTORY_CACHE_TTL", "300"))
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+
+_PROJECTION = {"_id": 0, "password": 0}
+
+
+class Directory:
+    """Immutable snapshot of the officers and supervisors, with lookup indexes."""
+
+    def __init__(self, officers: List[Dict], supervisors: List[Dict]):
+        self.loaded_at = time.monotonic()
+        self.officers_by_id = {officer["officer_id"]: officer for officer in officers if officer.get("officer_id")}
+        self.supervisors_by_id = {s["supervisor_id"]: s for s in supervisors if s.get("supervisor_id")}
+
+        self.officers_by_department: Dict[str, List[Dict]] = {}
+        self.officers_by_ward: Dict[int, List[Dict]] = {}
+        for officer in self.officers_by_id.values():
+            self.officers_by_department.setdefault(officer.get("department"), []).append(officer)
+            for ward in officer.get("wards") or []:
+                self.officers_by_ward.setdefault(ward, []).append(officer)
+
+        self.supervisors_by_department: Dict[str, Dict] = {}
+        for supervisor in self.supervisors_by_id.values():
+            # First supervisor of a department answers for it, as find_one did
+            self.supervisors_by_department.setdefault(supervisor.get("department"), supervisor)
+
+    def is_stale(self) -> bool:
+        return time.monotonic() - self.loaded_at > DIRECTORY_CACHE_TTL
+
+
+_directory: Optional[Directory] = None
+_database = None
+_reload_task: Optional[asyncio.Task] = None
+
+
+async def load(database=None) -> Directory:
+    """
+    Load the directory from MongoDB and make it current.
+
+    Args:
+        database: Motor database (remembered for later reloads; defaults to
+            this module's connection)
+
+    Returns:
+        Directory: The new snapshot
+    """
+    global _directory, _database
+
+    if database is not None:
+        _database = database
+    source = _database if _database is not None else db
+
+    officers = await source.officers.find({}, _PROJECTION).to_list(length=None)
+    supervisors = await source.supervisors.find({}, _PROJECTION).to_list(length=None)
+
+    # Swapped in one assignment - readers see the old or the new snapshot
+    _directory = Directory(officers, supervisors)
+    logger.info(f"Loaded directory: {len(_directory.officers_by_id)} officers, "
+                f"{len(_directory.supervisors_by_id)} supervisors")
+    return _directory
+
+
+def _reload_in_background() -> None:
+    """Reload a stale directory without making the caller wait."""
+    global _reload_task
+
+    if _reload_task is not None and not _reload_task.done():
+        return
+
+    async def reload():
+        try:
+            await load()
+        except Exception as e:
+            logger.warning(f"Directory reload failed, serving the previous snapshot: {str(e)}")
+
+    _reload_task = asyncio.create_task(reload())
+
+
+async def current() -> Directory:
+    """The current directory, loaded on first use."""
+    if _directory is None:
+        return await load()
+    if _directory.is_stale():
+        _reload_in_background()
+    return _directory
+
+
+async def get_officer(officer_id: str) -> Optional[Dict]:
+    """Officer document by officer_id, or None."""
+    return (await current()).officers_by_id.get(officer_id)
+
+
+async def get_supervisor(supervisor_id: str) -> Optional[Dict]:
+    """Supervisor document by supervisor_id, or None."""
+    return (await current()).supervisors_by_id.get(supervisor_id)
+
+
+async def find_supervisor(department: str) -> Optional[Dict]:
+    """
+    Supervisor for a department, falling back to any supervisor.
+
+    Returns:
+        dict: Supervisor document, or None if there are no supervisors
+    """
+    directory = await current()
+    supervisor = directory.supervisors_by_department.get(department)
+    if supervisor is None and directory.supervisors_by_id:
+        supervisor = next(iter(directory.supervisors_by_id.values()))
+    return supervisor
+
+
+async def officers_for(department: Optional[str] = None, ward: Optional[int] = None) -> List[Dict]:
+    """Officers of a department and/or ward."""
+    directory = await current()
+    if ward is not None:
+        officers = directory.officers_by_ward.get(ward, [])
+        return [o for o in officers if department is None or o.get("department") == department]
+    if department is not None:
+        return list(directory.officers_by_department.get(department, []))
+    return list(directory.officers_by_id.values())
+
+
+def invalidate() -> None:
+    """Forget the directory; the next lookup reloads it."""
+    global _directory
+    _directory = None
+
+
+async def _watch(collections: List[str]) -> None:
+    """Reload on every change to the watched collections (needs a replica set)."""
+    source = _database if _database is not None else db
+    async with source.watch([{"$match": {"ns.coll": {"$in": collections}}}]) as stream:
+        async for change in stream:
+            logger.info(f"Directory change ({change.get('operationType')} on {change['ns']['coll']}), reloading")
+            await load()
+
+
+async def run_watcher(interval: Optional[float] = None) -> None:
+    """
+    Keep the directory fresh (runs until cancelled).
+    Should be started as a background task during app startup.
+
+    Follows a change stream when the server supports one, and otherwise
+    reloads every `interval` seconds (DIRECTORY_CACHE_TTL by default).
+    """
+    interval = interval or DIRECTORY_CACHE_TTL
+
+    try:
+        await _watch(["officers", "supervisors"])
+    except OperationFailure as e:
+        logger.info(f"Change streams unavailable ({str(e)}), reloading the directory every {interval:g}s")
+    except PyMongoError as e:
+        logger.warning(f"Directory change stream failed ({str(e)}), reloading every {interval:g}s")
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await load()
+        except Exception as e:
+            logger.warning(f"Directory reload failed, serving the previous snapshot: {str(e)}")
@@ -5,44 +5,43 @@ This service extracts EXIF metadata from images and validates GPS coordinates.
 """
 
 import os
+import asyncio
 import logging
-from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
 import piexif
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, Union
 from datetime import datetime
 from math import radians, cos, sin, asin, sqrt
 
+from services import http_client, geocode_cache
+from services.image_context import ImageContext, resolve
+
 logger = logging.getLogger(__name__)
 
 # Configuration
 LOCATION_RADIUS_KM = float(os.environ.get("LOCATION_RADIUS_KM", "10"))
+GEOCODE_TIMEOUT = float(os.environ.get("GEOCODE_TIMEOUT", "5"))
+
+# Nominatim API endpoint (Free, no API key needed)
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/reverse")
 
 
-def extract_exif(image_path: str) -> Dict:
+def extract_exif(image_path: Union[str, ImageContext]) -> Dict:
     """
     Extract all EXIF metadata from an image.
     
     Args:
-        image_path: Absolute path to the image file
+        image_path: Absolute path to the image file, or its ImageContext
         
     Returns:
         dict: EXIF metadata or empty dict if not available
     """
     try:
-        image = Image.open(image_path)
-        exif_data = image._getexif()
+        decoded_exif = resolve(image_path).exif
         
-        if not exif_data:
+        if not decoded_exif:
             logger.info(f"No EXIF data found in image: {image_path}")
             return {}
         
-        # Decode EXIF tags
-        decoded_exif = {}
-        for tag_id, value in exif_data.items():
-            tag = TAGS.get(tag_id, tag_id)
-            decoded_exif[tag] = value
-        
         return decoded_exif
         
     except Exception as e:
@@ -50,12 +49,12 @@ def extract_exif(image_path: str) -> Dict:
         return {}
 
 
-def extract_gps_coordinates(image_path: str) -> Optional[Tuple[float, float]]:
+def extract_gps_coordinates(image_path: Union[str, ImageContext]) -> Optional[Tuple[float, float]]:
     """
     Extract GPS coordinates from image EXIF data.
     
     Args:
-        image_path: Absolute path to the image file
+        image_path: Absolute path to the image file, or its ImageContext
         
     Returns:
         tuple: (latitude, longitude) or None if GPS data not available
@@ -64,7 +63,7 @@ def extract_gps_coordinates(image_path: str) -> Optional[Tuple[float, float]]:
         print(f"\n🗺️  GPS EXTRACTION DEBUG:")
         print(f"   Image: {image_path}")
         
-        exif_dict = piexif.load(image_path)
+        exif_dict = resolve(image_path).piexif_dict()
         
         print(f"   EXIF keys found: {list(exif_dict.keys())}")
         
@@ -135,12 +134,12 @@ def _convert_to_degrees(value):
     return d + (m / 60.0) + (s / 3600.0)
 
 
-def extract_timestamp(image_path: str) -> Optional[datetime]:
+def extract_timestamp(image_path: Union[str, ImageContext]) -> Optional[datetime]:
     """
     Extract the timestamp when the image was taken.
     
     Args:
-        image_path: Absolute path to the image file
+        image_path: Absolute path to the image file, or its ImageContext
         
     Returns:
         datetime: Image capture timestamp or None
@@ -229,12 +228,12 @@ def validate_location(
     return is_valid
 
 
-def extract_camera_info(image_path: str) -> Dict[str, Optional[str]]:
+def extract_camera_info(image_path: Union[str, ImageContext]) -> Dict[str, Optional[str]]:
     """
     Extract camera/device information from EXIF data.
     
     Args:
-        image_path: Absolute path to the image file
+        image_path: Absolute path to the image file, or its ImageContext
         
     Returns:
         dict: Camera make and model
@@ -252,10 +251,13 @@ def extract_camera_info(image_path: str) -> Dict[str, Optional[str]]:
         return {"camera_make": None, "camera_model": None}
 
 
-def reverse_geocode(latitude: float, longitude: float) -> Optional[Dict[str, str]]:
+async def reverse_geocode(latitude: float, longitude: float) -> Optional[Dict[str, str]]:
     """
     Convert GPS coordinates to human-readable address using OpenStreetMap Nominatim API.
     
+    Addresses are cached per ~150 m cell (see geocode_cache), so nearby complaints
+    are answered locally and Nominatim's rate limit is respected.
+    
     Args:
         latitude: GPS latitude
         longitude: GPS longitude
@@ -271,91 +273,13 @@ def reverse_geocode(latitude: float, longitude: float) -> Optional[Dict[str, str
             }
     """
     try:
-        import requests
-        
-        # Nominatim API endpoint (Free, no API key needed)
-        url = "https://nominatim.openstreetmap.org/reverse"
-        
-        params = {
-            'lat': latitude,
-            'lon': longitude,
-            'format': 'json',
-            'addressdetails': 1,
-            'zoom': 18  # Get detailed address
-        }
-        
-        headers = {
-            'User-Agent': 'GrievanceGenie/1.0'  # Required by Nominatim
-        }
-        
-        print(f"\n🗺️  REVERSE GEOCODING:")
-        print(f"   Coordinates: ({latitude}, {longitude})")
-        
-        response = requests.get(url, params=params, headers=headers, timeout=5)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        if 'error' in data:
-            print(f"   ❌ Geocoding error: {data.get('error')}")
-            return None
+        return await geocode_cache.lookup(latitude, longitude, fetch_address)
         
-        # Extract address components
-        address_data = data.get('address', {})
-        
-        # Build formatted address
-        address_parts = []
-        
-        # Add road/street
-        if 'road' in address_data:
-            address_parts.append(address_data['road'])
-        
-        # Add suburb/neighborhood
-        if 'suburb' in address_data:
-            address_parts.append(address_data['suburb'])
-        elif 'neighbourhood' in address_data:
-            address_parts.append(address_data['neighbourhood'])
-        
-        # Add city
-        city = (address_data.get('city') or 
-                address_data.get('town') or 
-                address_data.get('village') or
-                address_data.get('county'))
-        
-        if city:
-            address_parts.append(city)
-        
-        # Add state
-        state = address_data.get('state')
-        if state:
-            address_parts.append(state)
-        
-        # Add country
-        country = address_data.get('country')
-        
-        # Add postcode
-        postcode = address_data.get('postcode')
-        
-        formatted_address = ', '.join(address_parts)
-        if country:
-            formatted_address += f", {country}"
-        if postcode:
-            formatted_address += f" - {postcode}"
-        
-        result = {
-            "address": formatted_address or data.get('display_name', 'Address not found'),
-            "city": city,
-            "state": state,
-            "country": country,
-            "postcode": postcode
-        }
-        
-        print(f"   ✅ Address: {result['address']}")
-        logger.info(f"Reverse geocoded: {result['address']}")
-        
-        return result
-        
-    except requests.exceptions.Timeout:
+    except geocode_cache.GeocodeRateLimited:
+        print(f"   ⚠️  Geocoding skipped: Nominatim rate limit reached")
+        logger.warning("Reverse geocoding skipped: rate limit reached")
+        return None
+    except asyncio.TimeoutError:
         print(f"   ⚠️  Geocoding timeout")
         logger.warning("Reverse geocoding timeout")
         return None
@@ -363,3 +287,103 @@ def reverse_geocode(latitude: float, longitude: float) -> Optional[Dict[str, str
         print(f"   ❌ Geocoding failed: {str(e)}")
         logger.error(f"Reverse geocoding failed: {str(e)}")
         return None
+
+
+async def fetch_address(latitude: float, longitude: float) -> Optional[Dict[str, str]]:
+    """
+    Reverse geocode coordinates with a Nominatim request (uncached).
+    
+    Args:
+        latitude: GPS latitude
+        longitude: GPS longitude
+        
+    Returns:
+        dict: Address information (as reverse_geocode), or None if Nominatim
+            has no address for the coordinates
+        
+    Raises:
+        Exception: On timeouts and HTTP errors
+    """
+    params = {
+        'lat': latitude,
+        'lon': longitude,
+        'format': 'json',
+        'addressdetails': 1,
+        'zoom': 18  # Get detailed address
+    }
+    
+    headers = {
+        'User-Agent': 'GrievanceGenie/1.0'  # Required by Nominatim
+    }
+    
+    print(f"\n🗺️  REVERSE GEOCODING:")
+    print(f"   Coordinates: ({latitude}, {longitude})")
+    
+    async with http_client.request(
+        "GET",
+        NOMINATIM_URL,
+        params=params,
+        headers=headers,
+        timeout=GEOCODE_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        data = await response.json(content_type=None)
+    
+    if 'error' in data:
+        print(f"   ❌ Geocoding error: {data.get('error')}")
+        return None
+    
+    # Extract address components
+    address_data = data.get('address', {})
+    
+    # Build formatted address
+    address_parts = []
+    
+    # Add road/street
+    if 'road' in address_data:
+        address_parts.append(address_data['road'])
+    
+    # Add suburb/neighborhood
+    if 'suburb' in address_data:
+        address_parts.append(address_data['suburb'])
+    elif 'neighbourhood' in address_data:
+        address_parts.append(address_data['neighbourhood'])
+    
+    # Add city
+    city = (address_data.get('city') or 
+            address_data.get('town') or 
+            address_data.get('village') or
+            address_data.get('county'))
+    
+    if city:
+        address_parts.append(city)
+    
+    # Add state
+    state = address_data.get('state')
+    if state:
+        address_parts.append(state)
+    
+    # Add country
+    country = address_data.get('country')
+    
+    # Add postcode
+    postcode = address_data.get('postcode')
+    
+    formatted_address = ', '.join(address_parts)
+    if country:
+        formatted_address += f", {country}"
+    if postcode:
+        formatted_address += f" - {postcode}"
+    
+    result = {
+        "address": formatted_address or data.get('display_name', 'Address not found'),
+        "city": city,
+        "state": state,
+        "country": country,
+        "postcode": postcode
+    }
+    
+    print(f"   ✅ Address: {result['address']}")
+    logger.info(f"Reverse geocoded: {result['address']}")
+    
+    return result
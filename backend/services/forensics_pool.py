@@ -0,0 +1,167 @@
+"""
+Forensics Pool - Process Pool for CPU-Heavy Image Forensics
+
+Image source forensics (pixel statistics over the full-resolution image, JPEG
+byte scans) is CPU bound and holds the GIL, so it runs in a dedicated pool of
+worker processes instead of the validation threads. Workers are started with the
+app and import PIL, NumPy and the forensics module once. Image bytes are handed
+over through shared memory rather than pickled into the task, and every task has
+a timeout.
+"""
+
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+FORENSICS_WORKERS = int(os.environ.get("FORENSICS_WORKERS", "0")) or os.cpu_count() or 1
+FORENSICS_TIMEOUT = float(os.environ.get("FORENSICS_TIMEOUT", "10"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# Per-worker state, set by _init_worker
+_worker_forensics = None
+
+
+def _init_worker() -> None:
+    """Warm a worker process: import the heavy modules and build the classifier once."""
+    global _worker_forensics
+
+    import numpy  # noqa: F401
+    from PIL import Image  # noqa: F401
+    from utils.imageForensics import ImageSourceForensics
+
+    _worker_forensics = ImageSourceForensics()
+
+
+def _ping() -> int:
+    """No-op task used to start and warm the workers."""
+    return os.getpid()
+
+
+def _classify_shared(shm_name: str, size: int, filename: str) -> Dict:
+    """
+    Worker task: classify an image whose bytes are in a shared memory block.
+
+    Returns:
+        dict: ImageSourceForensics.classify_image result
+    """
+    from services.image_context import ImageContext
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        image_buffer = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+
+    context = ImageContext(image_buffer, filename=filename)
+    return _worker_forensics.classify_image(image_buffer, context, filename)
+
+
+def is_running() -> bool:
+    """Whether the forensics pool has been started."""
+    return _pool is not None
+
+
+async def start_pool(workers: Optional[int] = None) -> int:
+    """
+    Start the forensics worker processes and wait until they are warm.
+    Should be called during app startup.
+
+    Args:
+        workers: Number of worker processes (defaults to FORENSICS_WORKERS)
+
+    Returns:
+        int: Number of worker processes
+    """
+    global _pool
+
+    if _pool is not None:
+        return _pool._max_workers
+
+    workers = workers or FORENSICS_WORKERS
+    # spawn: forking a process that already runs an event loop and client threads is unsafe
+    _pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    )
+
+    # Workers are spawned on demand; submit one no-op per worker to start them all now
+    await asyncio.gather(*(asyncio.wrap_future(_pool.submit(_ping)) for _ in range(workers)))
+
+    logger.info(f"Forensics pool started with {workers} worker process(es)")
+    return workers
+
+
+async def shutdown_pool() -> None:
+    """
+    Stop the forensics worker processes.
+    Should be called during app shutdown.
+    """
+    global _pool
+
+    if _pool is None:
+        return
+
+    pool, _pool = _pool, None
+    await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+    logger.info("Forensics pool stopped")
+
+
+async def classify(image_buffer: bytes, filename: str, timeout: Optional[float] = None) -> Dict:
+    """
+    Classify an image's source in the forensics pool.
+
+    Args:
+        image_buffer: Raw image bytes
+        filename: Original filename of the upload
+        timeout: Seconds to wait for the result (defaults to FORENSICS_TIMEOUT)
+
+    Returns:
+        dict: ImageSourceForensics.classify_image result
+
+    Raises:
+        RuntimeError: If the pool has not been started
+        asyncio.TimeoutError: If the worker does not answer within the timeout
+    """
+    global _pool
+
+    if _pool is None:
+        raise RuntimeError("Forensics pool is not running")
+
+    pool = _pool
+    size = len(image_buffer)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        shm.buf[:size] = image_buffer
+        future = pool.submit(_classify_shared, shm.name, size, filename)
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future),
+                timeout if timeout is not None else FORENSICS_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            # A task already running cannot be interrupted; it finishes in the
+            # background and its result is dropped
+            future.cancel()
+            logger.warning(f"Forensics timed out for {filename}")
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory) - replace the pool for later requests
+            if _pool is pool:
+                logger.error("Forensics pool broken, restarting it")
+                _pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+                await start_pool()
+            raise
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,373 @@
+"""
+Geocode Cache - Spatially Bucketed Reverse Geocoding Cache
+
+Reverse geocoding goes to Nominatim, which allows about one request per second.
+Complaints cluster inside the same wards, so addresses are cached per geohash
+cell (precision 7 = ~150 m x 150 m by default) instead of per exact coordinate.
+
+- An in-process LRU sits in front of the `geocode_cache` MongoDB collection
+  (the MongoDB tier is used once create_indexes() has run at app startup).
+- Concurrent lookups for the same cell share one upstream request (single-flight).
+- Upstream requests are spaced by a rate limiter; a lookup that would have to
+  wait too long for a slot gives up instead of queueing behind a burst. With
+  the MongoDB tier enabled the slots are reserved atomically on a shared
+  document, so the limit holds across all workers (their clocks are assumed to
+  be NTP-synced); otherwise, or while MongoDB is unreachable, each process
+  spaces its own requests.
+- Entries older than GEOCODE_REFRESH_AFTER are still served, and renewed in the
+  background (on access, and by the periodic refresher for MongoDB entries).
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from services.result_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+GEOCODE_CELL_PRECISION = int(os.environ.get("GEOCODE_CELL_PRECISION", "7"))
+GEOCODE_CACHE_MAX_ENTRIES = int(os.environ.get("GEOCODE_CACHE_MAX_ENTRIES", "10000"))
+GEOCODE_REFRESH_AFTER = float(os.environ.get("GEOCODE_REFRESH_AFTER_DAYS", "30")) * 86400
+GEOCODE_MAX_AGE = float(os.environ.get("GEOCODE_MAX_AGE_DAYS", "365")) * 86400
+GEOCODE_RATE_PER_SECOND = float(os.environ.get("GEOCODE_RATE_PER_SECOND", "1"))
+GEOCODE_MAX_WAIT = float(os.environ.get("GEOCODE_MAX_WAIT", "3"))
+GEOCODE_REFRESH_INTERVAL = float(os.environ.get("GEOCODE_REFRESH_INTERVAL", "3600"))
+GEOCODE_REFRESH_BATCH = int(os.environ.get("GEOCODE_REFRESH_BATCH", "30"))
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+geocode_cache_collection = db.geocode_cache
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Limiter document shared by all workers (not a geohash, so never a cell)
+_SLOT_DOCUMENT_ID = "_upstream_slot"
+
+# Reverse geocoder: (latitude, longitude) -> address dict, or None when there is
+# no address there. Raises on transport errors, which are not cached.
+Fetcher = Callable[[float, float], Awaitable[Optional[Dict]]]
+
+_store_ready = False
+# cell -> {"result", "fetched_at", "latitude", "longitude"}
+_memory = LRUCache(max_entries=GEOCODE_CACHE_MAX_ENTRIES)
+# cell -> task fetching it
+_in_flight: Dict[str, asyncio.Task] = {}
+# Monotonic time of the next free upstream request slot in this process
+_next_slot = 0.0
+
+
+class GeocodeRateLimited(Exception):
+    """Raised when no upstream request slot is free within GEOCODE_MAX_WAIT."""
+
+
+def geohash(latitude: float, longitude: float, precision: Optional[int] = None) -> str:
+    """
+    Encode coordinates as a geohash cell.
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+        precision: Cell length in characters (defaults to GEOCODE_CELL_PRECISION)
+
+    Returns:
+        str: Geohash of the cell containing the point
+    """
+    precision = precision or GEOCODE_CELL_PRECISION
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    cell = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(cell) < precision:
+        # Bits alternate between longitude and latitude, longitude first
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = (bits << 1) | 1
+            bounds[0] = middle
+        else:
+            bits <<= 1
+            bounds[1] = middle
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            cell.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(cell)
+
+
+def _reserve_local_slot() -> float:
+    """
+    Reserve the next upstream request slot of this process.
+
+    Reserving happens without an await in between, so concurrent callers get
+    distinct slots.
+
+    Returns:
+        float: Seconds until the slot
+
+    Raises:
+        GeocodeRateLimited: If the slot is more than GEOCODE_MAX_WAIT away
+    """
+    global _next_slot
+
+    now = time.monotonic()
+    slot = max(now, _next_slot)
+    if slot - now > GEOCODE_MAX_WAIT:
+        raise GeocodeRateLimited(f"No geocoding slot within {GEOCODE_MAX_WAIT:g}s")
+
+    _next_slot = slot + 1.0 / GEOCODE_RATE_PER_SECOND
+    return slot - now
+
+
+async def _reserve_shared_slot() -> Optional[float]:
+    """
+    Reserve the next upstream request slot shared by all workers in MongoDB.
+
+    The limiter document holds the wall-clock time of the next free slot. A
+    single find_one_and_update moves it on by one interval, and only while it
+    is at most GEOCODE_MAX_WAIT away, so a refused lookup does not use up a slot.
+
+    Returns:
+        float: Seconds until the slot, or None if MongoDB could not be reached
+
+    Raises:
+        GeocodeRateLimited: If the slot is more than GEOCODE_MAX_WAIT away
+    """
+    interval = 1.0 / GEOCODE_RATE_PER_SECOND
+    now = time.time()
+
+    try:
+        # Two rounds: a worker may lose the race to create the document
+        for _ in range(2):
+            document = await geocode_cache_collection.find_one_and_update(
+                {"_id": _SLOT_DOCUMENT_ID, "next_slot": {"$lte": now + GEOCODE_MAX_WAIT}},
+                [{"$set": {"next_slot": {"$add": [{"$max": ["$next_slot", now]}, interval]}}}],
+                return_document=ReturnDocument.AFTER
+            )
+            if document is not None:
+                return document["next_slot"] - interval - now
+
+            try:
+                await geocode_cache_collection.insert_one({"_id": _SLOT_DOCUMENT_ID, "next_slot": now + interval})
+                return 0.0
+            except DuplicateKeyError:
+                continue
+    except Exception as e:
+        logger.warning(f"Shared geocoding rate limit unavailable, limiting this worker only: {str(e)}")
+        return None
+
+    raise GeocodeRateLimited(f"No geocoding slot within {GEOCODE_MAX_WAIT:g}s")
+
+
+async def _wait_for_slot() -> None:
+    """
+    Wait for the next upstream request slot.
+
+    Slots are handed out GEOCODE_RATE_PER_SECOND per second - across all
+    workers through MongoDB when the MongoDB tier is enabled, per process
+    otherwise.
+
+    Raises:
+        GeocodeRateLimited: If the slot is more than GEOCODE_MAX_WAIT away
+    """
+    delay = await _reserve_shared_slot() if _store_ready else None
+    if delay is None:
+        delay = _reserve_local_slot()
+
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def _is_stale(entry: Dict) -> bool:
+    return (datetime.utcnow() - entry["fetched_at"]).total_seconds() > GEOCODE_REFRESH_AFTER
+
+
+def _remember(cell: str, entry: Dict) -> None:
+    """Keep an entry in memory until it reaches GEOCODE_MAX_AGE."""
+    remaining = GEOCODE_MAX_AGE - (datetime.utcnow() - entry["fetched_at"]).total_seconds()
+    if remaining > 0:
+        _memory.set(cell, entry, remaining)
+
+
+async def _load(cell: str) -> Optional[Dict]:
+    """Read a cell from memory, then from MongoDB."""
+    entry = _memory.get(cell)
+    if entry is not None or not _store_ready:
+        return entry
+
+    try:
+        document = await geocode_cache_collection.find_one({"_id": cell})
+    except Exception as e:
+        logger.warning(f"Geocode cache lookup failed: {str(e)}")
+        return None
+
+    if document is None:
+        return None
+
+    entry = {key: document[key] for key in ("result", "fetched_at", "latitude", "longitude")}
+    _remember(cell, entry)
+    return entry
+
+
+async def _fetch(cell: str, latitude: float, longitude: float, fetch: Fetcher) -> Optional[Dict]:
+    """Geocode a cell upstream (rate limited) and store the result in both tiers."""
+    await _wait_for_slot()
+    result = await fetch(latitude, longitude)
+
+    entry = {"result": result, "fetched_at": datetime.utcnow(), "latitude": latitude, "longitude": longitude}
+    _remember(cell, entry)
+
+    if _store_ready:
+        try:
+            await geocode_cache_collection.replace_one({"_id": cell}, entry, upsert=True)
+        except Exception as e:
+            logger.warning(f"Geocode cache write failed: {str(e)}")
+
+    return result
+
+
+def _single_flight(cell: str, latitude: float, longitude: float, fetch: Fetcher) -> asyncio.Task:
+    """Return the task fetching a cell, starting one if none is running."""
+    task = _in_flight.get(cell)
+    if task is None or task.done():
+        task = asyncio.create_task(_fetch(cell, latitude, longitude, fetch))
+        _in_flight[cell] = task
+        task.add_done_callback(lambda done: _in_flight.pop(cell, None) if _in_flight.get(cell) is done else None)
+    return task
+
+
+def _refresh_in_background(cell: str, entry: Dict, fetch: Fetcher) -> None:
+    """Renew a stale entry without making the caller wait for it."""
+    if cell in _in_flight:
+        return
+
+    task = _single_flight(cell, entry["latitude"], entry["longitude"], fetch)
+
+    def log_failure(done: asyncio.Task) -> None:
+        if not done.cancelled() and done.exception() is not None:
+            logger.info(f"Background geocode refresh of {cell} failed: {str(done.exception())}")
+
+    task.add_done_callback(log_failure)
+
+
+async def lookup(latitude: float, longitude: float, fetch: Fetcher) -> Optional[Dict]:
+    """
+    Reverse geocode coordinates through the cache.
+
+    Args:
+        latitude: GPS latitude
+        longitude: GPS longitude
+        fetch: Upstream reverse geocoder used on a miss
+
+    Returns:
+        dict: The address of the coordinates' cell, or None if there is none
+
+    Raises:
+        GeocodeRateLimited: On a miss when the upstream rate limit is saturated
+        Exception: Whatever `fetch` raised on a miss (nothing is cached)
+    """
+    cell = geohash(latitude, longitude)
+
+    entry = await _load(cell)
+    if entry is not None:
+        if _is_stale(entry):
+            _refresh_in_background(cell, entry, fetch)
+        logger.debug(f"Geocode cache hit for cell {cell}")
+        return entry["result"]
+
+    # asyncio.shield: a caller giving up must not cancel the fetch others share
+    return await asyncio.shield(_single_flight(cell, latitude, longitude, fetch))
+
+
+async def refresh_stale(fetch: Fetcher, limit: Optional[int] = None) -> int:
+    """
+    Re-geocode the oldest stale MongoDB entries.
+
+    Args:
+        fetch: Upstream reverse geocoder
+        limit: Maximum entries renewed (defaults to GEOCODE_REFRESH_BATCH)
+
+    Returns:
+        int: Number of entries renewed
+    """
+    if not _store_ready:
+        return 0
+
+    cutoff = datetime.utcnow() - timedelta(seconds=GEOCODE_REFRESH_AFTER)
+    cursor = geocode_cache_collection.find(
+        {"fetched_at": {"$lt": cutoff}},
+        {"latitude": 1, "longitude": 1}
+    ).sort("fetched_at", 1).limit(limit or GEOCODE_REFRESH_BATCH)
+
+    refreshed = 0
+    async for document in cursor:
+        try:
+            await _single_flight(document["_id"], document["latitude"], document["longitude"], fetch)
+            refreshed += 1
+        except GeocodeRateLimited:
+            # Live lookups are using the rate budget - continue next round
+            break
+        except Exception as e:
+            logger.info(f"Geocode refresh of {document['_id']} failed: {str(e)}")
+
+    return refreshed
+
+
+async def run_refresher(fetch: Fetcher, interval: Optional[float] = None) -> None:
+    """
+    Periodically renew stale entries (runs until cancelled).
+    Should be started as a background task during app startup.
+    """
+    interval = interval or GEOCODE_REFRESH_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            refreshed = await refresh_stale(fetch)
+            if refreshed:
+                logger.info(f"Refreshed {refreshed} stale geocode cache entries")
+        except Exception as e:
+            logger.error(f"Geocode cache refresh failed: {str(e)}")
+
+
+def clear() -> None:
+    """Empty the in-process tier and reset the rate limiter."""
+    global _next_slot
+    _memory.clear()
+    _in_flight.clear()
+    _next_slot = 0.0
+
+
+async def create_indexes() -> bool:
+    """
+    Create the geocode cache indexes and enable the MongoDB tier.
+    Should be called during app initialization.
+
+    Returns:
+        bool: True if the MongoDB tier is enabled
+    """
+    global _store_ready
+
+    try:
+        await geocode_cache_collection.create_index([("fetched_at", 1)])
+        _store_ready = True
+        logger.info("Created indexes for geocode_cache collection")
+    except Exception as e:
+        logger.error(f"Failed to create geocode cache indexes, using the in-process cache only: {str(e)}")
+
+    return _store_ready
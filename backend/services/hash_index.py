@@ -0,0 +1,178 @@
+"""
+Hash Index - In-Memory Hamming-Space Index for Perceptual Hashes
+
+This module keeps 64-bit pHashes in a contiguous NumPy uint64 array. A radius query
+XORs the query against the whole array and counts bits with a vectorized popcount,
+so every distance is computed in a single call (~8 bytes per stored hash).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.bit_ops import popcount
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+_INITIAL_CAPACITY = 1024
+_INT64_OFFSET = 1 << 64
+
+
+def hex_to_int(hash_hex: str) -> int:
+    """Convert a hexadecimal pHash string to its integer value."""
+    return int(hash_hex, 16)
+
+
+def int_to_hex(hash_int: int, bits: int = HASH_BITS) -> str:
+    """Convert an integer pHash back to the zero-padded hexadecimal form."""
+    return format(hash_int, f"0{bits // 4}x")
+
+
+def to_int64(hash_int: int) -> int:
+    """
+    Map an unsigned 64-bit hash to a signed int64 for storage.
+    MongoDB (BSON) has no unsigned 64-bit type, so the bit pattern is stored as int64.
+    """
+    return hash_int - _INT64_OFFSET if hash_int >= 1 << 63 else hash_int
+
+
+def from_int64(stored: int) -> int:
+    """Map a stored signed int64 back to the unsigned 64-bit hash."""
+    return stored + _INT64_OFFSET if stored < 0 else stored
+
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """Hamming distance between two integer hashes."""
+    return bin(hash1 ^ hash2).count("1")
+
+
+class HammingIndex:
+    """
+    Index answering Hamming radius queries over 64-bit hashes.
+
+    Entries are keyed (e.g. by issue_id) so they can be replaced or removed
+    incrementally. Each entry carries an arbitrary payload returned with matches.
+    Removal moves the last entry into the freed slot, keeping the array dense.
+    """
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        self._hashes = np.zeros(max(capacity, 1), dtype=np.uint64)
+        self._keys: List[str] = []
+        self._payloads: List[Any] = []
+        # key -> slot in the arrays above
+        self._slots: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the hash array."""
+        return self._hashes.nbytes
+
+    def _reserve(self, size: int) -> None:
+        """Grow the hash array (geometrically) to hold at least `size` entries."""
+        if size <= len(self._hashes):
+            return
+        grown = np.zeros(max(size, len(self._hashes) * 2), dtype=np.uint64)
+        grown[:len(self._keys)] = self._hashes[:len(self._keys)]
+        self._hashes = grown
+
+    def add(self, key: str, hash_int: int, payload: Any = None) -> None:
+        """
+        Add or replace an entry.
+
+        Args:
+            key: Unique entry key
+            hash_int: Unsigned 64-bit hash value
+            payload: Data returned with search matches
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = len(self._keys)
+            self._reserve(slot + 1)
+            self._keys.append(key)
+            self._payloads.append(payload)
+            self._slots[key] = slot
+        else:
+            self._payloads[slot] = payload
+        self._hashes[slot] = hash_int
+
+    def add_many(self, entries: List[Tuple[str, int, Any]]) -> None:
+        """
+        Add or replace many entries at once.
+
+        Args:
+            entries: (key, hash_int, payload) tuples
+        """
+        self._reserve(len(self._keys) + len(entries))
+        for key, hash_int, payload in entries:
+            self.add(key, hash_int, payload)
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove an entry.
+
+        Returns:
+            bool: True if the key was present
+        """
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return False
+
+        last = len(self._keys) - 1
+        if slot != last:
+            moved_key = self._keys[last]
+            self._keys[slot] = moved_key
+            self._payloads[slot] = self._payloads[last]
+            self._hashes[slot] = self._hashes[last]
+            self._slots[moved_key] = slot
+
+        self._keys.pop()
+        self._payloads.pop()
+        return True
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._keys.clear()
+        self._payloads.clear()
+        self._slots.clear()
+
+    def get(self, key: str) -> Optional[Tuple[int, Any]]:
+        """Return the (hash, payload) stored for a key, if any."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        return int(self._hashes[slot]), self._payloads[slot]
+
+    def distances(self, hash_int: int) -> np.ndarray:
+        """Hamming distance from a hash to every stored hash, in slot order."""
+        return popcount(self._hashes[:len(self._keys)] ^ np.uint64(hash_int))
+
+    def search(self, hash_int: int, radius: int) -> List[Tuple[str, int, Any]]:
+        """
+        Find all entries within a Hamming radius of a hash.
+
+        Args:
+            hash_int: Unsigned 64-bit hash to search for
+            radius: Maximum Hamming distance (inclusive)
+
+        Returns:
+            list: (key, distance, payload) tuples, closest first
+        """
+        if not self._keys:
+            return []
+
+        distances = self.distances(hash_int)
+        slots = np.flatnonzero(distances <= radius)
+        slots = slots[np.argsort(distances[slots], kind="stable")]
+
+        return [
+            (self._keys[slot], int(distances[slot]), self._payloads[slot])
+            for slot in slots.tolist()
+        ]
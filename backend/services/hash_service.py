@@ -5,17 +5,22 @@ This service generates perceptual hashes (pHash) for images and detects duplicat
 """
 
 import os
+import asyncio
 import logging
-from PIL import Image
 import imagehash
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+
+from services.image_context import ImageContext, resolve
+from services.hash_index import HammingIndex, hex_to_int, int_to_hex, to_int64, from_int64, hamming_distance
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 HASH_SIMILARITY_THRESHOLD = int(os.environ.get("HASH_SIMILARITY_THRESHOLD", "5"))
+HASH_INDEX_SYNC_SECONDS = float(os.environ.get("HASH_INDEX_SYNC_SECONDS", "30"))
 
 # MongoDB connection (will be initialized by main app)
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
@@ -23,19 +28,26 @@ client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ.get('DB_NAME', 'grievance_genie')]
 image_hashes_collection = db.image_hashes
 
+# In-process index of resolved hashes (built at startup, kept in sync on write)
+resolved_hash_index = HammingIndex()
+_index_ready = False
+_index_synced_at: Optional[datetime] = None
+
 
-def generate_phash(image_path: str) -> str:
+def generate_phash(image_path: Union[str, ImageContext]) -> str:
     """
     Generate perceptual hash (pHash) for an image.
     
     Args:
-        image_path: Absolute path to the image file
+        image_path: Absolute path to the image file, or its ImageContext
         
     Returns:
         str: Hexadecimal perceptual hash
     """
     try:
-        image = Image.open(image_path)
+        # pHash works on a 32x32 grayscale thumbnail (hash_size * 4), so reuse the
+        # context's shared downscaled image - imagehash leaves it as is
+        image = resolve(image_path).downscaled((32, 32))
         # Generate perceptual hash using imagehash library
         phash = imagehash.phash(image, hash_size=8)
         hash_str = str(phash)
@@ -60,21 +72,38 @@ def hash_distance(hash1: str, hash2: str) -> int:
         int: Hamming distance (0 = identical, higher = more different)
     """
     try:
-        h1 = imagehash.hex_to_hash(hash1)
-        h2 = imagehash.hex_to_hash(hash2)
-        distance = h1 - h2  # imagehash overloads the - operator for Hamming distance
-        
-        return distance
+        return hamming_distance(hex_to_int(hash1), hex_to_int(hash2))
         
     except Exception as e:
         logger.error(f"Failed to calculate hash distance: {str(e)}")
         return 999  # Return high distance on error
 
 
+def phash_to_int(hash_document: Dict) -> int:
+    """
+    Read the unsigned 64-bit hash of a stored hash document.
+    Uses the int64 'phash_int' field, falling back to the hex 'image_hash' for
+    documents written before it existed.
+    """
+    if hash_document.get("phash_int") is not None:
+        return from_int64(hash_document["phash_int"])
+    return hex_to_int(hash_document["image_hash"])
+
+
+def _similarity_score(distance: int, threshold: int) -> float:
+    """Normalize a Hamming distance to a 0-1 similarity score."""
+    if threshold <= 0:
+        return 1.0
+    return (threshold - distance) / threshold
+
+
 async def find_similar_hashes(phash: str, threshold: Optional[int] = None) -> List[Dict]:
     """
     Search for similar perceptual hashes in the database.
     
+    Uses the in-process Hamming index when it has been built, and falls back to
+    scanning the collection otherwise (e.g. in scripts that skip app startup).
+    
     Args:
         phash: Perceptual hash to search for
         threshold: Maximum Hamming distance for similarity (optional)
@@ -86,27 +115,19 @@ async def find_similar_hashes(phash: str, threshold: Optional[int] = None) -> Li
         threshold = HASH_SIMILARITY_THRESHOLD
     
     try:
-        # Get all stored hashes (only for resolved issues)
-        stored_hashes = await image_hashes_collection.find(
-            {"status": "resolved"}
-        ).to_list(10000)
-        
-        similar_hashes = []
-        
-        for stored_hash in stored_hashes:
-            distance = hash_distance(phash, stored_hash["image_hash"])
-            
-            if distance <= threshold:
-                similar_hashes.append({
-                    "issue_id": stored_hash["issue_id"],
-                    "image_hash": stored_hash["image_hash"],
-                    "similarity_score": (threshold - distance) / threshold,  # Normalize to 0-1
+        if _index_ready:
+            similar_hashes = [
+                {
+                    "issue_id": issue_id,
+                    "image_hash": int_to_hex(resolved_hash_index.get(issue_id)[0]),
+                    "similarity_score": _similarity_score(distance, threshold),
                     "distance": distance,
-                    "created_at": stored_hash.get("created_at")
-                })
-        
-        # Sort by similarity (most similar first)
-        similar_hashes.sort(key=lambda x: x["distance"])
+                    "created_at": created_at
+                }
+                for issue_id, distance, created_at in resolved_hash_index.search(hex_to_int(phash), threshold)
+            ]
+        else:
+            similar_hashes = await _scan_similar_hashes(phash, threshold)
         
         if similar_hashes:
             logger.warning(f"Found {len(similar_hashes)} similar image(s) in database")
@@ -120,6 +141,137 @@ async def find_similar_hashes(phash: str, threshold: Optional[int] = None) -> Li
         return []
 
 
+async def _scan_similar_hashes(phash: str, threshold: int) -> List[Dict]:
+    """
+    Linear scan over all resolved hashes in the collection.
+    
+    Args:
+        phash: Perceptual hash to search for
+        threshold: Maximum Hamming distance for similarity
+        
+    Returns:
+        list: Matching hash documents, most similar first
+    """
+    similar_hashes = []
+    query_int = hex_to_int(phash)
+    
+    cursor = image_hashes_collection.find(
+        {"status": "resolved"},
+        {"issue_id": 1, "image_hash": 1, "phash_int": 1, "created_at": 1}
+    )
+    async for stored_hash in cursor:
+        distance = hamming_distance(query_int, phash_to_int(stored_hash))
+        
+        if distance <= threshold:
+            similar_hashes.append({
+                "issue_id": stored_hash["issue_id"],
+                "image_hash": stored_hash["image_hash"],
+                "similarity_score": _similarity_score(distance, threshold),
+                "distance": distance,
+                "created_at": stored_hash.get("created_at")
+            })
+    
+    # Sort by similarity (most similar first)
+    similar_hashes.sort(key=lambda x: x["distance"])
+    return similar_hashes
+
+
+def _apply_to_index(hash_document: Dict) -> None:
+    """
+    Reflect a stored hash document in the in-process index.
+    Only 'resolved' hashes are used for duplicate detection.
+    """
+    issue_id = hash_document.get("issue_id")
+    if not issue_id:
+        return
+    
+    if hash_document.get("status") == "resolved" and (
+        hash_document.get("phash_int") is not None or hash_document.get("image_hash")
+    ):
+        resolved_hash_index.add(
+            issue_id,
+            phash_to_int(hash_document),
+            hash_document.get("created_at")
+        )
+    else:
+        resolved_hash_index.remove(issue_id)
+
+
+async def build_index() -> int:
+    """
+    Build the in-process hash index from all resolved hashes in the collection.
+    Should be called during app initialization.
+    
+    Returns:
+        int: Number of indexed hashes
+    """
+    global _index_ready, _index_synced_at
+    
+    started_at = datetime.utcnow()
+    resolved_hash_index.clear()
+    
+    try:
+        cursor = image_hashes_collection.find(
+            {"status": "resolved"},
+            {"issue_id": 1, "image_hash": 1, "phash_int": 1, "status": 1, "created_at": 1}
+        ).batch_size(5000)
+        async for hash_document in cursor:
+            _apply_to_index(hash_document)
+        
+        _index_synced_at = started_at
+        _index_ready = True
+        logger.info(f"Built hash index with {len(resolved_hash_index)} resolved hash(es)")
+        
+    except Exception as e:
+        logger.error(f"Failed to build hash index: {str(e)}")
+    
+    return len(resolved_hash_index)
+
+
+async def sync_index() -> int:
+    """
+    Apply hash documents changed since the last sync to the in-process index.
+    Picks up writes made by other worker processes.
+    
+    Returns:
+        int: Number of changed documents applied
+    """
+    global _index_synced_at
+    
+    if not _index_ready:
+        await build_index()
+        return len(resolved_hash_index)
+    
+    started_at = datetime.utcnow()
+    applied = 0
+    
+    cursor = image_hashes_collection.find(
+        {"updated_at": {"$gte": _index_synced_at}},
+        {"issue_id": 1, "image_hash": 1, "phash_int": 1, "status": 1, "created_at": 1}
+    )
+    async for hash_document in cursor:
+        _apply_to_index(hash_document)
+        applied += 1
+    
+    _index_synced_at = started_at
+    if applied:
+        logger.info(f"Synced {applied} hash change(s) into the hash index")
+    return applied
+
+
+async def run_index_sync() -> None:
+    """
+    Background task that periodically syncs the hash index.
+    Should be started during app initialization and cancelled on shutdown.
+    """
+    while True:
+        await asyncio.sleep(HASH_INDEX_SYNC_SECONDS)
+        try:
+            await sync_index()
+        except Exception as e:
+            logger.error(f"Hash index sync failed: {str(e)}")
+
+
 async def store_hash(issue_id: str, phash: str, image_path: str, status: str = "pending") -> None:
     """
     Store perceptual hash in database.
@@ -131,12 +283,15 @@ async def store_hash(issue_id: str, phash: str, image_path: str, status: str = "
         status: Issue status (only 'resolved' issues are used for duplicate detection)
     """
     try:
+        now = datetime.utcnow()
         hash_document = {
             "issue_id": issue_id,
             "image_hash": phash,
+            "phash_int": to_int64(hex_to_int(phash)),
             "image_path": image_path,
             "status": status,
-            "created_at": datetime.utcnow()
+            "created_at": now,
+            "updated_at": now
         }
         
         # Upsert: update if exists, insert if not
@@ -145,6 +300,7 @@ async def store_hash(issue_id: str, phash: str, image_path: str, status: str = "
             {"$set": hash_document},
             upsert=True
         )
+        _apply_to_index(hash_document)
         
         logger.info(f"Stored hash for issue {issue_id} with status '{status}'")
         
@@ -163,10 +319,14 @@ async def update_hash_status(issue_id: str, status: str) -> None:
         status: New status ('resolved', 'rejected', etc.)
     """
     try:
-        await image_hashes_collection.update_one(
+        hash_document = await image_hashes_collection.find_one_and_update(
             {"issue_id": issue_id},
-            {"$set": {"status": status}}
+            {"$set": {"status": status, "updated_at": datetime.utcnow()}},
+            projection={"issue_id": 1, "image_hash": 1, "phash_int": 1, "status": 1, "created_at": 1},
+            return_document=ReturnDocument.AFTER
         )
+        if hash_document:
+            _apply_to_index(hash_document)
         
         logger.info(f"Updated hash status for issue {issue_id} to '{status}'")
         
@@ -174,6 +334,55 @@ async def update_hash_status(issue_id: str, status: str) -> None:
         logger.error(f"Failed to update hash status: {str(e)}")
 
 
+async def migrate_hex_hashes(batch_size: int = 1000) -> int:
+    """
+    Backfill the int64 'phash_int' field on hash documents that only have the
+    hex 'image_hash'. Idempotent - documents already migrated are skipped.
+    Should be called during app initialization, before build_index.
+    
+    Args:
+        batch_size: Number of documents updated per bulk write
+        
+    Returns:
+        int: Number of migrated documents
+    """
+    migrated = 0
+    operations = []
+    
+    try:
+        cursor = image_hashes_collection.find(
+            {"phash_int": {"$exists": False}, "image_hash": {"$type": "string"}},
+            {"image_hash": 1}
+        ).batch_size(batch_size)
+        async for hash_document in cursor:
+            try:
+                phash_int = to_int64(hex_to_int(hash_document["image_hash"]))
+            except ValueError:
+                logger.warning(f"Skipping malformed hash {hash_document['image_hash']!r}")
+                continue
+            
+            operations.append(UpdateOne(
+                {"_id": hash_document["_id"]},
+                {"$set": {"phash_int": phash_int}}
+            ))
+            if len(operations) >= batch_size:
+                await image_hashes_collection.bulk_write(operations, ordered=False)
+                migrated += len(operations)
+                operations = []
+        
+        if operations:
+            await image_hashes_collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+        
+        if migrated:
+            logger.info(f"Migrated {migrated} hex hash(es) to int64")
+        
+    except Exception as e:
+        logger.error(f"Failed to migrate hex hashes: {str(e)}")
+    
+    return migrated
+
+
 async def create_indexes():
     """
     Create database indexes for efficient hash lookups.
@@ -183,6 +392,7 @@ async def create_indexes():
         await image_hashes_collection.create_index("issue_id", unique=True)
         await image_hashes_collection.create_index([("created_at", -1)])
         await image_hashes_collection.create_index("status")
+        await image_hashes_collection.create_index([("updated_at", 1)])
         
         logger.info("Created indexes for image_hashes collection")
         
@@ -0,0 +1,101 @@
+"""
+HTTP Client - Shared Async HTTP Session
+
+This service owns the single pooled, keep-alive aiohttp session used for outbound
+API calls (Sightengine, Nominatim). The session is opened and closed by the app
+lifespan so connections are reused across requests instead of per call.
+"""
+
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.environ.get("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_MAX_IN_FLIGHT = int(os.environ.get("HTTP_MAX_IN_FLIGHT", "50"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "30"))
+
+_session: Optional[aiohttp.ClientSession] = None
+_in_flight: Optional[asyncio.Semaphore] = None
+
+
+async def start_session() -> aiohttp.ClientSession:
+    """
+    Create the shared HTTP session.
+    Should be called during app startup.
+
+    Returns:
+        aiohttp.ClientSession: The shared session
+    """
+    global _session, _in_flight
+
+    if _session is not None and not _session.closed:
+        return _session
+
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_MAX_CONNECTIONS,
+        limit_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300
+    )
+    _session = aiohttp.ClientSession(connector=connector)
+    _in_flight = asyncio.Semaphore(HTTP_MAX_IN_FLIGHT)
+
+    logger.info(
+        f"HTTP session started (max {HTTP_MAX_CONNECTIONS} connections, "
+        f"{HTTP_MAX_CONNECTIONS_PER_HOST} per host, {HTTP_MAX_IN_FLIGHT} in flight)"
+    )
+    return _session
+
+
+async def close_session() -> None:
+    """
+    Close the shared HTTP session.
+    Should be called during app shutdown.
+    """
+    global _session, _in_flight
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP session closed")
+
+    _session = None
+    _in_flight = None
+
+
+@asynccontextmanager
+async def request(method: str, url: str, timeout: float, **kwargs):
+    """
+    Make an outbound HTTP request through the shared session.
+
+    The number of concurrent outbound requests is capped by HTTP_MAX_IN_FLIGHT,
+    and connections per host by HTTP_MAX_CONNECTIONS_PER_HOST. The session is
+    created lazily if the app lifespan has not started it (e.g. in scripts).
+
+    Args:
+        method: HTTP method ('GET', 'POST', ...)
+        url: Request URL
+        timeout: Total timeout in seconds
+        **kwargs: Passed through to aiohttp (params, data, headers, ...)
+
+    Yields:
+        aiohttp.ClientResponse: The response
+    """
+    if _session is None or _session.closed:
+        await start_session()
+
+    async with _in_flight:
+        async with _session.request(
+            method,
+            url,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            **kwargs
+        ) as response:
+            yield response
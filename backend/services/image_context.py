@@ -0,0 +1,152 @@
+"""
+Image Context - Decode-Once Image State Shared Across Validators
+
+One ImageContext is built per upload and handed to every validation service.
+The raw bytes are held once. The decoded PIL image, parsed EXIF and derived
+arrays (grayscale, downscaled) are computed lazily on first use and cached, so
+the file is not reopened and re-decoded by each check.
+"""
+
+import io
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import piexif
+from PIL import Image, UnidentifiedImageError
+from PIL.ExifTags import TAGS
+
+logger = logging.getLogger(__name__)
+
+
+class ImageContext:
+    """
+    Per-upload image state shared by the validators.
+
+    Lazy values are thread-safe (validators run in worker threads concurrently).
+    Decoding failures are cached too and re-raised on each access, so a corrupt
+    upload is only parsed once.
+    """
+
+    def __init__(self, data: bytes, filename: Optional[str] = None, path: Optional[str] = None):
+        self.data = bytes(data)
+        self.filename = filename or (Path(path).name if path else "upload")
+        self.path = path
+        self._cache: Dict[str, Tuple[bool, Any]] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_path(cls, path: str, filename: Optional[str] = None) -> "ImageContext":
+        """Build a context by reading an image file once."""
+        return cls(Path(path).read_bytes(), filename=filename, path=str(path))
+
+    def __str__(self) -> str:
+        return self.path or self.filename
+
+    def _lazy(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Compute a value once (or cache the error it raised) and return it."""
+        with self._lock:
+            if name not in self._cache:
+                try:
+                    self._cache[name] = (True, factory())
+                except Exception as e:
+                    self._cache[name] = (False, e)
+
+            ok, value = self._cache[name]
+            if not ok:
+                raise value
+            return value
+
+    @property
+    def size(self) -> int:
+        """Size of the raw image in bytes."""
+        return len(self.data)
+
+    @property
+    def image(self) -> Image.Image:
+        """The fully decoded PIL image (treat as read-only)."""
+        def decode():
+            try:
+                image = Image.open(io.BytesIO(self.data))
+            except UnidentifiedImageError:
+                # Name the upload rather than the in-memory buffer in the error
+                raise UnidentifiedImageError(f"cannot identify image file {str(self)!r}") from None
+            image.load()
+            return image
+        return self._lazy("image", decode)
+
+    @property
+    def format(self) -> Optional[str]:
+        """PIL format name ('JPEG', 'PNG', ...)."""
+        return self.image.format
+
+    @property
+    def mime_type(self) -> str:
+        """MIME type of the image ('image/jpeg', ...)."""
+        return Image.MIME.get(self.format, "application/octet-stream")
+
+    @property
+    def dimensions(self) -> Tuple[int, int]:
+        """(width, height) of the image."""
+        return self.image.size
+
+    @property
+    def rgb(self) -> Image.Image:
+        """The image converted to RGB."""
+        return self._lazy("rgb", lambda: self.image if self.image.mode == "RGB" else self.image.convert("RGB"))
+
+    @property
+    def grayscale(self) -> Image.Image:
+        """The image converted to grayscale ('L')."""
+        return self._lazy("grayscale", lambda: self.image.convert("L"))
+
+    @property
+    def grayscale_array(self) -> np.ndarray:
+        """The grayscale image as a uint8 NumPy array (height x width)."""
+        return self._lazy("grayscale_array", lambda: np.asarray(self.grayscale))
+
+    def downscaled(self, size: Tuple[int, int]) -> Image.Image:
+        """The grayscale image resized to `size` with Lanczos resampling."""
+        return self._lazy(f"downscaled_{size[0]}x{size[1]}", lambda: self.grayscale.resize(size, Image.LANCZOS))
+
+    def piexif_dict(self) -> Dict:
+        """
+        EXIF as parsed by piexif.load.
+
+        Raises the piexif error when the image has no parseable EXIF container
+        (e.g. PNG), like piexif.load itself.
+        """
+        def load():
+            # piexif treats bytes it doesn't recognise as a file name, so reject
+            # other formats up front with the error piexif raises for files
+            data = self.data
+            if not (data[0:2] in (b"\xff\xd8", b"\x49\x49", b"\x4d\x4d")
+                    or (data[0:4] == b"RIFF" and data[8:12] == b"WEBP")
+                    or data[0:4] == b"Exif"):
+                raise piexif.InvalidImageDataError("Given file is neither JPEG nor TIFF.")
+            return piexif.load(data)
+        return self._lazy("piexif", load)
+
+    @property
+    def exif(self) -> Dict:
+        """EXIF tags decoded to their names via PIL, or {} if not available."""
+        def decode():
+            get_exif = getattr(self.image, "_getexif", None)
+            exif_data = get_exif() if get_exif else None
+            if not exif_data:
+                return {}
+            return {TAGS.get(tag_id, tag_id): value for tag_id, value in exif_data.items()}
+        return self._lazy("exif", decode)
+
+
+def resolve(source: Union[str, Path, ImageContext], filename: Optional[str] = None) -> ImageContext:
+    """
+    Return the ImageContext for a path or context.
+
+    Services accept either, so existing callers passing file paths keep working.
+    """
+    if isinstance(source, ImageContext):
+        return source
+    return ImageContext.from_path(str(source), filename=filename)
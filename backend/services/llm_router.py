@@ -0,0 +1,211 @@
+"""
+LLM Router - Pooled Gemini Model Handles with Circuit Breakers
+
+/api/chat asks a Gemini model for the next assistant turn. The model handles
+are created once (start_pool() at app startup) and every request goes to the
+healthiest model first:
+
+- Each model has a circuit breaker: after CHAT_BREAKER_FAILURES consecutive
+  failures (errors, timeouts, unparseable replies) it is skipped for
+  CHAT_BREAKER_COOLDOWN seconds, then a single trial request decides whether
+  it closes again.
+- Models with closed breakers are ranked by a health score built from moving
+  averages of their success rate and latency (configured order breaks
+  near-ties). Failures fade over CHAT_BREAKER_COOLDOWN-long half-lives, so a
+  demoted model is tried first again once it has had time to recover.
+- A whole request gets CHAT_LATENCY_BUDGET seconds across all models. When it
+  runs out, or no model is available, the rules-based fallback answers, so a
+  slow or failing upstream never costs more than the budget. Later models are
+  only tried with at least CHAT_MIN_MODEL_SLICE seconds left, and a timeout
+  only counts against a model that was given the whole budget - not one cut
+  short because an earlier model used most of it.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CHAT_MODELS = [
+    name.strip()
+    for name in os.environ.get("CHAT_MODELS", "gemini-2.5-flash,gemini-2.0-flash,gemini-1.5-flash").split(",")
+    if name.strip()
+]
+CHAT_LATENCY_BUDGET = float(os.environ.get("CHAT_LATENCY_BUDGET", "6"))
+CHAT_BREAKER_FAILURES = int(os.environ.get("CHAT_BREAKER_FAILURES", "3"))
+CHAT_BREAKER_COOLDOWN = float(os.environ.get("CHAT_BREAKER_COOLDOWN", "30"))
+# Seconds of budget a fallback model needs to be worth trying
+CHAT_MIN_MODEL_SLICE = float(os.environ.get("CHAT_MIN_MODEL_SLICE", "1"))
+
+# Weight of the moving averages given to the latest request
+HEALTH_ALPHA = 0.2
+# Score lost per CHAT_LATENCY_BUDGET of average latency
+LATENCY_PENALTY = 0.5
+
+
+class ModelHealth:
+    """A pooled model handle with its circuit breaker and health averages."""
+
+    def __init__(self, name: str, handle: Any):
+        self.name = name
+        self.handle = handle
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.success_rate = 1.0
+        self.latency = 0.0
+        self.updated_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        """'closed', 'half_open' (cooldown over, trial allowed) or 'open'."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= CHAT_BREAKER_COOLDOWN:
+            return "half_open"
+        return "open"
+
+    def score(self) -> float:
+        """Health score (1.0 = always answers instantly); past failures fade with time."""
+        fade = 0.5 ** ((time.monotonic() - self.updated_at) / CHAT_BREAKER_COOLDOWN) if CHAT_BREAKER_COOLDOWN else 0.0
+        success_rate = 1.0 - (1.0 - self.success_rate) * fade
+        return success_rate - LATENCY_PENALTY * self.latency / CHAT_LATENCY_BUDGET
+
+    def record_success(self, latency: float) -> None:
+        self.success_rate += HEALTH_ALPHA * (1.0 - self.success_rate)
+        self.updated_at = time.monotonic()
+        self.latency += HEALTH_ALPHA * (latency - self.latency)
+        self.consecutive_failures = 0
+        if self.opened_at is not None:
+            logger.info(f"Chat model {self.name} recovered, closing its circuit")
+        self.opened_at = None
+
+    def record_failure(self, latency: float) -> None:
+        self.success_rate -= HEALTH_ALPHA * self.success_rate
+        self.updated_at = time.monotonic()
+        self.latency += HEALTH_ALPHA * (latency - self.latency)
+        self.consecutive_failures += 1
+        if self.opened_at is not None or self.consecutive_failures >= CHAT_BREAKER_FAILURES:
+            if self.opened_at is None:
+                logger.warning(f"Chat model {self.name} failed {self.consecutive_failures} times, opening its circuit")
+            self.opened_at = time.monotonic()
+
+
+_pool: Optional[List[ModelHealth]] = None
+
+
+def start_pool(models: Optional[List[str]] = None) -> int:
+    """
+    Create one handle per chat model.
+    Should be called during app startup (otherwise done on first use).
+
+    Args:
+        models: Model names in order of preference (defaults to CHAT_MODELS)
+
+    Returns:
+        int: Number of pooled models (0 without a GEMINI_API_KEY)
+    """
+    global _pool
+
+    if not os.environ.get("GEMINI_API_KEY"):
+        logger.warning("GEMINI_API_KEY not set - chat uses the rules-based assistant only")
+        _pool = []
+        return 0
+
+    _pool = [ModelHealth(name, genai.GenerativeModel(name)) for name in (models or CHAT_MODELS)]
+    logger.info(f"Chat model pool ready: {', '.join(model.name for model in _pool)}")
+    return len(_pool)
+
+
+def ranked_models() -> List[ModelHealth]:
+    """Models to try for a request, healthiest first; open circuits are left out."""
+    if _pool is None:
+        start_pool()
+
+    closed = sorted(
+        (model for model in _pool if model.state == "closed"),
+        # Near-ties keep the configured order
+        key=lambda model: -round(model.score(), 2)
+    )
+    # One trial request at a time for a model whose cooldown is over
+    trials = [model for model in _pool if model.state == "half_open" and not model.trial_in_flight]
+    return closed + trials
+
+
+async def respond(prompt: str, parse: Callable[[str], Dict], fallback: Callable[[], Dict], budget: Optional[float] = None) -> Dict:
+    """
+    Answer a prompt with the healthiest available model within the latency budget.
+
+    Args:
+        prompt: Prompt sent to the model
+        parse: Turns the model's text into the result (raises if unusable)
+        fallback: Rules-based result, used when no model answers in time
+        budget: Seconds for the whole request (defaults to CHAT_LATENCY_BUDGET)
+
+    Returns:
+        dict: The parsed model result, or the fallback result
+    """
+    budget = budget or CHAT_LATENCY_BUDGET
+    deadline = time.monotonic() + budget
+
+    tried = 0
+    for model in ranked_models():
+        remaining = deadline - time.monotonic()
+        if tried and remaining < min(CHAT_MIN_MODEL_SLICE, budget):
+            logger.warning(f"Chat latency budget of {budget:g}s spent, using the fallback")
+            break
+
+        # Breaker state may have changed while earlier models were tried
+        state = model.state
+        if state == "open" or (state == "half_open" and model.trial_in_flight):
+            continue
+        trial = state == "half_open"
+        if trial:
+            model.trial_in_flight = True
+
+        # Only the first model tried gets the whole budget
+        whole_budget = not tried
+        tried += 1
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(model.handle.generate_content_async(prompt), timeout=remaining)
+            result = parse(response.text)
+        except asyncio.TimeoutError:
+            elapsed = time.monotonic() - started
+            if whole_budget:
+                model.record_failure(elapsed)
+            logger.warning(f"Chat model {model.name} timed out after {elapsed:.2f}s")
+            continue
+        except Exception as e:
+            elapsed = time.monotonic() - started
+            model.record_failure(elapsed)
+            logger.warning(f"Chat model {model.name} failed after {elapsed:.2f}s: {type(e).__name__} {str(e)}")
+            continue
+        finally:
+            if trial:
+                model.trial_in_flight = False
+
+        model.record_success(time.monotonic() - started)
+        return result
+
+    return fallback()
+
+
+def health() -> List[Dict]:
+    """Breaker state and health averages of each pooled model."""
+    return [
+        {
+            "model": model.name,
+            "state": model.state,
+            "consecutive_failures": model.consecutive_failures,
+            "success_rate": round(model.success_rate, 3),
+            "latency": round(model.latency, 3),
+        }
+        for model in (_pool or [])
+    ]
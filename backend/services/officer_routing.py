@@ -8,18 +8,35 @@ Fallback sequence:
 1. routing[ward][department] - Exact match
 2. routing[ward]["general"] - Ward general officer  
 3. routing["default_city"][department] - Department head (city-level)
-4. null - Mark as UNASSIGNED for manual routing
+4. routing["default_city"]["general"] - City admin
+5. null - Mark as UNASSIGNED for manual routing
+
+The configuration is compiled once into a flat (ward, department) -> officer
+table with every fallback already resolved, so assigning an officer is a
+dict lookup. Officer ids unknown to the officers directory are skipped when
+compiling (the next fallback level applies instead). The table is swapped
+atomically when routing_config.json changes on disk; a config that fails to
+load or compile leaves the current table in place.
 """
 
+import os
 import json
+import asyncio
 import logging
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services import directory_cache
 
 logger = logging.getLogger(__name__)
 
 # Load routing configuration
 CONFIG_PATH = Path(__file__).parent.parent / "config" / "routing_config.json"
+ROUTING_CONFIG_POLL_INTERVAL = float(os.environ.get("ROUTING_CONFIG_POLL_INTERVAL", "5"))
+
+CITY_KEY = "default_city"
+GENERAL = "general"
+
 
 def load_routing_config() -> Dict:
     """Load routing configuration from JSON file"""
@@ -35,8 +52,113 @@ def load_routing_config() -> Dict:
         logger.error(f"Invalid JSON in routing config: {e}")
         return {}
 
-# Global routing config (loaded once)
+
+class RoutingTable:
+    """Routing configuration compiled into flat lookups with fallbacks resolved."""
+
+    def __init__(
+        self,
+        routes: Dict[Tuple[int, str], Optional[str]],
+        ward_fallback: Dict[int, Optional[str]],
+        department_fallback: Dict[str, Optional[str]],
+        city_fallback: Optional[str],
+        unknown_officers: Set[str]
+    ):
+        self.routes = routes
+        self.ward_fallback = ward_fallback
+        self.department_fallback = department_fallback
+        self.city_fallback = city_fallback
+        self.unknown_officers = unknown_officers
+
+    def lookup(self, ward, department: str) -> Optional[str]:
+        """Officer id for a ward and department, or None if unassigned."""
+        ward = _ward_number(ward)
+        officer_id = self.routes.get((ward, department))
+        if officer_id is not None or (ward, department) in self.routes:
+            return officer_id
+        # Departments missing from the whole config
+        if ward in self.ward_fallback:
+            return self.ward_fallback[ward]
+        return self.department_fallback.get(department, self.city_fallback)
+
+
+def _ward_number(ward) -> Optional[int]:
+    try:
+        return int(ward)
+    except (TypeError, ValueError):
+        return None
+
+
+def compile_routing_table(config: Dict, known_officers: Optional[Set[str]] = None) -> RoutingTable:
+    """
+    Compile a routing configuration into a RoutingTable.
+
+    Args:
+        config: {"ward_<n>": {department: officer_id}, "default_city": {...}}
+        known_officers: Officer ids to route to (None routes to any id)
+
+    Returns:
+        RoutingTable: The compiled table
+
+    Raises:
+        ValueError: If the configuration is malformed
+    """
+    if not isinstance(config, dict):
+        raise ValueError("routing config must be an object of wards")
+
+    unknown = set()
+
+    def officer(entries: Dict, department: str) -> Optional[str]:
+        officer_id = entries.get(department)
+        if officer_id is None:
+            return None
+        if not isinstance(officer_id, str) or not officer_id:
+            raise ValueError(f"invalid officer id for {department}: {officer_id!r}")
+        if known_officers is not None and officer_id not in known_officers:
+            unknown.add(officer_id)
+            return None
+        return officer_id
+
+    wards = {}
+    for key, entries in config.items():
+        if not isinstance(entries, dict):
+            raise ValueError(f"{key} must map departments to officer ids")
+        if key == CITY_KEY:
+            continue
+        ward = _ward_number(key[len("ward_"):]) if key.startswith("ward_") else None
+        if ward is None:
+            raise ValueError(f"unexpected routing key {key!r} (expected ward_<number> or {CITY_KEY})")
+        wards[ward] = entries
+
+    city = config.get(CITY_KEY, {})
+    city_fallback = officer(city, GENERAL)
+    departments = set(city).union(*wards.values()) - {GENERAL}
+
+    department_fallback = {
+        department: officer(city, department) or city_fallback
+        for department in departments
+    }
+
+    routes = {}
+    ward_fallback = {}
+    for ward, entries in wards.items():
+        ward_general = officer(entries, GENERAL)
+        ward_fallback[ward] = ward_general or city_fallback
+        for department in departments:
+            routes[(ward, department)] = (
+                officer(entries, department) or ward_general or department_fallback[department]
+            )
+
+    return RoutingTable(routes, ward_fallback, department_fallback, city_fallback, unknown)
+
+
+# Global routing config and compiled table (swapped together on reload)
 ROUTING_CONFIG = load_routing_config()
+try:
+    ROUTING_TABLE = compile_routing_table(ROUTING_CONFIG)
+except ValueError as e:
+    logger.error(f"Invalid routing config: {e}")
+    ROUTING_TABLE = compile_routing_table({})
 
 
 def assign_officer(ward: int, department: str) -> Optional[str]:
@@ -49,53 +171,44 @@ def assign_officer(ward: int, department: str) -> Optional[str]:
         
     Returns:
         officer_id: Officer ID string, or None if no match found
-        
-    Fallback sequence:
-        1. routing[ward][department] - Exact match
-        2. routing[ward]["general"] - Ward general officer
-        3. routing["default_city"][department] - City-level department head
-        4. None - Mark as UNASSIGNED
     """
-    ward_key = f"ward_{ward}"
-    
-    logger.info(f"Routing complaint: Ward {ward}, Department {department}")
-    
-    # 1. Try exact match: ward + department
-    if ward_key in ROUTING_CONFIG:
-        ward_config = ROUTING_CONFIG[ward_key]
-        if department in ward_config:
-            officer_id = ward_config[department]
-            logger.info(f"✅ Exact match: {officer_id}")
-            return officer_id
-        
-        # 2. Try ward general officer
-        if "general" in ward_config:
-            officer_id = ward_config["general"]
-            logger.info(f"⚠️ Fallback to ward general: {officer_id}")
-            return officer_id
+    officer_id = ROUTING_TABLE.lookup(ward, department)
+    if officer_id is None:
+        logger.warning(f"❌ No officer found for Ward {ward}, Department {department}")
+    return officer_id
+
+
+def assign_officers(batch: Iterable[Tuple[int, str]]) -> List[Optional[str]]:
+    """
+    Assign officers to a batch of complaints against one routing table.
     
-    # 3. Try city-level department head
-    if "default_city" in ROUTING_CONFIG:
-        city_config = ROUTING_CONFIG["default_city"]
-        if department in city_config:
-            officer_id = city_config[department]
-            logger.info(f"⚠️ Fallback to city-level department head: {officer_id}")
-            return officer_id
+    Args:
+        batch: (ward, department) pairs
         
-        # Last resort: city admin
-        if "general" in city_config:
-            officer_id = city_config["general"]
-            logger.info(f"⚠️ Fallback to city admin: {officer_id}")
-            return officer_id
-    
-    # 4. No match found - mark as unassigned
-    logger.warning(f"❌ No officer found for Ward {ward}, Department {department}")
-    return None
+    Returns:
+        list: Officer ID (or None) per pair, in order
+    """
+    table = ROUTING_TABLE
+    return [table.lookup(ward, department) for ward, department in batch]
+
+
+def officer_summary(officer: Dict) -> Dict:
+    """Officer details attached to complaints, from an officer document."""
+    return {
+        "officer_id": officer.get("officer_id"),
+        "name": officer.get("name"),
+        "title": officer.get("title"),
+        "department": officer.get("department"),
+        "ward": officer.get("wards", [])[0] if officer.get("wards") else None,
+        "phone": officer.get("phone"),
+        "email": officer.get("email")
+    }
 
 
 async def get_officer_details(db, officer_id: str) -> Optional[Dict]:
     """
-    Fetch officer details from MongoDB.
+    Fetch officer details from the in-process directory, falling back to
+    MongoDB for officers added since the directory was last loaded.
     
     Args:
         db: MongoDB database instance
@@ -108,19 +221,13 @@ async def get_officer_details(db, officer_id: str) -> Optional[Dict]:
         return None
     
     try:
-        officer = await db.officers.find_one({"officer_id": officer_id})
+        officer = await directory_cache.get_officer(officer_id)
+        if officer is None:
+            officer = await db.officers.find_one({"officer_id": officer_id})
         
         if officer:
             logger.info(f"Found officer: {officer.get('name')} ({officer.get('title')})")
-            return {
-                "officer_id": officer.get("officer_id"),
-                "name": officer.get("name"),
-                "title": officer.get("title"),
-                "department": officer.get("department"),
-                "ward": officer.get("wards", [])[0] if officer.get("wards") else None,
-                "phone": officer.get("phone"),
-                "email": officer.get("email")
-            }
+            return officer_summary(officer)
         else:
             logger.warning(f"Officer ID {officer_id} not found in database")
             return None
@@ -130,8 +237,77 @@ async def get_officer_details(db, officer_id: str) -> Optional[Dict]:
         return None
 
 
-def reload_routing_config():
-    """Reload routing configuration (useful for testing/updates)"""
-    global ROUTING_CONFIG
-    ROUTING_CONFIG = load_routing_config()
-    logger.info("Routing configuration reloaded")
+def reload_routing_config(known_officers: Optional[Set[str]] = None) -> bool:
+    """
+    Reload and recompile the routing configuration from disk.
+    The current table is kept if the new configuration cannot be compiled.
+    
+    Args:
+        known_officers: Officer ids to route to (None routes to any id)
+        
+    Returns:
+        bool: True if the new table is in use
+    """
+    global ROUTING_CONFIG, ROUTING_TABLE
+    
+    config = load_routing_config()
+    if not config:
+        logger.error("Routing config empty or unreadable, keeping the current routing table")
+        return False
+    try:
+        table = compile_routing_table(config, known_officers)
+    except ValueError as e:
+        logger.error(f"Invalid routing config, keeping the current routing table: {e}")
+        return False
+    
+    if table.unknown_officers:
+        logger.warning(f"Routing config names unknown officers (routed to fallbacks): {sorted(table.unknown_officers)}")
+    
+    ROUTING_CONFIG, ROUTING_TABLE = config, table
+    logger.info(f"Routing configuration reloaded: {len(table.routes)} ward/department routes")
+    return True
+
+
+async def reload_validated() -> bool:
+    """
+    Reload the routing configuration, validated against the officers directory.
+    Officer validation is skipped while the directory has no officers.
+    
+    Returns:
+        bool: True if the new table is in use
+    """
+    try:
+        known_officers = {officer["officer_id"] for officer in await directory_cache.officers_for()}
+    except Exception as e:
+        logger.error(f"Officer directory unavailable: {e}")
+        known_officers = set()
+    if not known_officers:
+        logger.warning("Officer directory is empty, routing config not validated against officers")
+    return reload_routing_config(known_officers or None)
+
+
+def _config_mtime() -> Optional[int]:
+    try:
+        return CONFIG_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+async def run_config_watcher(interval: Optional[float] = None) -> None:
+    """
+    Reload the routing table whenever routing_config.json changes (runs until cancelled).
+    Should be started as a background task during app startup.
+    """
+    interval = interval or ROUTING_CONFIG_POLL_INTERVAL
+    mtime = _config_mtime()
+    
+    while True:
+        await asyncio.sleep(interval)
+        current = _config_mtime()
+        if current is None or current == mtime:
+            continue
+        mtime = current
+        try:
+            await reload_validated()
+        except Exception as e:
+            logger.error(f"Routing config reload failed: {e}")
@@ -0,0 +1,230 @@
+"""
+Result Cache - Content-Addressed Cache for Validation Stage Results
+
+Validation results are cached per stage under the SHA-256 of the image bytes
+plus the inputs that stage depends on (issue type, rounded coordinates, ...),
+so a retried upload or the same photo sent to several endpoints doesn't pay
+again for Sightengine, geocoding, forensics and vision.
+
+Two tiers: an in-process LRU in front of the `validation_cache` MongoDB
+collection (shared across workers and restarts). Each stage has its own TTL.
+The MongoDB tier is used once create_indexes() has run at app startup; before
+that (scripts, tests) only the in-process tier is used. Cache failures never
+fail a validation - they are logged and the stage simply runs.
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "2048"))
+# Decimal places coordinates are rounded to in cache keys (3 = ~110 m)
+RESULT_CACHE_COORD_PLACES = int(os.environ.get("RESULT_CACHE_COORD_PLACES", "3"))
+
+# Seconds each stage's results stay valid (RESULT_CACHE_TTL_<STAGE> overrides)
+STAGE_TTLS = {
+    stage: float(os.environ.get(f"RESULT_CACHE_TTL_{stage.upper()}", default))
+    for stage, default in {
+        "ai_detection": "604800",  # 7 days - depends on the bytes only
+        "forensics": "604800",     # 7 days
+        "vision": "86400",         # 1 day
+        "exif": "86400",           # 1 day - includes the reverse geocoded address
+    }.items()
+}
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+validation_cache_collection = db.validation_cache
+
+_store_ready = False
+
+
+class LRUCache:
+    """
+    In-process least-recently-used cache with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # key -> (monotonic expiry time, value)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry (marking it recently used), or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store an entry for `ttl` seconds, evicting the least recently used ones."""
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+
+_memory = LRUCache()
+
+
+def content_digest(data: bytes) -> str:
+    """SHA-256 of the image bytes, the content address of every stage key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def round_coordinate(value: Optional[float], places: Optional[int] = None) -> Optional[float]:
+    """Round a coordinate for use in a cache key (None stays None)."""
+    if value is None:
+        return None
+    return round(float(value), RESULT_CACHE_COORD_PLACES if places is None else places)
+
+
+def stage_key(stage: str, digest: str, **inputs) -> str:
+    """
+    Cache key of one stage's result.
+
+    Args:
+        stage: Stage name (a STAGE_TTLS key)
+        digest: content_digest of the image
+        **inputs: The other inputs the stage result depends on
+
+    Returns:
+        str: '<stage>:<digest>' followed by the inputs, if any
+    """
+    key = f"{stage}:{digest}"
+    if inputs:
+        key += ":" + json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return key
+
+
+async def get(stage: str, key: str) -> Optional[Dict]:
+    """
+    Look up a cached stage result, in memory first and then in MongoDB.
+
+    Returns:
+        dict: A copy of the cached result, or None on a miss
+    """
+    value = _memory.get(key)
+    if value is not None:
+        return copy.deepcopy(value)
+
+    if not _store_ready:
+        return None
+
+    try:
+        now = datetime.utcnow()
+        document = await validation_cache_collection.find_one({"_id": key, "expires_at": {"$gt": now}})
+    except Exception as e:
+        logger.warning(f"Result cache lookup failed: {str(e)}")
+        return None
+
+    if document is None:
+        return None
+
+    # Keep it in memory for the rest of its lifetime
+    _memory.set(key, document["value"], (document["expires_at"] - now).total_seconds())
+    return copy.deepcopy(document["value"])
+
+
+async def put(stage: str, key: str, value: Dict) -> None:
+    """Store a stage result in memory and in MongoDB with the stage's TTL."""
+    ttl = STAGE_TTLS.get(stage)
+    if not ttl:
+        return
+
+    _memory.set(key, copy.deepcopy(value), ttl)
+
+    if not _store_ready:
+        return
+
+    try:
+        now = datetime.utcnow()
+        await validation_cache_collection.replace_one(
+            {"_id": key},
+            {"stage": stage, "value": value, "created_at": now, "expires_at": now + timedelta(seconds=ttl)},
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning(f"Result cache write failed: {str(e)}")
+
+
+async def cached_stage(
+    stage: str,
+    key: str,
+    compute: Callable[[], Awaitable[Dict]],
+    cacheable: Callable[[Dict], bool] = lambda result: True
+) -> Dict:
+    """
+    Return a stage's cached result, or compute and cache it.
+
+    Exceptions from `compute` propagate and nothing is cached.
+
+    Args:
+        stage: Stage name (a STAGE_TTLS key)
+        key: stage_key of the result
+        compute: Coroutine function producing the result
+        cacheable: Whether a computed result may be cached (e.g. not a fallback)
+
+    Returns:
+        dict: The stage result
+    """
+    cached = await get(stage, key)
+    if cached is not None:
+        logger.debug(f"Result cache hit: {stage}")
+        return cached
+
+    result = await compute()
+    if cacheable(result):
+        await put(stage, key, result)
+    return result
+
+
+def clear() -> None:
+    """Empty the in-process tier."""
+    _memory.clear()
+
+
+async def create_indexes() -> bool:
+    """
+    Create the TTL index of the validation cache and enable the MongoDB tier.
+    Should be called during app initialization.
+
+    Returns:
+        bool: True if the MongoDB tier is enabled
+    """
+    global _store_ready
+
+    try:
+        # MongoDB deletes documents once expires_at has passed
+        await validation_cache_collection.create_index("expires_at", expireAfterSeconds=0)
+        _store_ready = True
+        logger.info("Created indexes for validation_cache collection")
+    except Exception as e:
+        logger.error(f"Failed to create validation cache indexes, using the in-process cache only: {str(e)}")
+
+    return _store_ready
@@ -5,9 +5,15 @@ This service integrates with the Sightengine API to detect AI-generated or synth
 """
 
 import os
-import requests
+import asyncio
 import logging
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import aiohttp
+
+from services import http_client
+from services.image_context import ImageContext, resolve
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +24,6 @@ SIGHTENGINE_API_SECRET = os.environ.get("SIGHTENGINE_API_SECRET")
 # FALLBACK: If not loaded from environment, try reading .env directly
 if not SIGHTENGINE_API_USER or not SIGHTENGINE_API_SECRET:
     print("⚠️  Environment variables not loaded, trying to read .env directly...")
-    from pathlib import Path
     env_file = Path(__file__).parent.parent / '.env'
     if env_file.exists():
         with open(env_file, 'r') as f:
@@ -37,18 +42,19 @@ if not SIGHTENGINE_API_USER or not SIGHTENGINE_API_SECRET:
                             print(f"✓ Loaded SIGHTENGINE_API_SECRET: ***{value[-4:]}")
 
 AI_GENERATION_THRESHOLD = float(os.environ.get("AI_GENERATION_THRESHOLD", "0.8"))
+SIGHTENGINE_TIMEOUT = float(os.environ.get("SIGHTENGINE_TIMEOUT", "10"))
 
 
 # Sightengine API endpoint
 SIGHTENGINE_URL = "https://api.sightengine.com/1.0/check.json"
 
 
-def detect_ai_generated(image_path: str) -> Dict:
+async def detect_ai_generated(image_path: Union[str, ImageContext]) -> Dict:
     """
     Detect if an image is AI-generated using Sightengine API.
     
     Args:
-        image_path: Absolute path to the image file
+        image_path: Absolute path to the image file, or its ImageContext
         
     Returns:
         dict: {
@@ -76,63 +82,65 @@ def detect_ai_generated(image_path: str) -> Dict:
     
     try:
         # Prepare the API request
-        with open(image_path, 'rb') as image_file:
-            files = {'media': image_file}
-            data = {
-                'api_user': SIGHTENGINE_API_USER,
-                'api_secret': SIGHTENGINE_API_SECRET,
-                'models': 'genai'  # AI-generated image detection model
-            }
-            
-            logger.info(f"Sending image to Sightengine for AI detection: {image_path}")
-            
-            # Make API request
-            response = requests.post(
-                SIGHTENGINE_URL,
-                files=files,
-                data=data,
-                timeout=10
-            )
-            
+        if isinstance(image_path, ImageContext):
+            context = image_path
+        else:
+            context = await asyncio.to_thread(resolve, image_path)
+        
+        data = aiohttp.FormData()
+        data.add_field('media', context.data, filename=context.filename)
+        data.add_field('api_user', SIGHTENGINE_API_USER)
+        data.add_field('api_secret', SIGHTENGINE_API_SECRET)
+        data.add_field('models', 'genai')  # AI-generated image detection model
+        
+        logger.info(f"Sending image to Sightengine for AI detection: {image_path}")
+        
+        # Make API request through the shared, pooled session
+        async with http_client.request(
+            "POST",
+            SIGHTENGINE_URL,
+            data=data,
+            timeout=SIGHTENGINE_TIMEOUT
+        ) as response:
             response.raise_for_status()
-            result = response.json()
-            
-            # Check for API errors
-            if result.get('status') == 'failure':
-                error_msg = result.get('error', {}).get('message', 'Unknown error')
-                print(f"❌ Sightengine API Error: {error_msg}")
-                logger.error(f"Sightengine API error: {error_msg}")
-                return {
-                    "is_ai_generated": False,
-                    "ai_probability": 0.0,
-                    "error": error_msg,
-                    "skipped": True
-                }
-            
-            # Extract AI-generated probability
-            # The response structure: {"type": {"ai_generated": 0.95}}
-            ai_prob = result.get('type', {}).get('ai_generated', 0.0)
-            
-            print(f"✅ Sightengine Response:")
-            print(f"   AI Probability: {ai_prob:.2%}")
-            print(f"   Threshold: {AI_GENERATION_THRESHOLD:.2%}")
-            print(f"   Is AI Generated: {ai_prob >= AI_GENERATION_THRESHOLD}")
-            
-            logger.info(f"AI detection result: {ai_prob:.2%} probability")
-            
+            result = await response.json(content_type=None)
+        
+        # Check for API errors
+        if result.get('status') == 'failure':
+            error_msg = result.get('error', {}).get('message', 'Unknown error')
+            print(f"❌ Sightengine API Error: {error_msg}")
+            logger.error(f"Sightengine API error: {error_msg}")
             return {
-                "is_ai_generated": ai_prob >= AI_GENERATION_THRESHOLD,
-                "ai_probability": ai_prob,
-                "error": None,
-                "skipped": False
+                "is_ai_generated": False,
+                "ai_probability": 0.0,
+                "error": error_msg,
+                "skipped": True
             }
+        
+        # Extract AI-generated probability
+        # The response structure: {"type": {"ai_generated": 0.95}}
+        ai_prob = result.get('type', {}).get('ai_generated', 0.0)
+        
+        print(f"✅ Sightengine Response:")
+        print(f"   AI Probability: {ai_prob:.2%}")
+        print(f"   Threshold: {AI_GENERATION_THRESHOLD:.2%}")
+        print(f"   Is AI Generated: {ai_prob >= AI_GENERATION_THRESHOLD}")
+        
+        logger.info(f"AI detection result: {ai_prob:.2%} probability")
+        
+        return {
+            "is_ai_generated": ai_prob >= AI_GENERATION_THRESHOLD,
+            "ai_probability": ai_prob,
+            "error": None,
+            "skipped": False
+        }
             
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Sightengine API request failed: {str(e)}")
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"Sightengine API request failed: {str(e) or type(e).__name__}")
         return {
             "is_ai_generated": False,
             "ai_probability": 0.0,
-            "error": f"API request failed: {str(e)}",
+            "error": f"API request failed: {str(e) or type(e).__name__}",
             "skipped": True
         }
     except Exception as e:
@@ -145,18 +153,18 @@ def detect_ai_generated(image_path: str) -> Dict:
         }
 
 
-def is_ai_generated(image_path: str, threshold: Optional[float] = None) -> bool:
+async def is_ai_generated(image_path: Union[str, ImageContext], threshold: Optional[float] = None) -> bool:
     """
     Simple boolean check if image is AI-generated.
     
     Args:
-        image_path: Absolute path to the image file
+        image_path: Absolute path to the image file, or its ImageContext
         threshold: Custom threshold (optional, defaults to env config)
         
     Returns:
         bool: True if AI-generated probability exceeds threshold
     """
-    result = detect_ai_generated(image_path)
+    result = await detect_ai_generated(image_path)
     
     # If skipped due to error, return False (don't block)
     if result.get("skipped"):
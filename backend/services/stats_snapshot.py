@@ -0,0 +1,149 @@
+"""
+Stats Snapshot - Materialized Dashboard Statistics
+
+The public dashboard counters (new today, verifying, in progress, resolved
+this week, unverified) are computed in one aggregation pass over the issues
+and stored as a single document in the `stats_snapshots` collection. The
+dashboard endpoint reads that document by _id.
+
+The snapshot is recomputed by a background task every STATS_SNAPSHOT_INTERVAL
+seconds, and sooner (at most every STATS_SNAPSHOT_MIN_INTERVAL seconds) after
+issue writes call request_refresh().
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+STATS_SNAPSHOT_INTERVAL = float(os.environ.get("STATS_SNAPSHOT_INTERVAL", "60"))
+STATS_SNAPSHOT_MIN_INTERVAL = float(os.environ.get("STATS_SNAPSHOT_MIN_INTERVAL", "2"))
+# A snapshot older than this is recomputed on read (e.g. the refresher is not running)
+STATS_SNAPSHOT_MAX_AGE = float(os.environ.get("STATS_SNAPSHOT_MAX_AGE", "300"))
+
+SNAPSHOT_ID = "dashboard"
+COUNTERS = ("new_today", "verifying", "in_progress", "resolved_this_week", "unverified")
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+issues_collection = db.issues
+stats_snapshots_collection = db.stats_snapshots
+
+# Set by request_refresh() to wake the refresher early
+_refresh_requested: Optional[asyncio.Event] = None
+
+
+def stats_pipeline(now: datetime) -> list:
+    """
+    Aggregation computing every dashboard counter in one pass over the issues.
+
+    Args:
+        now: Reference time ("today" and "this week" are relative to it)
+
+    Returns:
+        list: Pipeline producing a single {counter: count} document
+    """
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_ago = now - timedelta(days=7)
+
+    def count_if(condition: Dict) -> Dict:
+        return {"$sum": {"$cond": [condition, 1, 0]}}
+
+    return [
+        {"$project": {"reported_at": 1, "updated_at": 1, "status": 1, "verifications.total": 1}},
+        {"$group": {
+            "_id": None,
+            "new_today": count_if({"$gte": ["$reported_at", today]}),
+            "verifying": count_if({"$eq": ["$status", "verifying"]}),
+            "in_progress": count_if({"$eq": ["$status", "in_progress"]}),
+            "resolved_this_week": count_if({"$and": [
+                {"$eq": ["$status", "resolved"]},
+                {"$gte": ["$updated_at", week_ago]}
+            ]}),
+            # No verifications yet (counters maintained by verification_counters)
+            "unverified": count_if({"$eq": [{"$ifNull": ["$verifications.total", 0]}, 0]})
+        }}
+    ]
+
+
+async def compute_stats(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Compute the dashboard counters from the issues collection.
+
+    Returns:
+        dict: {counter: count} for every counter in COUNTERS
+    """
+    now = now or datetime.utcnow()
+    results = await issues_collection.aggregate(stats_pipeline(now)).to_list(1)
+    totals = results[0] if results else {}
+    return {counter: int(totals.get(counter, 0)) for counter in COUNTERS}
+
+
+async def refresh() -> Dict:
+    """
+    Recompute the snapshot and store it.
+
+    Returns:
+        dict: The stored snapshot ({counter: count} plus computed_at)
+    """
+    now = datetime.utcnow()
+    snapshot = await compute_stats(now)
+    snapshot["computed_at"] = now
+
+    await stats_snapshots_collection.replace_one({"_id": SNAPSHOT_ID}, snapshot, upsert=True)
+    return snapshot
+
+
+async def read() -> Dict:
+    """
+    Read the current snapshot, recomputing it if it is missing or too old.
+
+    Returns:
+        dict: {counter: count} plus computed_at
+    """
+    snapshot = await stats_snapshots_collection.find_one({"_id": SNAPSHOT_ID})
+
+    if snapshot is None or (datetime.utcnow() - snapshot["computed_at"]).total_seconds() > STATS_SNAPSHOT_MAX_AGE:
+        return await refresh()
+
+    snapshot.pop("_id", None)
+    return snapshot
+
+
+def request_refresh() -> None:
+    """Ask the refresher to recompute soon (call after issue writes)."""
+    if _refresh_requested is not None:
+        _refresh_requested.set()
+
+
+async def run_refresher(interval: Optional[float] = None) -> None:
+    """
+    Keep the snapshot fresh (runs until cancelled).
+    Should be started as a background task during app startup.
+    """
+    global _refresh_requested
+
+    interval = interval or STATS_SNAPSHOT_INTERVAL
+    _refresh_requested = asyncio.Event()
+
+    while True:
+        try:
+            await refresh()
+        except Exception as e:
+            logger.error(f"Failed to refresh stats snapshot: {str(e)}")
+
+        # Debounce bursts of writes, then wait for a write or the interval
+        await asyncio.sleep(STATS_SNAPSHOT_MIN_INTERVAL)
+        try:
+            await asyncio.wait_for(_refresh_requested.wait(), timeout=max(interval - STATS_SNAPSHOT_MIN_INTERVAL, 0))
+        except asyncio.TimeoutError:
+            pass
+        _refresh_requested.clear()
@@ -0,0 +1,209 @@
+"""
+Supervisor Dashboard - Counters and Complaint List in One Aggregation
+
+The supervisor dashboard shows pending / overdue / escalated-today counters
+next to a page of escalated complaints. Both come from a single $facet
+aggregation over the supervisor's complaints.
+
+The counters compare BSON dates, so complaint dates are kept as dates:
+escalation writes `supervisor_deadline` and `escalated_at` (time of the latest
+escalation) as datetimes, and normalize_complaint_dates() converts the string
+deadlines and timeline timestamps of older complaints at startup.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from utils.pagination import KeysetPage
+
+logger = logging.getLogger(__name__)
+
+# Supervisor statuses still waiting for a decision
+PENDING_STATUSES = [None, "", "PENDING"]
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+complaints_collection = db.complaints
+
+
+def to_datetime(value) -> Optional[datetime]:
+    """
+    Convert a stored date (datetime or ISO 8601 string) to a naive UTC datetime.
+
+    Returns:
+        datetime: The date, or None if it cannot be parsed
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+    if not isinstance(value, datetime):
+        return None
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def list_query(filter: str, now: datetime) -> Dict:
+    """Query selecting the complaints listed for a dashboard filter."""
+    if filter == "pending":
+        return {"supervisor_status": {"$in": PENDING_STATUSES}}
+    if filter == "overdue":
+        return {"supervisor_status": {"$in": PENDING_STATUSES}, "supervisor_deadline": {"$lt": now}}
+    # "all" includes everything (resolved etc)
+    return {}
+
+
+def dashboard_pipeline(
+    supervisor_id: str,
+    filter: str,
+    page: KeysetPage,
+    projection: Optional[Dict[str, int]],
+    now: datetime
+) -> List[Dict]:
+    """
+    Aggregation returning the dashboard counters and one page of complaints.
+
+    Args:
+        supervisor_id: Supervisor whose escalated complaints are shown
+        filter: "pending", "overdue" or "all" (list only - counters cover all)
+        page: Keyset page of the list
+        projection: Fields of the listed complaints (None for whole documents)
+        now: Reference time for "overdue" and "today"
+
+    Returns:
+        list: Pipeline producing {"stats": [{pending, overdue, new_today}], "complaints": [...]}
+    """
+    pending = {"$in": [{"$ifNull": ["$supervisor_status", None]}, PENDING_STATUSES]}
+    overdue = {"$and": [
+        pending,
+        # Expression comparisons order null before dates, so check the type
+        {"$eq": [{"$type": "$supervisor_deadline"}, "date"]},
+        {"$lt": ["$supervisor_deadline", now]}
+    ]}
+    escalated_today = {"$and": [
+        {"$eq": [{"$type": "$escalated_at"}, "date"]},
+        {"$gte": ["$escalated_at", now - timedelta(days=1)]}
+    ]}
+
+    complaints = [
+        {"$match": page.filter(list_query(filter, now))},
+        {"$sort": dict(page.sort)},
+        {"$limit": page.fetch_length}
+    ]
+    if projection:
+        complaints.append({"$project": projection})
+
+    return [
+        {"$match": {"supervisor_id": supervisor_id}},
+        {"$facet": {
+            "stats": [{"$group": {
+                "_id": None,
+                "pending": {"$sum": {"$cond": [pending, 1, 0]}},
+                "overdue": {"$sum": {"$cond": [overdue, 1, 0]}},
+                "new_today": {"$sum": {"$cond": [escalated_today, 1, 0]}}
+            }}],
+            "complaints": complaints
+        }}
+    ]
+
+
+def _normalized_dates(complaint: Dict) -> Dict:
+    """
+    $set update converting a complaint's dates to datetimes (empty if none
+    change). Values that cannot be parsed are logged and left untouched.
+    """
+    update = {}
+
+    deadline = complaint.get("supervisor_deadline")
+    if isinstance(deadline, str):
+        converted = to_datetime(deadline)
+        if converted is not None:
+            update["supervisor_deadline"] = converted
+        else:
+            # Left as it is - overwriting it would lose the original value
+            logger.warning(f"Unparseable supervisor_deadline {deadline!r} on complaint {complaint.get('_id')}")
+
+    timeline = []
+    timeline_changed = False
+    escalated_at = None
+    for event in complaint.get("timeline") or []:
+        timestamp = event.get("timestamp") or event.get("datetime")
+        if timestamp is not None and not isinstance(event.get("timestamp"), datetime):
+            converted = to_datetime(timestamp)
+            if converted is not None:
+                event = dict(event, timestamp=converted)
+                timeline_changed = True
+            else:
+                logger.warning(f"Unparseable timeline timestamp {timestamp!r} on complaint {complaint.get('_id')}")
+        timeline.append(event)
+
+        if event.get("action") == "sent_to_supervisor" and isinstance(event.get("timestamp"), datetime):
+            escalated_at = max(escalated_at or event["timestamp"], event["timestamp"])
+
+    if timeline_changed:
+        update["timeline"] = timeline
+    if "escalated_at" not in complaint:
+        update["escalated_at"] = escalated_at
+
+    return update
+
+
+async def normalize_complaint_dates(batch_size: int = 1000) -> int:
+    """
+    Convert string deadlines and timeline timestamps of escalated complaints to
+    BSON dates and backfill `escalated_at`. Idempotent - normalized complaints
+    are skipped. Should be called during app initialization.
+
+    Args:
+        batch_size: Number of complaints updated per bulk write
+
+    Returns:
+        int: Number of normalized complaints
+    """
+    normalized = 0
+    operations = []
+
+    try:
+        cursor = complaints_collection.find(
+            {"supervisor_id": {"$exists": True}, "$or": [
+                {"supervisor_deadline": {"$type": "string"}},
+                {"timeline.timestamp": {"$type": "string"}},
+                {"timeline": {"$elemMatch": {"timestamp": {"$exists": False}, "datetime": {"$exists": True}}}},
+                {"escalated_at": {"$exists": False}}
+            ]},
+            {"supervisor_deadline": 1, "timeline": 1, "escalated_at": 1}
+        ).batch_size(batch_size)
+
+        async for complaint in cursor:
+            update = _normalized_dates(complaint)
+            if not update:
+                continue
+
+            operations.append(UpdateOne({"_id": complaint["_id"]}, {"$set": update}))
+            if len(operations) >= batch_size:
+                await complaints_collection.bulk_write(operations, ordered=False)
+                normalized += len(operations)
+                operations = []
+
+        if operations:
+            await complaints_collection.bulk_write(operations, ordered=False)
+            normalized += len(operations)
+
+        if normalized:
+            logger.info(f"Normalized dates of {normalized} escalated complaint(s)")
+
+    except Exception as e:
+        logger.error(f"Failed to normalize complaint dates: {str(e)}")
+
+    return normalized
@@ -0,0 +1,549 @@
+"""
+Validation Pipeline - Concurrent Image Validation Orchestrator
+
+This service runs the independent image validation checks (AI detection, EXIF/GPS,
+duplicate detection, source forensics and vision analysis) concurrently and joins
+their results before the decision engine is invoked.
+"""
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Union
+
+from services import sightengine_service, exif_service, hash_service, vision_service, image_context, forensics_pool, result_cache, ward_geocoder
+from services.image_context import ImageContext
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+# Dedicated pool for the blocking checks so one upload's fan-out is not throttled
+# by the (CPU-count sized) default executor shared with the rest of the app
+VALIDATION_THREAD_WORKERS = int(os.environ.get("VALIDATION_THREAD_WORKERS", "16"))
+# How many photos of one multi-photo upload are validated at the same time
+PHOTO_VALIDATION_CONCURRENCY = int(os.environ.get("PHOTO_VALIDATION_CONCURRENCY", "3"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=VALIDATION_THREAD_WORKERS,
+    thread_name_prefix="validation"
+)
+
+# Forensics source names mapped to the legacy source_type values
+FORENSICS_SOURCE_MAPPING = {
+    'WHATSAPP': 'WHATSAPP_IMAGE',
+    'SCREENSHOT': 'SCREENSHOT_IMAGE',
+    'ORIGINAL_PHOTO': 'ORIGINAL_PHONE_PHOTO',
+    'UNKNOWN': 'UNKNOWN'
+}
+
+
+def run_forensics(image_path: Union[str, ImageContext], filename: str) -> Dict:
+    """
+    Run image source forensics classification.
+
+    Never raises - forensics failures must not block a submission.
+
+    Args:
+        image_path: Absolute path to the image file, or its ImageContext
+        filename: Original filename of the upload
+
+    Returns:
+        dict: Forensics analysis in the format expected by the decision engine
+    """
+    try:
+        from utils.imageForensics import ImageSourceForensics
+
+        context = image_context.resolve(image_path, filename)
+
+        # Run complete forensics classification on the shared decoded image
+        forensics = ImageSourceForensics()
+        classification_result = forensics.classify_image(context.data, context, filename)
+
+        return _forensics_analysis(classification_result)
+
+    except Exception as e:
+        logger.warning(f"Forensics analysis failed gracefully: {str(e)}")
+        # Graceful fallback - never block submission due to forensics failure
+        return _forensics_fallback(e)
+
+
+def _forensics_analysis(classification_result: Dict) -> Dict:
+    """Map an ImageSourceForensics classification to the decision engine format."""
+    forensics_analysis = {
+        'source_type': FORENSICS_SOURCE_MAPPING.get(classification_result['source'], 'UNKNOWN'),
+        'confidence_score': classification_result['confidence'] / 100.0,
+        'evidence': [],
+        'classification_result': classification_result,
+        'forensics_version': '3.0'
+    }
+
+    # Extract evidence from best match
+    if classification_result['source'] != 'UNKNOWN':
+        breakdown = classification_result['breakdown']
+        best_source = classification_result['source'].lower()
+        if best_source in breakdown:
+            forensics_analysis['evidence'] = breakdown[best_source].get('evidence', [])
+
+    logger.info(f"Forensics: {classification_result['source']} "
+               f"({classification_result['confidence']}% confidence, "
+               f"{classification_result['recommendation']})")
+
+    # SAFETY: Never reject based solely on image source
+    return forensics_analysis
+
+
+def _forensics_fallback(error: Exception) -> Dict:
+    """Forensics result used when classification fails - never blocks submission."""
+    return {
+        'source_type': 'UNKNOWN',
+        'confidence_score': 0.0,
+        'evidence': [f'Analysis failed: {str(error)}'],
+        'classification_result': {
+            'source': 'UNKNOWN',
+            'confidence': 0,
+            'recommendation': 'ACCEPT',  # Default to accept on failure
+            'breakdown': {},
+            'error': str(error)
+        },
+        'forensics_version': '3.0'
+    }
+
+
+async def _run_forensics_step(context: ImageContext, filename: str) -> Dict:
+    """
+    Run forensics in the forensics process pool when it is running, otherwise
+    on the validation threads (e.g. in scripts that skip app startup).
+
+    Never raises - failures and timeouts degrade to the UNKNOWN fallback.
+    """
+    if not forensics_pool.is_running():
+        return await _run_in_thread(run_forensics, context, filename)
+
+    try:
+        classification_result = await forensics_pool.classify(context.data, filename)
+        return _forensics_analysis(classification_result)
+    except asyncio.TimeoutError:
+        return _forensics_fallback(TimeoutError(f"timed out after {forensics_pool.FORENSICS_TIMEOUT:g}s"))
+    except Exception as e:
+        logger.warning(f"Forensics analysis failed gracefully: {str(e)}")
+        return _forensics_fallback(e)
+
+
+async def _run_in_thread(func: Callable, *args, **kwargs):
+    """Run a blocking function on the validation thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+def _extract_exif_fields(image_path: Union[str, ImageContext]):
+    """Extract GPS, timestamp and camera info in a single worker thread."""
+    return (
+        exif_service.extract_gps_coordinates(image_path),
+        exif_service.extract_timestamp(image_path),
+        exif_service.extract_camera_info(image_path)
+    )
+
+
+async def _run_exif_checks(
+    image_path: Union[str, ImageContext],
+    latitude: Optional[float],
+    longitude: Optional[float],
+    reverse_geocode: bool
+) -> Dict:
+    """
+    Extract EXIF metadata, validate the GPS location and (optionally) reverse geocode it.
+
+    Returns:
+        dict: exif_data in the format expected by the decision engine
+    """
+    image_gps, image_timestamp, camera_info = await _run_in_thread(_extract_exif_fields, image_path)
+
+    # Validate location if both GPS data and user location are available
+    location_valid = False
+    distance_km = None
+    gps_address = None
+
+    if image_gps and latitude is not None and longitude is not None:
+        user_coords = (latitude, longitude)
+        location_valid = exif_service.validate_location(image_gps, user_coords)
+        distance_km = exif_service.calculate_distance(image_gps, user_coords)
+
+    # Ward, locality and city from the local ward boundaries (no network call)
+    gps_area = ward_geocoder.locate(*image_gps) if image_gps else None
+
+    # Get human-readable address from GPS coordinates
+    if image_gps and reverse_geocode:
+        gps_address = await exif_service.reverse_geocode(image_gps[0], image_gps[1])
+
+    return {
+        "has_gps": image_gps is not None,
+        "gps_coordinates": {
+            "latitude": image_gps[0],
+            "longitude": image_gps[1]
+        } if image_gps else None,
+        "gps_address": gps_address.get("address") if gps_address else None,
+        "gps_city": (gps_address or {}).get("city") or (gps_area or {}).get("city"),
+        "gps_state": gps_address.get("state") if gps_address else None,
+        "gps_country": gps_address.get("country") if gps_address else None,
+        "gps_ward": gps_area["ward"] if gps_area else None,
+        "gps_locality": gps_area["locality"] if gps_area else None,
+        "location_valid": location_valid if image_gps else False,
+        "timestamp": image_timestamp.isoformat() if image_timestamp else None,
+        "distance_km": distance_km,
+        "camera_make": camera_info.get("camera_make"),
+        "camera_model": camera_info.get("camera_model"),
+        "max_allowed_km": float(os.environ.get("LOCATION_RADIUS_KM", "10"))
+    }
+
+
+async def _run_hash_checks(image_path: Union[str, ImageContext], image_phash: Optional[str] = None) -> Dict:
+    """
+    Generate the perceptual hash and look for previously resolved duplicates.
+
+    A failed duplicate lookup is reported as an error but keeps the generated hash,
+    so accepted images can still be stored for future duplicate detection.
+
+    Args:
+        image_path: Absolute path to the image file, or its ImageContext
+        image_phash: Already computed pHash, if any
+
+    Returns:
+        dict: hash_match data, including the generated hash as 'hash_value'
+    """
+    if image_phash is None:
+        image_phash = await _run_in_thread(hash_service.generate_phash, image_path)
+
+    try:
+        similar_hashes = await hash_service.find_similar_hashes(image_phash)
+    except Exception as e:
+        logger.warning(f"Duplicate lookup failed gracefully: {str(e)}")
+        return _hash_fallback(e, image_phash)
+
+    return {
+        "is_duplicate": len(similar_hashes) > 0,
+        "similarity_score": similar_hashes[0]["similarity_score"] if similar_hashes else 0.0,
+        "original_issue_id": similar_hashes[0]["issue_id"] if similar_hashes else None,
+        "hash_value": image_phash
+    }
+
+
+def _ai_detection_fallback(error: Exception) -> Dict:
+    """AI detection result used when the check fails - never blocks submission."""
+    return {
+        "is_ai_generated": False,
+        "ai_probability": 0.0,
+        "error": f"Unexpected error: {str(error)}",
+        "skipped": True
+    }
+
+
+def _exif_fallback(error: Exception) -> Dict:
+    """EXIF result used when metadata extraction fails - treated as no metadata."""
+    return {
+        "has_gps": False,
+        "gps_coordinates": None,
+        "gps_address": None,
+        "gps_city": None,
+        "gps_state": None,
+        "gps_country": None,
+        "gps_ward": None,
+        "gps_locality": None,
+        "location_valid": False,
+        "timestamp": None,
+        "distance_km": None,
+        "camera_make": None,
+        "camera_model": None,
+        "max_allowed_km": float(os.environ.get("LOCATION_RADIUS_KM", "10")),
+        "error": str(error)
+    }
+
+
+def _hash_fallback(error: Exception, image_phash: Optional[str] = None) -> Dict:
+    """Duplicate check result used when hashing or the lookup fails - no match."""
+    return {
+        "is_duplicate": False,
+        "similarity_score": 0.0,
+        "original_issue_id": None,
+        "hash_value": image_phash,
+        "skipped": True,
+        "error": str(error)
+    }
+
+
+def _vision_fallback(error: Exception) -> Dict:
+    """Vision result used when analysis fails - neutral, never rejects."""
+    return {
+        "visual_summary": "Vision analysis unavailable",
+        "detected_objects": [],
+        "issue_type_detected": "unknown",
+        "issue_match_status": "PARTIAL_MATCH",
+        "severity": "MEDIUM",
+        "confidence_score": 0,
+        "final_flag": "INSUFFICIENT_VISUAL_EVIDENCE",
+        "reasoning": f"Vision analysis could not be completed: {str(error)}",
+        "skipped": True,
+        "error": str(error)
+    }
+
+
+def _is_cacheable(result: Dict) -> bool:
+    """Fallback and failed results are not cached, so the next validation retries them."""
+    if result.get("skipped") or result.get("error"):
+        return False
+    return not (result.get("classification_result") or {}).get("error")
+
+
+def _validation_steps(
+    context: ImageContext,
+    digest: Optional[str],
+    filename: str,
+    issue_type: str,
+    latitude: Optional[float],
+    longitude: Optional[float],
+    additional_context: Dict,
+    reverse_geocode: bool
+) -> List:
+    """
+    The AI detection, EXIF, forensics and vision steps. With a content digest,
+    each is served from the result cache when the same image was validated with
+    the same inputs before.
+
+    The duplicate check is never cached - it must see the current resolved issues.
+
+    Returns:
+        list: Awaitables for the four steps, in that order
+    """
+    def step(stage: str, compute: Callable, cacheable: Callable[[Dict], bool] = _is_cacheable, **inputs):
+        if digest is None:
+            return compute()
+        key = result_cache.stage_key(stage, digest, **inputs)
+        return result_cache.cached_stage(stage, key, compute, cacheable)
+
+    def exif_cacheable(result: Dict) -> bool:
+        # A failed reverse geocode is retried rather than cached as "no address"
+        geocode_failed = reverse_geocode and result.get("has_gps") and result.get("gps_address") is None
+        return _is_cacheable(result) and not geocode_failed
+
+    return [
+        step(
+            "ai_detection",
+            lambda: sightengine_service.detect_ai_generated(context)
+        ),
+        step(
+            "exif",
+            lambda: _run_exif_checks(context, latitude, longitude, reverse_geocode),
+            exif_cacheable,
+            lat=result_cache.round_coordinate(latitude),
+            lng=result_cache.round_coordinate(longitude),
+            geocode=reverse_geocode
+        ),
+        step(
+            "forensics",
+            lambda: _run_forensics_step(context, filename),
+            filename=filename
+        ),
+        step(
+            "vision",
+            lambda: _run_in_thread(
+                vision_service.analyze_image_content,
+                image_path=context,
+                user_issue_type=issue_type,
+                additional_context=additional_context
+            ),
+            issue_type=issue_type,
+            location=additional_context.get("location"),
+            description=additional_context.get("description")
+        ),
+    ]
+
+
+def _result_or_fallback(step: str, result, fallback: Callable[[Exception], Dict]) -> Dict:
+    """Map a failed step from asyncio.gather(return_exceptions=True) to its fallback."""
+    if isinstance(result, Exception):
+        logger.warning(f"{step} failed gracefully: {str(result)}")
+        return fallback(result)
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+async def run_validation(
+    image_path: Union[str, ImageContext],
+    filename: str,
+    issue_type: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    additional_context: Optional[Dict] = None,
+    reverse_geocode: bool = True,
+    image_phash: Optional[str] = None,
+    use_cache: bool = True
+) -> Dict:
+    """
+    Run all validation checks for an image concurrently.
+
+    Sightengine and Nominatim calls and the Mongo hash lookup run natively on the
+    event loop, forensics runs in the forensics process pool, and the remaining
+    CPU-bound work (EXIF parsing, pHash) and the Gemini client run in worker
+    threads, so end-to-end latency is roughly that of the slowest check. The
+    image is read and decoded once into an ImageContext that every check shares.
+    Results of the AI detection, EXIF, forensics and vision steps are reused from
+    the result cache when the same bytes were validated with the same inputs.
+
+    Args:
+        image_path: Absolute path to the image file, or its ImageContext
+        filename: Original filename of the upload
+        issue_type: Issue type reported by the user
+        latitude: Optional user latitude
+        longitude: Optional user longitude
+        additional_context: Optional metadata passed to the vision analysis
+        reverse_geocode: Whether to resolve the image GPS to an address
+        image_phash: Already computed pHash (skips generating it again)
+        use_cache: Whether to read and fill the result cache
+
+    Returns:
+        dict: validation_results ready for decision_engine.make_decision
+    """
+    logger.info(f"Running validation checks concurrently for {filename}")
+
+    if additional_context is None:
+        additional_context = {"latitude": latitude, "longitude": longitude}
+
+    if isinstance(image_path, ImageContext):
+        context = image_path
+    else:
+        context = await _run_in_thread(image_context.resolve, image_path, filename)
+
+    digest = await _run_in_thread(result_cache.content_digest, context.data) if use_cache else None
+    ai_step, exif_step, forensics_step, vision_step = _validation_steps(
+        context, digest, filename, issue_type, latitude, longitude, additional_context, reverse_geocode
+    )
+
+    # Each step degrades to a neutral "skipped" result on failure, so one failing
+    # dependency can't fail the whole validation
+    results = await asyncio.gather(
+        ai_step,
+        exif_step,
+        _run_hash_checks(context, image_phash),
+        forensics_step,
+        vision_step,
+        return_exceptions=True
+    )
+
+    ai_detection = _result_or_fallback("AI detection", results[0], _ai_detection_fallback)
+    exif_data = _result_or_fallback("EXIF analysis", results[1], _exif_fallback)
+    hash_match_data = _result_or_fallback("Duplicate check", results[2], _hash_fallback)
+    forensics_analysis = _result_or_fallback("Forensics analysis", results[3], _forensics_fallback)
+    vision_analysis = _result_or_fallback("Vision analysis", results[4], _vision_fallback)
+
+    # Legacy issue_match for backward compatibility
+    issue_match = {
+        "is_match": vision_analysis.get("issue_match_status") == "MATCH" if not vision_analysis.get("skipped") else True,
+        "expected_type": issue_type,
+        "detected_type": vision_analysis.get("issue_type_detected") if not vision_analysis.get("skipped") else None
+    }
+
+    return {
+        "ai_detection": ai_detection,
+        "exif_data": exif_data,
+        "hash_match": hash_match_data,
+        "issue_match": issue_match,
+        "vision_analysis": vision_analysis,
+        "forensics_analysis": forensics_analysis
+    }
+
+
+async def _batch_phash(context: ImageContext) -> Optional[str]:
+    """pHash for in-batch deduplication; None if the image cannot be hashed."""
+    try:
+        return await _run_in_thread(hash_service.generate_phash, context)
+    except Exception as e:
+        logger.warning(f"Could not hash {context.filename} for batch dedupe: {str(e)}")
+        return None
+
+
+def find_batch_duplicates(phashes: List[Optional[str]], threshold: Optional[int] = None) -> Dict[int, int]:
+    """
+    Find photos in one upload that duplicate an earlier photo of the same upload.
+
+    Args:
+        phashes: pHash per photo (None for photos that could not be hashed)
+        threshold: Maximum Hamming distance for a duplicate (optional)
+
+    Returns:
+        dict: index of each duplicate photo -> index of the first photo it repeats
+    """
+    if threshold is None:
+        threshold = hash_service.HASH_SIMILARITY_THRESHOLD
+
+    duplicates = {}
+    originals = []
+    for index, phash in enumerate(phashes):
+        if phash is None:
+            continue
+        for original in originals:
+            if hash_service.hash_distance(phash, phashes[original]) <= threshold:
+                duplicates[index] = original
+                break
+        else:
+            originals.append(index)
+    return duplicates
+
+
+async def run_batch_validation(
+    contexts: List[ImageContext],
+    issue_type: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    additional_context: Optional[Dict] = None,
+    reverse_geocode: bool = True,
+    concurrency: Optional[int] = None
+) -> List[Dict]:
+    """
+    Validate the photos of one upload concurrently.
+
+    All photos are pHashed first, and photos repeating an earlier photo of the
+    same upload are dropped before any external service is called. The rest run
+    through run_validation, at most `concurrency` at a time.
+
+    Args:
+        contexts: One ImageContext per photo
+        issue_type: Issue type reported by the user
+        latitude: Optional user latitude
+        longitude: Optional user longitude
+        additional_context: Optional metadata passed to the vision analysis
+        reverse_geocode: Whether to resolve the image GPS to an address
+        concurrency: Photos validated at the same time (defaults to PHOTO_VALIDATION_CONCURRENCY)
+
+    Returns:
+        list: One entry per photo, in input order. Each is either the run_validation
+        result, {"duplicate_of": <index>, "hash_value": <pHash>} for an in-batch
+        duplicate, or the exception raised while validating the photo.
+    """
+    semaphore = asyncio.Semaphore(concurrency or PHOTO_VALIDATION_CONCURRENCY)
+    phashes = await asyncio.gather(*(_batch_phash(context) for context in contexts))
+    duplicates = find_batch_duplicates(phashes)
+
+    if duplicates:
+        logger.info(f"Skipping {len(duplicates)} in-batch duplicate photo(s)")
+
+    async def validate(index: int, context: ImageContext):
+        if index in duplicates:
+            return {"duplicate_of": duplicates[index], "hash_value": phashes[index]}
+        async with semaphore:
+            return await run_validation(
+                image_path=context,
+                filename=context.filename,
+                issue_type=issue_type,
+                latitude=latitude,
+                longitude=longitude,
+                additional_context=additional_context,
+                reverse_geocode=reverse_geocode,
+                image_phash=phashes[index]
+            )
+
+    return await asyncio.gather(
+        *(validate(index, context) for index, context in enumerate(contexts)),
+        return_exceptions=True
+    )
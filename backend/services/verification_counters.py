@@ -0,0 +1,151 @@
+"""
+Verification Counters - Denormalized Community Verification Counts
+
+Each issue document carries a `verifications` sub-document
+{yes, no, not_sure, total} that create_verification keeps up to date with an
+atomic $inc, so reading an issue's counts never touches the verifications
+collection.
+
+The reconciler rebuilds the counters from the verifications collection to
+repair drift (writes that inserted a verification but failed before the $inc,
+documents edited by hand, issues created before the counters existed).
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+VERIFICATION_RECONCILE_INTERVAL = float(os.environ.get("VERIFICATION_RECONCILE_INTERVAL", "3600"))
+
+# Community "yes" answers needed for an issue to count as verified
+VERIFIED_MIN_YES = 3
+
+RESPONSES = ("yes", "no", "not_sure")
+
+# MongoDB connection (will be initialized by main app)
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+client = AsyncIOMotorClient(mongo_url)
+db = client[os.environ.get('DB_NAME', 'grievance_genie')]
+issues_collection = db.issues
+verifications_collection = db.verifications
+
+
+def empty_counts() -> Dict[str, int]:
+    """Counters of an issue without verifications."""
+    return {"yes": 0, "no": 0, "not_sure": 0, "total": 0}
+
+
+def counts(issue: Optional[Dict]) -> Dict[str, int]:
+    """
+    Read the verification counters stored on an issue document.
+
+    Args:
+        issue: Issue document (may be None or predate the counters)
+
+    Returns:
+        dict: {"yes", "no", "not_sure", "total"}, missing counters as 0
+    """
+    stored = (issue or {}).get("verifications") or {}
+    return {key: int(stored.get(key, 0)) for key in empty_counts()}
+
+
+def increment(response) -> Dict:
+    """
+    Update document recording one more verification with this response.
+
+    Args:
+        response: "yes", "no" or "not_sure" (or the matching enum member)
+
+    Returns:
+        dict: $inc update for the issue document
+    """
+    response = getattr(response, "value", response)
+    update = {"verifications.total": 1}
+    if response in RESPONSES:
+        update[f"verifications.{response}"] = 1
+    return {"$inc": update}
+
+
+def verified_filter(verified: bool) -> Dict:
+    """Issue query matching verified (or unverified) issues by their counters."""
+    if verified:
+        return {"verifications.yes": {"$gte": VERIFIED_MIN_YES}}
+    # $not also matches issues without counters yet
+    return {"verifications.yes": {"$not": {"$gte": VERIFIED_MIN_YES}}}
+
+
+async def reconcile(batch_size: int = 1000) -> int:
+    """
+    Rebuild the counters of every issue from the verifications collection.
+
+    Issue counters are read first and only overwritten if still unchanged, so
+    a verification recorded while this runs is never lost; at worst it is
+    corrected on the next run.
+
+    Args:
+        batch_size: Number of issues updated per bulk write
+
+    Returns:
+        int: Number of issues whose counters were corrected
+    """
+    corrected = 0
+    operations = []
+
+    try:
+        stored = {}
+        async for issue in issues_collection.find({}, {"id": 1, "verifications": 1}).batch_size(batch_size):
+            stored[issue["id"]] = (issue["_id"], issue.get("verifications"))
+
+        actual = {}
+        async for group in verifications_collection.aggregate([
+            {"$group": {"_id": {"issue_id": "$issue_id", "response": "$response"}, "count": {"$sum": 1}}}
+        ]):
+            issue_counts = actual.setdefault(group["_id"]["issue_id"], empty_counts())
+            if group["_id"]["response"] in RESPONSES:
+                issue_counts[group["_id"]["response"]] += group["count"]
+            issue_counts["total"] += group["count"]
+
+        for issue_id, (document_id, counters) in stored.items():
+            expected = actual.get(issue_id, empty_counts())
+            if counters == expected:
+                continue
+
+            unchanged = {"$exists": False} if counters is None else counters
+            operations.append(UpdateOne(
+                {"_id": document_id, "verifications": unchanged},
+                {"$set": {"verifications": expected}}
+            ))
+            if len(operations) >= batch_size:
+                result = await issues_collection.bulk_write(operations, ordered=False)
+                corrected += result.modified_count
+                operations = []
+
+        if operations:
+            result = await issues_collection.bulk_write(operations, ordered=False)
+            corrected += result.modified_count
+
+        if corrected:
+            logger.info(f"Reconciled verification counters of {corrected} issue(s)")
+
+    except Exception as e:
+        logger.error(f"Failed to reconcile verification counters: {str(e)}")
+
+    return corrected
+
+
+async def run_reconciler(interval: Optional[float] = None) -> None:
+    """
+    Periodically reconcile the counters (runs until cancelled).
+    Should be started as a background task during app startup.
+    """
+    interval = interval or VERIFICATION_RECONCILE_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        await reconcile()
@@ -8,9 +8,11 @@ import logging
 import json
 import base64
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Tuple, Union
 import google.generativeai as genai
 
+from services.image_context import ImageContext, resolve
+
 logger = logging.getLogger(__name__)
 
 # Configure Gemini
@@ -46,7 +48,7 @@ USER_TO_VISION_CATEGORY = {
 
 
 def analyze_image_content(
-    image_path: str,
+    image_path: Union[str, ImageContext],
     user_issue_type: str,
     additional_context: Optional[Dict] = None
 ) -> Dict:
@@ -54,7 +56,7 @@ def analyze_image_content(
     Analyze image content using Gemini Vision to extract issue information.
     
     Args:
-        image_path: Path to the image file
+        image_path: Path to the image file, or its ImageContext
         user_issue_type: Issue type reported by user (e.g., 'garbage', 'roads')
         additional_context: Optional metadata (location, timestamp, etc.)
     
@@ -91,8 +93,8 @@ def analyze_image_content(
         expected_issue = USER_TO_VISION_CATEGORY.get(user_issue_type, "unknown")
         
         # Read and encode image
-        with open(image_path, 'rb') as img_file:
-            image_data = img_file.read()
+        context = resolve(image_path)
+        image_data = context.data
         
         # Prepare context string
         context_str = f"User reported issue type: {user_issue_type}"
@@ -160,12 +162,12 @@ Return ONLY valid JSON (no markdown, no code blocks):
             try:
                 logger.info(f"Attempting vision analysis with model: {model_name}")
                 
-                # Upload image to Gemini
-                uploaded_file = genai.upload_file(image_path)
+                # Send the in-memory image inline (no file upload round trip)
+                image_part = {"mime_type": context.mime_type, "data": image_data}
                 
                 # Generate content
                 model = genai.GenerativeModel(model_name)
-                response = model.generate_content([prompt, uploaded_file])
+                response = model.generate_content([prompt, image_part])
                 
                 # Clean response
                 response_text = response.text.strip()
@@ -191,12 +193,6 @@ Return ONLY valid JSON (no markdown, no code blocks):
                     logger.info(f"✅ Vision analysis successful with {model_name}")
                     logger.info(f"Detected: {result['issue_type_detected']}, Match: {result['issue_match_status']}, Confidence: {result['confidence_score']}")
                     
-                    # Clean up uploaded file
-                    try:
-                        genai.delete_file(uploaded_file.name)
-                    except:
-                        pass
-                    
                     return result
                 else:
                     logger.warning(f"Response missing required fields from {model_name}")
@@ -222,7 +218,7 @@ Return ONLY valid JSON (no markdown, no code blocks):
         return _fallback_response(str(e))
 
 
-def _create_mock_vision_analysis(user_issue_type: str, image_path: str) -> Dict:
+def _create_mock_vision_analysis(user_issue_type: str, image_path: Union[str, ImageContext]) -> Dict:
     """
     Create a realistic mock vision analysis for development when Gemini API is not configured.
     This allows the auto-fill functionality to work during development.
@@ -0,0 +1,188 @@
+"""
+Ward Geocoder - Offline Reverse Geocoding to Wards
+
+Resolves a latitude/longitude to its ward number, locality and city from the
+ward boundary polygons in config/ward_boundaries.geojson, in-process and
+without any network call.
+
+The GeoJSON is a FeatureCollection of Polygon/MultiPolygon features (lng/lat
+order, as per the spec) with properties:
+    ward      - ward number (int), the key used by officer routing
+    locality  - locality / area name (optional)
+    city      - city name (optional)
+
+Features are bucketed into a regular lat/lng grid by bounding box. A lookup
+reads one grid cell and runs a vectorized point-in-polygon test only on the
+few polygons registered there.
+"""
+
+import os
+import json
+import math
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+WARD_BOUNDARIES_PATH = Path(os.environ.get(
+    "WARD_BOUNDARIES_PATH",
+    Path(__file__).parent.parent / "config" / "ward_boundaries.geojson"
+))
+# Grid cell size in degrees (0.01 = ~1.1 km)
+WARD_GRID_CELL_DEG = float(os.environ.get("WARD_GRID_CELL_DEG", "0.01"))
+
+
+def _ring_contains(ring: np.ndarray, lng: float, lat: float) -> bool:
+    """Even-odd ray casting test of a point against one closed ring (N x 2, lng/lat)."""
+    x0, y0 = ring[:-1, 0], ring[:-1, 1]
+    x1, y1 = ring[1:, 0], ring[1:, 1]
+    crosses = (y0 > lat) != (y1 > lat)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at_lat = x0 + (lat - y0) * (x1 - x0) / (y1 - y0)
+    return bool(np.count_nonzero(crosses & (lng < x_at_lat)) % 2)
+
+
+def _closed_ring(coordinates: List) -> np.ndarray:
+    """A GeoJSON ring as an N x 2 lng/lat array whose last point repeats the first."""
+    ring = np.asarray(coordinates, dtype=np.float64)[:, :2]
+    if not np.array_equal(ring[0], ring[-1]):
+        ring = np.vstack([ring, ring[:1]])
+    return ring
+
+
+class _Area:
+    """One ward feature: its polygons (outer ring plus holes) and properties."""
+
+    def __init__(self, polygons: List[List[np.ndarray]], properties: Dict):
+        self.polygons = polygons
+        self.properties = properties
+        points = np.concatenate([polygon[0] for polygon in polygons])
+        self.min_lng, self.min_lat = points.min(axis=0)
+        self.max_lng, self.max_lat = points.max(axis=0)
+
+    def contains(self, lng: float, lat: float) -> bool:
+        if not (self.min_lng <= lng <= self.max_lng and self.min_lat <= lat <= self.max_lat):
+            return False
+        for outer, *holes in self.polygons:
+            if _ring_contains(outer, lng, lat) and not any(_ring_contains(hole, lng, lat) for hole in holes):
+                return True
+        return False
+
+
+class WardIndex:
+    """
+    Grid index of ward polygons answering point lookups.
+    """
+
+    def __init__(self, areas: List[_Area], cell_deg: float = WARD_GRID_CELL_DEG):
+        self.areas = areas
+        self.cell_deg = cell_deg
+        # (row, col) -> indices of the areas whose bounding box overlaps the cell
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+
+        for index, area in enumerate(areas):
+            for row in range(self._cell(area.min_lat), self._cell(area.max_lat) + 1):
+                for col in range(self._cell(area.min_lng), self._cell(area.max_lng) + 1):
+                    self._grid.setdefault((row, col), []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def _cell(self, degrees: float) -> int:
+        return math.floor(degrees / self.cell_deg)
+
+    @classmethod
+    def from_geojson(cls, geojson: Dict, cell_deg: float = WARD_GRID_CELL_DEG) -> "WardIndex":
+        """
+        Build the index from a GeoJSON FeatureCollection.
+        Features without a ward number or polygon geometry are skipped.
+        """
+        areas = []
+        for feature in geojson.get("features", []):
+            geometry = feature.get("geometry") or {}
+            properties = feature.get("properties") or {}
+
+            if properties.get("ward") is None:
+                logger.warning(f"Skipping ward boundary without a ward number: {properties}")
+                continue
+
+            if geometry.get("type") == "Polygon":
+                polygon_coordinates = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygon_coordinates = geometry["coordinates"]
+            else:
+                logger.warning(f"Skipping ward {properties['ward']}: unsupported geometry {geometry.get('type')}")
+                continue
+
+            polygons = [[_closed_ring(ring) for ring in rings] for rings in polygon_coordinates if rings]
+            if polygons:
+                areas.append(_Area(polygons, properties))
+
+        return cls(areas, cell_deg)
+
+    def locate(self, latitude: float, longitude: float) -> Optional[Dict]:
+        """
+        Find the ward containing a point.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            dict: {"ward": int, "locality": str, "city": str}, or None if the
+                point is outside every ward
+        """
+        for index in self._grid.get((self._cell(latitude), self._cell(longitude)), ()):
+            area = self.areas[index]
+            if area.contains(longitude, latitude):
+                return {
+                    "ward": int(area.properties["ward"]),
+                    "locality": area.properties.get("locality"),
+                    "city": area.properties.get("city")
+                }
+        return None
+
+
+def load_ward_index() -> WardIndex:
+    """Load the ward boundaries from the GeoJSON file"""
+    try:
+        with open(WARD_BOUNDARIES_PATH, 'r') as f:
+            geojson = json.load(f)
+    except FileNotFoundError:
+        logger.error(f"Ward boundaries not found at {WARD_BOUNDARIES_PATH}")
+        return WardIndex([])
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in ward boundaries: {e}")
+        return WardIndex([])
+
+    index = WardIndex.from_geojson(geojson)
+    logger.info(f"Loaded {len(index)} ward boundaries")
+    return index
+
+
+# Global ward index (loaded once)
+WARD_INDEX = load_ward_index()
+
+
+def locate(latitude: Optional[float], longitude: Optional[float]) -> Optional[Dict]:
+    """
+    Resolve coordinates to their ward, locality and city.
+
+    Returns:
+        dict: {"ward", "locality", "city"}, or None if the coordinates are
+            missing or outside every known ward
+    """
+    if latitude is None or longitude is None:
+        return None
+    return WARD_INDEX.locate(latitude, longitude)
+
+
+def reload_ward_boundaries():
+    """Reload the ward boundaries (useful for testing/updates)"""
+    global WARD_INDEX
+    WARD_INDEX = load_ward_index()
+    logger.info("Ward boundaries reloaded")
@@ -0,0 +1,21 @@
+"""
+Bit Operations - Vectorized Bit Counting over NumPy Arrays
+
+Shared by the Hamming index (pHash distances) and the JPEG parser (byte-level
+statistics), so both count bits with the same implementation.
+"""
+
+import numpy as np
+
+if hasattr(np, "bitwise_count"):
+    def popcount(values: np.ndarray) -> np.ndarray:
+        """Number of set bits in each element of a uint64 array."""
+        return np.bitwise_count(values)
+else:
+    # NumPy < 2.0: count bits per byte through a lookup table
+    _BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(values: np.ndarray) -> np.ndarray:
+        """Number of set bits in each element of a uint64 array."""
+        per_byte = _BYTE_POPCOUNT[values.view(np.uint8)].reshape(-1, 8)
+        return per_byte.sum(axis=1, dtype=np.uint8)
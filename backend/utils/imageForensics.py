@@ -6,18 +6,48 @@ This module performs byte-level, metadata, and compression analysis to determine
 the likely source of an uploaded image without breaking existing validation logic.
 """
 
-import os
+import json
 import logging
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List, Union
 import struct
 import re
 from PIL import Image
 from PIL.ExifTags import TAGS
 import piexif
 
+from services.image_context import ImageContext
+from utils import jpeg_parser
+
 logger = logging.getLogger(__name__)
 
+# Quantization table fingerprints of known re-encoders (messaging and social apps)
+SIGNATURES_PATH = Path(__file__).parent.parent / "config" / "jpeg_signatures.json"
+
+def load_jpeg_signatures() -> Dict[str, str]:
+    """Load re-encoder signatures from JSON file as fingerprint -> source"""
+    try:
+        with open(SIGNATURES_PATH, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        logger.error(f"JPEG signatures not found at {SIGNATURES_PATH}")
+        return {}
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON in JPEG signatures: {e}")
+        return {}
+
+    signatures = {
+        fingerprint.lower(): source
+        for source, entry in config.items()
+        for fingerprint in entry.get('fingerprints', [])
+    }
+    logger.info(f"Loaded {len(signatures)} JPEG re-encoder signature(s)")
+    return signatures
+
+# Global re-encoder signatures (loaded once)
+JPEG_SIGNATURES = load_jpeg_signatures()
+
 class ImageSourceForensics:
     """
     Advanced image forensics for source identification
@@ -83,7 +113,7 @@ class ImageSourceForensics:
             ]
         }
 
-    def detect_whatsapp(self, image_buffer: bytes, image_path: str, filename: str) -> Dict:
+    def detect_whatsapp(self, image_buffer: bytes, image_path: Union[str, ImageContext], filename: str) -> Dict:
         """
         Enhanced WhatsApp detection using multiple markers
         
@@ -106,18 +136,31 @@ class ImageSourceForensics:
             'icc_missing': False,
             'phone_aspect_ratio': False,
             'whatsapp_filename': False,
-            'resolution_pattern': False
+            'resolution_pattern': False,
+            'reencoder_signature': False
         }
         
         confidence = 0
         evidence = []
+        fingerprint = None
         
         try:
+            context = self._context(image_buffer, image_path, filename)
+            
             # 1. Check JPEG signature (0xFF 0xD8)
             if image_buffer.startswith(b'\xff\xd8'):
                 markers['jpeg_signature'] = True
                 confidence += 15
                 evidence.append("JPEG signature detected")
+                
+                # Quantization tables written by a known re-encoder
+                reencoder, fingerprint = self._match_reencoder_signature(image_buffer)
+                if reencoder == 'WHATSAPP':
+                    markers['reencoder_signature'] = True
+                    confidence += 25
+                    evidence.append(f"JPEG tables match WhatsApp re-encoding ({fingerprint})")
+                elif reencoder:
+                    evidence.append(f"JPEG tables match {reencoder.title()} re-encoding ({fingerprint})")
             
             # 2. Check file size (100KB - 500KB)
             file_size = len(image_buffer)
@@ -128,7 +171,7 @@ class ImageSourceForensics:
             
             # 3. Analyze EXIF and metadata
             try:
-                with Image.open(image_path) as img:
+                with nullcontext(context.image) as img:
                     # Check dimensions and aspect ratio
                     width, height = img.size
                     aspect_ratio = self._get_aspect_ratio(width, height)
@@ -154,7 +197,7 @@ class ImageSourceForensics:
                 
                 # Check EXIF data
                 try:
-                    exif_dict = piexif.load(image_path)
+                    exif_dict = context.piexif_dict()
                     has_camera_info = False
                     
                     if '0th' in exif_dict:
@@ -175,7 +218,7 @@ class ImageSourceForensics:
                 
                 # 4. Check JPEG quality
                 if img.format == 'JPEG':
-                    quality = self._estimate_jpeg_quality_advanced(image_path)
+                    quality = self._estimate_jpeg_quality_advanced(context)
                     if self.whatsapp_markers['quality_range'][0] <= quality <= self.whatsapp_markers['quality_range'][1]:
                         markers['compression_quality'] = True
                         confidence += 15
@@ -202,7 +245,8 @@ class ImageSourceForensics:
                     'confidence': min(confidence, 100),
                     'markers': markers,
                     'evidence': evidence,
-                    'active_markers': active_markers
+                    'active_markers': active_markers,
+                    'jpeg_fingerprint': fingerprint
                 }
             else:
                 return {
@@ -210,7 +254,8 @@ class ImageSourceForensics:
                     'confidence': 0,
                     'markers': markers,
                     'evidence': evidence + [f"Only {active_markers}/3 required markers found"],
-                    'active_markers': active_markers
+                    'active_markers': active_markers,
+                    'jpeg_fingerprint': fingerprint
                 }
                 
         except Exception as e:
@@ -220,10 +265,11 @@ class ImageSourceForensics:
                 'confidence': 0,
                 'markers': markers,
                 'evidence': [f"Detection failed: {str(e)}"],
-                'active_markers': 0
+                'active_markers': 0,
+                'jpeg_fingerprint': fingerprint
             }
 
-    def detect_original(self, image_buffer: bytes, image_path: str, filename: str) -> Dict:
+    def detect_original(self, image_buffer: bytes, image_path: Union[str, ImageContext], filename: str) -> Dict:
         """
         Original phone photo detection - HIGHEST confidence class
         
@@ -252,8 +298,10 @@ class ImageSourceForensics:
         evidence = []
         
         try:
+            context = self._context(image_buffer, image_path, filename)
+            
             # 1. Check image resolution
-            with Image.open(image_path) as img:
+            with nullcontext(context.image) as img:
                 width, height = img.size
                 max_dimension = max(width, height)
                 
@@ -264,21 +312,21 @@ class ImageSourceForensics:
                 
                 # 2. Check JPEG quality
                 if img.format == 'JPEG':
-                    quality = self._estimate_jpeg_quality_advanced(image_path)
+                    quality = self._estimate_jpeg_quality_advanced(context)
                     if quality > 80:
                         markers['high_jpeg_quality'] = True
                         confidence += 20
                         evidence.append(f"High JPEG quality ({quality}%)")
                 
                 # 3. Analyze noise patterns (simplified)
-                if self._detect_camera_noise_pattern(img):
+                if self._detect_camera_noise_pattern(context):
                     markers['camera_noise_pattern'] = True
                     confidence += 15
                     evidence.append("Camera sensor noise pattern detected")
             
             # 4. Comprehensive EXIF analysis
             try:
-                exif_dict = piexif.load(image_path)
+                exif_dict = context.piexif_dict()
                 exif_sections = 0
                 
                 # Check main IFD sections
@@ -394,7 +442,7 @@ class ImageSourceForensics:
                 'strong_markers': 0
             }
 
-    def detect_screenshot(self, image_buffer: bytes, image_path: str, filename: str) -> Dict:
+    def detect_screenshot(self, image_buffer: bytes, image_path: Union[str, ImageContext], filename: str) -> Dict:
         """
         Enhanced screenshot detection using multiple markers
         
@@ -424,13 +472,15 @@ class ImageSourceForensics:
         evidence = []
         
         try:
+            context = self._context(image_buffer, image_path, filename)
+            
             # 1. Check PNG header (0x89 0x50 0x4E 0x47)
             if image_buffer.startswith(b'\x89PNG'):
                 markers['png_format'] = True
                 confidence += 30
                 evidence.append("PNG format detected")
             
-            with Image.open(image_path) as img:
+            with nullcontext(context.image) as img:
                 width, height = img.size
                 
                 # 2. Check for exact screen resolutions
@@ -447,27 +497,27 @@ class ImageSourceForensics:
                     confidence += 20
                     evidence.append("Lossless PNG compression")
                 elif img.format == 'JPEG':
-                    quality = self._estimate_jpeg_quality_advanced(image_path)
+                    quality = self._estimate_jpeg_quality_advanced(context)
                     if quality >= 95:  # Near-lossless JPEG
                         markers['lossless_compression'] = True
                         confidence += 15
                         evidence.append(f"Near-lossless JPEG quality ({quality}%)")
                 
                 # 4. Analyze pixel patterns for UI elements
-                if self._detect_ui_color_patterns(img):
+                if self._detect_ui_color_patterns(context.rgb):
                     markers['ui_color_patterns'] = True
                     confidence += 15
                     evidence.append("UI color patterns detected")
                 
                 # 5. Check for pixel-perfect edges (low noise)
-                if self._detect_pixel_perfect_edges(img):
+                if self._detect_pixel_perfect_edges(context):
                     markers['pixel_perfect_edges'] = True
                     confidence += 10
                     evidence.append("Pixel-perfect edges detected")
             
             # 6. Check metadata for OS indicators
             try:
-                exif_dict = piexif.load(image_path)
+                exif_dict = context.piexif_dict()
                 
                 if '0th' in exif_dict:
                     ifd = exif_dict['0th']
@@ -541,7 +591,7 @@ class ImageSourceForensics:
                 'active_markers': 0
             }
 
-    def classify_image(self, image_buffer: bytes, image_path: str, filename: str) -> Dict:
+    def classify_image(self, image_buffer: bytes, image_path: Union[str, ImageContext], filename: str) -> Dict:
         """
         Final source classification - runs all detectors and selects highest confidence
         
@@ -551,6 +601,9 @@ class ImageSourceForensics:
         • If confidence < 70 → mark as "REVIEW_REQUIRED"
         """
         try:
+            # Decode once and share the image, EXIF and derived arrays across detectors
+            image_path = self._context(image_buffer, image_path, filename)
+            
             # Run all three detectors
             whatsapp_result = self.detect_whatsapp(image_buffer, image_path, filename)
             screenshot_result = self.detect_screenshot(image_buffer, image_path, filename)
@@ -989,31 +1042,21 @@ class ImageSourceForensics:
             }
 
     def _extract_jpeg_markers(self, image_buffer: bytes) -> List[str]:
-        """Extract JPEG markers from byte stream"""
-        markers = []
-        i = 0
-        while i < len(image_buffer) - 1:
-            if image_buffer[i] == 0xFF and image_buffer[i + 1] != 0xFF:
-                marker = f"0xFF{image_buffer[i + 1]:02X}"
-                markers.append(marker)
-                i += 2
-            else:
-                i += 1
-        return markers[:10]  # Limit to first 10 markers
+        """Extract JPEG header markers by walking the segments up to SOS"""
+        return jpeg_parser.header_markers(image_buffer, limit=10)  # Limit to first 10 markers
 
     def _count_compression_artifacts(self, image_buffer: bytes) -> int:
         """Count compression artifacts (simplified)"""
         # This is a simplified implementation
         # In practice, you'd analyze DCT coefficients
-        artifact_count = 0
-        
-        # Look for repeated byte patterns that indicate compression
-        for i in range(0, len(image_buffer) - 8, 8):
-            block = image_buffer[i:i+8]
-            if block.count(block[0]) > 6:  # Highly repetitive block
-                artifact_count += 1
-        
-        return min(artifact_count, 100)  # Cap at 100
+        # Highly repetitive 8-byte blocks indicate compression, capped at 100
+        return jpeg_parser.count_repetitive_blocks(image_buffer, min_repeats=7, limit=100)
+
+    def _context(self, image_buffer: bytes, image_path: Union[str, ImageContext], filename: str) -> ImageContext:
+        """Return the shared ImageContext, building it from the already-read buffer if needed"""
+        if isinstance(image_path, ImageContext):
+            return image_path
+        return ImageContext(image_buffer, filename=filename, path=image_path)
 
     def _get_aspect_ratio(self, width: int, height: int) -> Tuple[int, int]:
         """Calculate simplified aspect ratio"""
@@ -1056,14 +1099,13 @@ class ImageSourceForensics:
         except Exception:
             return False
 
-    def _detect_camera_noise_pattern(self, img: Image.Image) -> bool:
+    def _detect_camera_noise_pattern(self, img: Union[Image.Image, ImageContext]) -> bool:
         """Detect camera sensor noise patterns typical of original photos"""
         try:
             import numpy as np
             
             # Convert to grayscale for noise analysis
-            gray = img.convert('L')
-            img_array = np.array(gray)
+            img_array = self._grayscale_array(img)
             
             # Sample a small region for noise analysis
             height, width = img_array.shape
@@ -1092,14 +1134,13 @@ class ImageSourceForensics:
         except Exception:
             return False
 
-    def _detect_pixel_perfect_edges(self, img: Image.Image) -> bool:
+    def _detect_pixel_perfect_edges(self, img: Union[Image.Image, ImageContext]) -> bool:
         """Detect pixel-perfect edges typical of screenshots"""
         try:
             import numpy as np
             
             # Convert to grayscale for edge detection
-            gray = img.convert('L')
-            img_array = np.array(gray)
+            img_array = self._grayscale_array(img)
             
             # Simple edge detection using gradient
             if img_array.shape[0] < 50 or img_array.shape[1] < 50:
@@ -1122,68 +1163,45 @@ class ImageSourceForensics:
         except Exception:
             return False
 
-    def _estimate_jpeg_quality_advanced(self, image_path: str) -> int:
-        """Advanced JPEG quality estimation using quantization tables"""
+    def _grayscale_array(self, img: Union[Image.Image, ImageContext]):
+        """Grayscale pixel array, reusing the context's cached conversion when available"""
+        import numpy as np
+        
+        if isinstance(img, ImageContext):
+            return img.grayscale_array
+        return np.array(img.convert('L'))
+
+    def _estimate_jpeg_quality_advanced(self, image_path: Union[str, ImageContext]) -> int:
+        """Estimate JPEG quality from the DQT quantization tables (header only, no decoding)"""
         try:
-            with open(image_path, 'rb') as f:
-                data = f.read()
+            context = image_path if isinstance(image_path, ImageContext) else ImageContext.from_path(image_path)
             
-            # Look for quantization tables in JPEG
-            # This is a simplified implementation
-            # Real implementation would parse DQT segments
+            if not context.data.startswith(b'\xff\xd8'):
+                return 100  # PNG or other lossless
             
-            # Fallback to file size based estimation
-            file_size = len(data)
-            with Image.open(image_path) as img:
-                if img.format != 'JPEG':
-                    return 100  # PNG or other lossless
-                
-                pixels = img.size[0] * img.size[1]
-                bytes_per_pixel = file_size / pixels
-                
-                # Improved quality estimation based on compression ratio
-                if bytes_per_pixel > 3.0:
-                    return 98  # Very high quality
-                elif bytes_per_pixel > 2.0:
-                    return 92  # High quality
-                elif bytes_per_pixel > 1.5:
-                    return 85  # Medium-high quality
-                elif bytes_per_pixel > 1.0:
-                    return 75  # Medium quality (WhatsApp range)
-                elif bytes_per_pixel > 0.5:
-                    return 65  # Medium-low quality (WhatsApp range)
-                else:
-                    return 50  # Low quality
+            estimate = jpeg_parser.estimate_quality(context.data)
+            if estimate is None:
+                return 80  # No readable tables - default fallback
+            return estimate.quality
                     
         except Exception:
             return 80  # Default fallback
 
     def _estimate_jpeg_quality(self, image_path: str) -> int:
-        """Estimate JPEG quality (simplified implementation)"""
-        try:
-            with Image.open(image_path) as img:
-                if hasattr(img, 'quantization'):
-                    # This is a simplified quality estimation
-                    # Real implementation would analyze quantization tables
-                    return 85  # Default estimate
-                
-            # Fallback: estimate based on file size vs dimensions
-            file_size = os.path.getsize(image_path)
-            with Image.open(image_path) as img:
-                pixels = img.size[0] * img.size[1]
-                bytes_per_pixel = file_size / pixels
-                
-                if bytes_per_pixel > 2.0:
-                    return 95  # High quality
-                elif bytes_per_pixel > 1.0:
-                    return 85  # Medium-high quality
-                elif bytes_per_pixel > 0.5:
-                    return 75  # Medium quality
-                else:
-                    return 60  # Low quality
-                    
-        except Exception:
-            return 80  # Default fallback
+        """Estimate JPEG quality (same quantization table estimate as the advanced version)"""
+        return self._estimate_jpeg_quality_advanced(image_path)
+
+    def _match_reencoder_signature(self, image_buffer: bytes) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Match the JPEG quantization tables against known re-encoder signatures
+        
+        Returns:
+            Tuple of (matched source such as 'WHATSAPP' or None, table fingerprint or None)
+        """
+        estimate = jpeg_parser.estimate_quality(image_buffer)
+        if estimate is None:
+            return None, None
+        return JPEG_SIGNATURES.get(estimate.fingerprint), estimate.fingerprint
 
     def _fallback_response(self, error_reason: str) -> Dict:
         """Return safe fallback when analysis fails"""
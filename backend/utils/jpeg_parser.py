@@ -0,0 +1,309 @@
+"""
+JPEG Parser - Header Segment Walking Without Decoding Pixels
+
+A JPEG file is a sequence of marker segments (0xFF, marker byte, 2-byte length,
+payload) up to the start-of-scan (SOS) marker, after which the entropy-coded
+image data follows. The walker here jumps from segment to segment using the
+length fields, so reading the header costs a few dozen byte lookups no matter
+how large the file is. Whole-buffer statistics use NumPy views of the bytes
+instead of Python loops.
+
+Quantization tables (DQT) are read from the header to estimate the encoder
+quality against the standard IJG (libjpeg) tables and to fingerprint the
+encoder, without decoding any pixels.
+"""
+
+import hashlib
+import logging
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from utils.bit_ops import popcount
+
+logger = logging.getLogger(__name__)
+
+# Marker bytes (the byte following 0xFF)
+SOI = 0xD8
+EOI = 0xD9
+SOS = 0xDA
+DQT = 0xDB
+TEM = 0x01
+# RST0-RST7 carry no length field either
+_STANDALONE_MARKERS = {SOI, EOI, TEM, *range(0xD0, 0xD8)}
+
+# Per-byte masks for the 8-byte block statistics
+_LOW_BYTE = np.uint64(0xFF)
+_BYTE_ONES = np.uint64(0x0101010101010101)
+_LOW_7_BITS = np.uint64(0x7F7F7F7F7F7F7F7F)
+_HIGH_BITS = np.uint64(0x8080808080808080)
+_LANES_PER_SLICE = 1 << 15
+
+# Natural (row-major) position of each coefficient in DQT zigzag order
+ZIGZAG = np.array([
+    0, 1, 8, 16, 9, 2, 3, 10, 17, 24, 32, 25, 18, 11, 4, 5,
+    12, 19, 26, 33, 40, 48, 41, 34, 27, 20, 13, 6, 7, 14, 21, 28,
+    35, 42, 49, 56, 57, 50, 43, 36, 29, 22, 15, 23, 30, 37, 44, 51,
+    58, 59, 52, 45, 38, 31, 39, 46, 53, 60, 61, 54, 47, 55, 62, 63
+])
+
+# Example tables from the JPEG standard (Annex K), natural order - the
+# libjpeg quality scale is applied to these
+STD_LUMINANCE_TABLE = np.array([
+    16, 11, 10, 16, 24, 40, 51, 61,
+    12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56,
+    14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77,
+    24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101,
+    72, 92, 95, 98, 112, 100, 103, 99
+], dtype=np.int32)
+
+STD_CHROMINANCE_TABLE = np.array([
+    17, 18, 24, 47, 99, 99, 99, 99,
+    18, 21, 26, 66, 99, 99, 99, 99,
+    24, 26, 56, 99, 99, 99, 99, 99,
+    47, 66, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99,
+    99, 99, 99, 99, 99, 99, 99, 99
+], dtype=np.int32)
+
+
+def _ijg_scaled_tables(base: np.ndarray) -> np.ndarray:
+    """A base table scaled for every quality 1-100 as libjpeg does (baseline, 1-255)."""
+    quality = np.arange(1, 101, dtype=np.int32)[:, None]
+    scale = np.where(quality < 50, 5000 // quality, 200 - quality * 2)
+    return np.clip((base[None, :] * scale + 50) // 100, 1, 255)
+
+
+# Row q-1 holds the table libjpeg writes at quality q
+_IJG_LUMINANCE = _ijg_scaled_tables(STD_LUMINANCE_TABLE)
+_IJG_CHROMINANCE = _ijg_scaled_tables(STD_CHROMINANCE_TABLE)
+
+
+class JpegSegment(NamedTuple):
+    """One marker segment of a JPEG header."""
+    marker: int        # marker byte, e.g. 0xDB for DQT
+    offset: int        # position of the 0xFF byte in the file
+    payload: memoryview  # segment data after the length field (empty for standalone markers)
+
+
+def iter_segments(data: bytes) -> Iterator[JpegSegment]:
+    """
+    Walk the marker segments of a JPEG, from SOI up to and including SOS.
+
+    Stops at SOS (the entropy-coded data is not scanned), at EOI, or at the
+    first malformed or truncated segment.
+
+    Args:
+        data: Raw JPEG bytes
+
+    Yields:
+        JpegSegment: Segments in file order
+    """
+    view = memoryview(data)
+    size = len(view)
+    if size < 2 or view[0] != 0xFF or view[1] != SOI:
+        return
+
+    yield JpegSegment(SOI, 0, view[0:0])
+    pos = 2
+
+    while pos + 1 < size:
+        if view[pos] != 0xFF:
+            logger.debug(f"Expected a JPEG marker at offset {pos}")
+            return
+
+        # Any number of 0xFF fill bytes may precede a marker
+        marker_pos = pos
+        while pos + 1 < size and view[pos + 1] == 0xFF:
+            pos += 1
+        if pos + 1 >= size:
+            return
+        marker = view[pos + 1]
+        pos += 2
+
+        if marker in _STANDALONE_MARKERS:
+            yield JpegSegment(marker, marker_pos, view[pos:pos])
+            if marker == EOI:
+                return
+            continue
+
+        if pos + 2 > size:
+            return
+        length = (view[pos] << 8) | view[pos + 1]
+        if length < 2 or pos + length > size:
+            logger.debug(f"Truncated JPEG segment 0xFF{marker:02X} at offset {marker_pos}")
+            return
+
+        yield JpegSegment(marker, marker_pos, view[pos + 2:pos + length])
+        if marker == SOS:
+            return
+        pos += length
+
+
+def header_markers(data: bytes, limit: int = 10) -> List[str]:
+    """
+    Markers of the JPEG header segments, as '0xFFD8'-style strings.
+
+    Args:
+        data: Raw JPEG bytes
+        limit: Maximum number of markers returned
+
+    Returns:
+        list: Marker names in file order, up to SOS
+    """
+    markers = []
+    for segment in iter_segments(data):
+        markers.append(f"0xFF{segment.marker:02X}")
+        if len(markers) >= limit:
+            break
+    return markers
+
+
+def count_repetitive_blocks(data: bytes, min_repeats: int = 7, limit: int = 100) -> int:
+    """
+    Count aligned 8-byte blocks in which at least `min_repeats` bytes equal the block's first byte.
+
+    Blocks start every 8 bytes and the final, possibly partial, block is ignored.
+    Each block is one uint64 lane: XOR-ing it with its first byte repeated eight
+    times zeroes the matching bytes, and the differing bytes are counted with
+    bit tricks and a popcount, all vectorized. Counting stops once `limit` is reached.
+
+    Args:
+        data: Raw file bytes
+        min_repeats: Occurrences of the first byte that make a block repetitive
+        limit: Cap on the returned count
+
+    Returns:
+        int: Number of repetitive blocks, at most `limit`
+    """
+    block_count = (len(data) - 1) // 8 if len(data) > 8 else 0
+    if block_count == 0:
+        return 0
+
+    blocks = np.frombuffer(data, dtype="<u8", count=block_count)
+    max_differing = 8 - min_repeats
+
+    # Work through the buffer in cache-sized slices so a capped count stops early
+    count = 0
+    for start in range(0, block_count, _LANES_PER_SLICE):
+        lanes = blocks[start:start + _LANES_PER_SLICE]
+        differing = lanes ^ ((lanes & _LOW_BYTE) * _BYTE_ONES)
+        # High bit of each byte set iff that byte is non-zero
+        nonzero = (((differing & _LOW_7_BITS) + _LOW_7_BITS) | differing) & _HIGH_BITS
+        count += int(np.count_nonzero(popcount(nonzero) <= max_differing))
+        if count >= limit:
+            return limit
+    return count
+
+
+class QualityEstimate(NamedTuple):
+    """JPEG quality read from the quantization tables."""
+    quality: int       # closest IJG quality, 1-100
+    exact: bool        # tables are exactly the IJG tables for that quality
+    fingerprint: str   # stable digest of the tables, identifies the encoder settings
+
+
+def parse_quantization_tables(data: bytes) -> Dict[int, np.ndarray]:
+    """
+    Read the quantization tables from the DQT segments of a JPEG header.
+
+    Args:
+        data: Raw JPEG bytes
+
+    Returns:
+        dict: Table id (0-3) -> 64 coefficients in natural (row-major) order.
+            Empty if the data is not a JPEG or has no readable DQT segment.
+    """
+    tables = {}
+    for segment in iter_segments(data):
+        if segment.marker != DQT:
+            continue
+
+        payload = segment.payload
+        pos = 0
+        # One DQT segment may hold several tables
+        while pos < len(payload):
+            precision, table_id = payload[pos] >> 4, payload[pos] & 0x0F
+            entry_size = 2 if precision else 1
+            end = pos + 1 + 64 * entry_size
+            if end > len(payload) or table_id > 3:
+                logger.debug(f"Malformed DQT segment at offset {segment.offset}")
+                break
+
+            values = np.frombuffer(payload[pos + 1:end], dtype=">u2" if precision else np.uint8)
+            table = np.empty(64, dtype=np.int32)
+            table[ZIGZAG] = values
+            tables[table_id] = table
+            pos = end
+
+    return tables
+
+
+def estimate_quality(data: bytes) -> Optional[QualityEstimate]:
+    """
+    Estimate the quality a JPEG was encoded at from its quantization tables.
+
+    The luminance table (and the chrominance table, if present) is compared
+    with the IJG tables for every quality 1-100, and the closest quality is
+    returned. Only the header segments are read.
+
+    Args:
+        data: Raw JPEG bytes
+
+    Returns:
+        QualityEstimate, or None if the data has no quantization tables
+    """
+    tables = parse_quantization_tables(data)
+    if not tables:
+        return None
+
+    table_ids = sorted(tables)
+    luminance = tables[table_ids[0]]
+    errors = np.abs(_IJG_LUMINANCE - luminance).sum(axis=1)
+    if len(table_ids) > 1:
+        errors = errors + np.abs(_IJG_CHROMINANCE - tables[table_ids[1]]).sum(axis=1)
+
+    best = int(np.argmin(errors))
+    return QualityEstimate(
+        quality=best + 1,
+        exact=bool(errors[best] == 0),
+        fingerprint=table_fingerprint(tables)
+    )
+
+
+def table_fingerprint(tables: Dict[int, np.ndarray]) -> str:
+    """
+    Digest of a set of quantization tables.
+
+    Encoders with fixed settings (e.g. messaging apps re-encoding uploads)
+    always write the same tables, so equal fingerprints identify the encoder.
+
+    Returns:
+        str: 16 hex characters
+    """
+    digest = hashlib.sha1()
+    for table_id in sorted(tables):
+        digest.update(bytes([table_id]))
+        digest.update(tables[table_id].astype(">u2").tobytes())
+    return digest.hexdigest()[:16]
+
+
+if __name__ == "__main__":
+    # Print the quality and table fingerprint of sample files, e.g. to add
+    # re-encoder signatures to config/jpeg_signatures.json:
+    #   python -m utils.jpeg_parser IMG-20241214-WA0001.jpg ...
+    import sys
+
+    for sample_path in sys.argv[1:]:
+        with open(sample_path, "rb") as f:
+            result = estimate_quality(f.read())
+        if result is None:
+            print(f"{sample_path}: no quantization tables")
+        else:
+            print(f"{sample_path}: quality {result.quality} "
+                  f"({'IJG tables' if result.exact else 'custom tables'}), fingerprint {result.fingerprint}")
@@ -0,0 +1,160 @@
+"""
+Keyset Pagination and Field Projection for List Endpoints
+
+Pages are addressed by an opaque cursor holding the sort key and the _id
+tie-breaker of the last document returned, so the next page is an index
+range scan ("after this key") instead of a growing skip.
+
+Usage:
+    page = KeysetPage("created_at", DESCENDING, limit=50, cursor=cursor)
+    documents = await db.complaints.find(page.filter(query), projection) \
+        .sort(page.sort).to_list(page.fetch_length)
+    documents, next_cursor = page.split(documents)
+"""
+
+import re
+import base64
+import binascii
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId, json_util
+from pymongo import ASCENDING, DESCENDING
+
+_FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
+
+# Sort key types a cursor may carry - anything else (e.g. an operator
+# document in a forged cursor) would change the meaning of the page query
+_SORT_VALUE_TYPES = (str, int, float, datetime)
+
+
+class PaginationError(ValueError):
+    """Raised for malformed cursors or field lists (reported as HTTP 400)."""
+
+
+def encode_cursor(sort_value, document_id) -> str:
+    """Opaque, URL-safe cursor for the position after a document."""
+    payload = json_util.dumps({"k": sort_value, "id": document_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (sort_value, document_id)
+
+    Raises:
+        PaginationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        sort_value, document_id = payload["k"], payload["id"]
+    except (ValueError, TypeError, KeyError, binascii.Error) as e:
+        raise PaginationError(f"Invalid cursor: {str(e)}")
+
+    if sort_value is not None and not isinstance(sort_value, _SORT_VALUE_TYPES):
+        raise PaginationError("Invalid cursor: unsupported sort value")
+    if not isinstance(document_id, ObjectId):
+        raise PaginationError("Invalid cursor: unsupported document id")
+    return sort_value, document_id
+
+
+def _field_value(document: Dict, field: str):
+    """Value of a (dotted) field in a document, None if missing."""
+    value = document
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated query sorted by `sort_field`, then `_id`.
+
+    Documents without a value for the sort field sort before every value in
+    ascending order and after every value in descending order, as MongoDB
+    sorts null and missing values.
+    """
+
+    def __init__(self, sort_field: str, direction: int, limit: int, cursor: Optional[str] = None):
+        self.sort_field = sort_field
+        self.direction = direction
+        self.limit = limit
+        self.after = decode_cursor(cursor) if cursor else None
+
+    @property
+    def sort(self) -> List[Tuple[str, int]]:
+        return [(self.sort_field, self.direction), ("_id", self.direction)]
+
+    @property
+    def fetch_length(self) -> int:
+        # One extra document tells whether there is a next page
+        return self.limit + 1
+
+    def filter(self, query: Dict) -> Dict:
+        """The query restricted to documents after the cursor."""
+        if self.after is None:
+            return query
+
+        value, document_id = self.after
+        beyond = "$gt" if self.direction == ASCENDING else "$lt"
+        same_value = {self.sort_field: value, "_id": {beyond: document_id}}
+
+        if value is None:
+            # Nulls come first ascending (every value follows), last descending
+            after = [same_value]
+            if self.direction == ASCENDING:
+                after.append({self.sort_field: {"$ne": None}})
+        else:
+            after = [{self.sort_field: {beyond: value}}, same_value]
+            if self.direction == DESCENDING:
+                after.append({self.sort_field: None})
+
+        keyset = {"$or": after}
+        return {"$and": [query, keyset]} if query else keyset
+
+    def split(self, documents: List[Dict]) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Trim the fetched documents to the page.
+
+        Returns:
+            tuple: (documents on this page, cursor of the next page or None)
+        """
+        if len(documents) <= self.limit:
+            return documents, None
+
+        documents = documents[:self.limit]
+        last = documents[-1]
+        return documents, encode_cursor(_field_value(last, self.sort_field), last["_id"])
+
+
+def projection(fields: Optional[str], default: Sequence[str], required: Sequence[str] = ()) -> Optional[Dict[str, int]]:
+    """
+    Build a MongoDB inclusion projection from a `fields=` query parameter.
+
+    Args:
+        fields: Comma-separated field names, "all" for whole documents, or
+            None for the default list view
+        default: Fields of the default (slim) list view
+        required: Fields always included (e.g. the sort key, for the cursor)
+
+    Returns:
+        dict: Projection for find(), or None for whole documents
+
+    Raises:
+        PaginationError: If a field name is malformed
+    """
+    if fields == "all":
+        return None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()] if fields else list(default)
+    for name in names:
+        if not _FIELD_NAME.match(name):
+            raise PaginationError(f"Invalid field name: {name!r}")
+
+    selected = {name: 1 for name in names}
+    selected.update({name: 1 for name in required})
+    return selected
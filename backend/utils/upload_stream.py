@@ -0,0 +1,225 @@
+"""
+Upload Streaming - Bounded Reading of Uploaded Images
+
+Uploaded images are read in chunks instead of with a single `await file.read()`.
+The size limit is enforced as the chunks arrive, and the format is verified from
+the magic bytes of the first chunk, which must also agree with the declared file
+extension and content type. An oversized or non-image upload is abandoned as
+soon as it is detected, so the copy held in memory stays bounded.
+
+Note that by the time an endpoint reads an UploadFile, Starlette has already
+parsed and spooled the whole multipart part (to a temporary file once it is
+large), so the per-file limit of read_upload() does not stop a large upload
+from being received. The only early abort is RequestSizeLimitMiddleware,
+which cuts off any request body above MAX_UPLOAD_REQUEST_MB while it streams in.
+"""
+
+import os
+import json
+import logging
+from typing import Iterable, Optional
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE_KB", "64")) * 1024
+MAX_UPLOAD_REQUEST_MB = float(os.environ.get("MAX_UPLOAD_REQUEST_MB", "60"))
+
+# Bytes needed to recognise every supported format
+SNIFF_BYTES = 12
+
+# Sniffed format -> file extensions it may be uploaded as
+FORMAT_EXTENSIONS = {
+    "jpeg": ("jpg", "jpeg"),
+    "png": ("png",),
+    "webp": ("webp",),
+}
+
+# Sniffed format -> content types it may be declared as
+FORMAT_CONTENT_TYPES = {
+    "jpeg": ("image/jpeg", "image/jpg", "image/pjpeg"),
+    "png": ("image/png",),
+    "webp": ("image/webp",),
+}
+
+# Declared content types that say nothing about the format
+_GENERIC_CONTENT_TYPES = ("", "application/octet-stream")
+
+
+class UploadRejected(Exception):
+    """Raised when an upload breaks a size or format rule while it is being read."""
+
+    def __init__(self, reason: str, status_code: int = 400):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """
+    Identify an image format from its leading magic bytes.
+
+    Args:
+        head: First bytes of the file (at least SNIFF_BYTES for WebP)
+
+    Returns:
+        str: 'jpeg', 'png' or 'webp', or None if not a supported image
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[0:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+async def read_upload(
+    upload: UploadFile,
+    max_bytes: int,
+    allowed_formats: Iterable[str],
+    chunk_size: Optional[int] = None
+) -> bytes:
+    """
+    Read an uploaded image in chunks, enforcing the size limit and format as it goes.
+
+    The upload has already been received and spooled by Starlette when this
+    runs, so max_bytes bounds what is read into memory, not what is received
+    (RequestSizeLimitMiddleware bounds that per request).
+
+    Args:
+        upload: The uploaded file
+        max_bytes: Maximum accepted size in bytes
+        allowed_formats: Allowed file extensions (e.g. ['jpg', 'png'])
+        chunk_size: Bytes read per chunk (defaults to UPLOAD_CHUNK_SIZE)
+
+    Returns:
+        bytes: The complete file content
+
+    Raises:
+        UploadRejected: As soon as the upload exceeds max_bytes, or if its
+            content is not one of the allowed image formats or does not match
+            its declared file extension or content type
+    """
+    chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+    allowed = {ext.strip().lower() for ext in allowed_formats}
+    max_mb = max_bytes / (1024 * 1024)
+
+    # Starlette knows the part size once the form is parsed - reject without reading
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadRejected(f"File size ({upload.size / (1024 * 1024):.2f}MB) exceeds limit of {max_mb:g}MB")
+
+    buffer = bytearray()
+    checked_format = False
+
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+
+        buffer += chunk
+        if len(buffer) > max_bytes:
+            raise UploadRejected(f"File size exceeds limit of {max_mb:g}MB")
+
+        if not checked_format and len(buffer) >= SNIFF_BYTES:
+            _check_format(bytes(buffer[:SNIFF_BYTES]), allowed, upload)
+            checked_format = True
+
+    if not checked_format:
+        _check_format(bytes(buffer), allowed, upload)
+
+    return bytes(buffer)
+
+
+def _check_format(head: bytes, allowed: set, upload: UploadFile) -> None:
+    """Reject content that is not an allowed image format, or not the declared one."""
+    image_format = sniff_format(head)
+    if image_format is None or not allowed.intersection(FORMAT_EXTENSIONS[image_format]):
+        raise UploadRejected(
+            f"File content is not a supported image. Allowed formats: {', '.join(sorted(allowed))}"
+        )
+
+    filename = upload.filename or ""
+    if "." in filename and filename.rsplit(".", 1)[-1].lower() not in FORMAT_EXTENSIONS[image_format]:
+        raise UploadRejected(f"File content is {image_format.upper()}, which does not match the name {filename}")
+
+    content_type = (upload.content_type or "").split(";")[0].strip().lower()
+    if content_type not in _GENERIC_CONTENT_TYPES and content_type not in FORMAT_CONTENT_TYPES[image_format]:
+        raise UploadRejected(f"File content is {image_format.upper()}, which does not match the type {content_type}")
+
+
+class RequestSizeLimitMiddleware:
+    """
+    ASGI middleware capping the body size of upload requests.
+
+    Requests declaring a larger Content-Length are refused before the body is
+    read. Streamed bodies are counted as they arrive and aborted with 413 once
+    the limit is crossed, before the multipart form is fully buffered.
+    """
+
+    def __init__(self, app, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = max_bytes if max_bytes is not None else int(MAX_UPLOAD_REQUEST_MB * 1024 * 1024)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request" and not rejected:
+                received += len(message.get("body", b""))
+                if received > self.max_bytes and not response_started:
+                    # Answer now: FastAPI turns body-parsing errors into a
+                    # generic 400, so whatever the app sends next is dropped
+                    rejected = True
+                    logger.warning(f"Aborted {scope['path']}: request body exceeds {self.max_bytes} bytes")
+                    await self._reject(send)
+                    raise _RequestTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _RequestTooLarge:
+            pass
+
+    async def _reject(self, send) -> None:
+        body = json.dumps({
+            "detail": f"Request body exceeds limit of {self.max_bytes / (1024 * 1024):g}MB"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class _RequestTooLarge(Exception):
+    """Internal signal that a streamed request body crossed the limit."""
@@ -0,0 +1,25 @@
+"""
+Shared pytest configuration for the GrievanceGenie backend tests.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Backend modules import each other as top-level packages (services, utils, models)
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture(autouse=True)
+def empty_result_cache():
+    """Every test starts with empty in-process validation and geocode caches."""
+    from services import result_cache, geocode_cache
+
+    result_cache.clear()
+    geocode_cache.clear()
+    yield
+    result_cache.clear()
+    geocode_cache.clear()
@@ -0,0 +1,178 @@
+"""
+Tests for the re-routing worker for complaints needing manual routing.
+"""
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from services import complaint_rerouting, directory_cache, officer_routing
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        self.documents = sorted(self.documents, key=lambda d: d["_id"])
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length):
+        return self.documents
+
+    def __aiter__(self):
+        self._iter = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class BulkWriteResult:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class FakeComplaints:
+    def __init__(self, documents):
+        self.documents = documents
+        self.bulk_writes = 0
+        self.fail_on_write = None
+
+    def find(self, query, projection=None):
+        after = query.get("_id", {}).get("$gt")
+        return FakeCursor([
+            {"_id": d["_id"], "location": d["location"], "category": d["category"]}
+            for d in self.documents
+            if d["needs_manual_routing"] is query["needs_manual_routing"] and (after is None or d["_id"] > after)
+        ])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes += 1
+        if self.bulk_writes == self.fail_on_write:
+            raise ConnectionError("connection reset")
+        modified = 0
+        for operation in operations:
+            for document in self.documents:
+                if all(document.get(k) == v for k, v in operation._filter.items()):
+                    document.update(operation._doc["$set"])
+                    document.setdefault("timeline", []).append(operation._doc["$push"]["timeline"])
+                    modified += 1
+        return BulkWriteResult(modified)
+
+
+class FakeCheckpoints:
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query):
+        return self.documents.get(query["_id"])
+
+    async def update_one(self, query, update, upsert=False):
+        self.documents.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+    async def delete_one(self, query):
+        self.documents.pop(query["_id"], None)
+
+
+class FakeDirectoryCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor(list(self.documents))
+
+
+OFFICERS = [
+    {"officer_id": "roads_w1", "name": "Asha", "title": "AE", "department": "roads", "wards": [1]},
+    {"officer_id": "city_admin", "name": "Vikram", "title": "Admin", "department": "general", "wards": []},
+]
+
+
+def _complaint(ward, category, flagged=True):
+    return {
+        "_id": ObjectId(), "location": {"ward": ward}, "category": category,
+        "status": "unassigned" if flagged else "assigned", "needs_manual_routing": flagged
+    }
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    complaints = FakeComplaints(
+        [_complaint(1, "roads") for _ in range(5)]
+        + [_complaint(7, "parks") for _ in range(3)]
+        + [_complaint(1, "roads", flagged=False)]
+    )
+    checkpoints = FakeCheckpoints()
+    officers = FakeDirectoryCollection(OFFICERS)
+    database = type("FakeDB", (), {"officers": officers, "supervisors": FakeDirectoryCollection([])})()
+
+    monkeypatch.setattr(complaint_rerouting, "complaints_collection", complaints)
+    monkeypatch.setattr(complaint_rerouting, "checkpoints_collection", checkpoints)
+    monkeypatch.setattr(directory_cache, "_directory", None)
+    monkeypatch.setattr(directory_cache, "_database", None)
+    monkeypatch.setattr(officer_routing, "ROUTING_TABLE", officer_routing.compile_routing_table(
+        {"ward_1": {"roads": "roads_w1"}, "default_city": {"parks": "head_parks"}}
+    ))
+    asyncio.run(directory_cache.load(database))
+    return complaints, checkpoints, officers
+
+
+def test_routable_complaints_are_assigned_in_bulk(setup):
+    complaints, checkpoints, _ = setup
+
+    result = asyncio.run(complaint_rerouting.reroute(batch_size=2))
+
+    assert result == {"scanned": 8, "assigned": 5}
+    # Batches holding only unroutable complaints need no write
+    assert complaints.bulk_writes == 3
+    routed = [d for d in complaints.documents if d.get("assigned_officer")]
+    assert len(routed) == 5
+    assert all(d["status"] == "assigned" and not d["needs_manual_routing"] for d in routed)
+    assert routed[0]["assigned_officer"]["name"] == "Asha"
+    assert routed[0]["timeline"][-1]["action"] == "assigned"
+    # head_parks is not in the directory, so parks complaints stay flagged
+    assert sum(d["needs_manual_routing"] for d in complaints.documents) == 3
+    assert checkpoints.documents == {}
+
+
+def test_interrupted_pass_resumes_from_checkpoint(setup):
+    complaints, checkpoints, _ = setup
+    complaints.fail_on_write = 2
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(complaint_rerouting.reroute(batch_size=2))
+
+    first_batch = sorted(d["_id"] for d in complaints.documents if d["needs_manual_routing"] or d.get("assigned_officer"))[:2]
+    assert checkpoints.documents[complaint_rerouting.CHECKPOINT_ID]["last_id"] == first_batch[-1]
+
+    result = asyncio.run(complaint_rerouting.reroute(batch_size=2))
+
+    # The failed batch was not checkpointed, so it is read again
+    assert result == {"scanned": 6, "assigned": 3}
+    assert checkpoints.documents == {}
+    assert not any(d["needs_manual_routing"] for d in complaints.documents if d["category"] == "roads")
+
+
+def test_roster_change_triggers_a_new_pass(setup):
+    complaints, _, officers = setup
+
+    async def run_worker():
+        worker = asyncio.create_task(complaint_rerouting.run_rerouter(interval=0.01))
+        await asyncio.sleep(0.03)
+        officers.documents.append({"officer_id": "head_parks", "name": "Leela", "title": "HOD", "department": "parks"})
+        await directory_cache.load()
+        await asyncio.sleep(0.03)
+        worker.cancel()
+
+    asyncio.run(run_worker())
+
+    assert not any(d["needs_manual_routing"] for d in complaints.documents)
+    assert {d["assigned_officer"]["officer_id"] for d in complaints.documents if d.get("assigned_officer")} >= {"head_parks"}
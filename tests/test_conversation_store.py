@@ -0,0 +1,191 @@
+"""
+Tests for the bounded, write-behind chat conversation store.
+"""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+import server
+from models import ChatRequest
+from services import conversation_store
+from services.result_cache import LRUCache
+
+
+class FakeConversations:
+    def __init__(self):
+        self.documents = {}
+        self.bulk_writes = 0
+        self.unavailable = False
+        self.delay = 0.0
+
+    async def find_one(self, query):
+        document = self.documents.get(query["_id"])
+        if document is None:
+            return None
+        newer_than = query.get("updated_at", {}).get("$gt")
+        if newer_than is not None and not document["updated_at"] > newer_than:
+            return None
+        return dict(document, _id=query["_id"])
+
+    async def bulk_write(self, operations, ordered=True):
+        await asyncio.sleep(self.delay)
+        if self.unavailable:
+            raise ConnectionError("connection refused")
+        self.bulk_writes += 1
+        errors = []
+        for index, operation in enumerate(operations):
+            conversation_id = operation._filter["_id"]
+            current = self.documents.get(conversation_id)
+            if current is None or current["updated_at"] < operation._filter["updated_at"]["$lt"]:
+                self.documents[conversation_id] = dict(operation._doc)
+            else:
+                # Upsert of a document whose _id exists but does not match the filter
+                errors.append({"index": index, "code": 11000})
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+@pytest.fixture
+def store(monkeypatch):
+    collection = FakeConversations()
+    monkeypatch.setattr(conversation_store, "conversations_collection", collection)
+    monkeypatch.setattr(conversation_store, "_memory", LRUCache(conversation_store.CONVERSATION_MAX_ENTRIES))
+    monkeypatch.setattr(conversation_store, "_pending", conversation_store.OrderedDict())
+    monkeypatch.setattr(conversation_store, "_store_ready", True)
+    return collection
+
+
+def _messages(count, start=0):
+    return [{"role": "user", "content": f"message {n}"} for n in range(start, start + count)]
+
+
+def test_history_is_capped_to_a_window(store, monkeypatch):
+    monkeypatch.setattr(conversation_store, "CONVERSATION_MAX_MESSAGES", 4)
+
+    stored = conversation_store.save("conv-1", _messages(10))
+
+    assert [m["content"] for m in stored] == ["message 6", "message 7", "message 8", "message 9"]
+    assert asyncio.run(conversation_store.get("conv-1")) == stored
+
+
+def test_in_memory_tier_is_bounded(store, monkeypatch):
+    monkeypatch.setattr(conversation_store, "_memory", LRUCache(3))
+
+    for n in range(10):
+        conversation_store.save(f"conv-{n}", _messages(2))
+
+    assert conversation_store.stats()["in_memory"] == 3
+
+
+def test_saves_are_written_behind_in_one_bulk_write(store):
+    for n in range(5):
+        conversation_store.save(f"conv-{n}", _messages(2))
+
+    assert store.documents == {}
+    assert asyncio.run(conversation_store.flush()) == 5
+    assert store.bulk_writes == 1
+    assert conversation_store.stats()["pending_writes"] == 0
+
+    # A restarted worker finds the conversation in MongoDB
+    conversation_store.clear()
+    assert asyncio.run(conversation_store.get("conv-3")) == _messages(2)
+    document = store.documents["conv-3"]
+    assert document["expires_at"] - document["updated_at"] == timedelta(seconds=conversation_store.CONVERSATION_TTL)
+
+
+def test_newer_copy_from_another_worker_wins(store):
+    conversation_store.save("conv-1", _messages(2))
+    asyncio.run(conversation_store.flush())
+    stale = dict(store.documents["conv-1"])
+
+    # Another worker continues the conversation
+    store.documents["conv-1"] = dict(stale, messages=_messages(4), updated_at=stale["updated_at"] + timedelta(seconds=5))
+
+    assert asyncio.run(conversation_store.get("conv-1")) == _messages(4)
+
+    # A late write of an older copy does not overwrite it
+    conversation_store._pending["conv-1"] = (stale["updated_at"] + timedelta(seconds=1), _messages(3))
+    assert asyncio.run(conversation_store.flush()) == 1
+    assert store.documents["conv-1"]["messages"] == _messages(4)
+    assert conversation_store.stats()["pending_writes"] == 0
+
+
+def test_failed_flush_is_retried(store):
+    conversation_store.save("conv-1", _messages(2))
+    store.unavailable = True
+
+    assert asyncio.run(conversation_store.flush()) == 0
+    # Still served from memory while MongoDB is down
+    assert asyncio.run(conversation_store.get("conv-1")) == _messages(2)
+
+    store.unavailable = False
+    assert asyncio.run(conversation_store.flush()) == 1
+    assert store.documents["conv-1"]["messages"] == _messages(2)
+
+
+def test_interrupted_flush_keeps_conversations_pending(store):
+    store.delay = 1.0
+    conversation_store.save("conv-1", _messages(2))
+
+    async def shutdown_during_flush():
+        writer = asyncio.create_task(conversation_store.flush())
+        await asyncio.sleep(0.01)
+        # Saved again while the write is in progress
+        conversation_store.save("conv-2", _messages(2))
+        writer.cancel()
+        try:
+            await writer
+        except asyncio.CancelledError:
+            pass
+        store.delay = 0.0
+        return await conversation_store.flush()
+
+    assert asyncio.run(shutdown_during_flush()) == 2
+    assert set(store.documents) == {"conv-1", "conv-2"}
+    assert conversation_store.stats()["pending_writes"] == 0
+
+
+def test_save_during_flush_is_written_next_time(store):
+    store.delay = 0.05
+    conversation_store.save("conv-1", _messages(2))
+
+    async def save_during_flush():
+        writer = asyncio.create_task(conversation_store.flush())
+        await asyncio.sleep(0.01)
+        conversation_store.save("conv-1", _messages(3))
+        await writer
+
+    asyncio.run(save_during_flush())
+
+    assert conversation_store.stats()["pending_writes"] == 1
+    assert asyncio.run(conversation_store.flush()) == 1
+    assert store.documents["conv-1"]["messages"] == _messages(3)
+
+
+def test_memory_only_without_mongo_tier(store, monkeypatch):
+    monkeypatch.setattr(conversation_store, "_store_ready", False)
+
+    conversation_store.save("conv-1", _messages(2))
+
+    assert asyncio.run(conversation_store.flush()) == 0
+    assert asyncio.run(conversation_store.get("conv-1")) == _messages(2)
+
+
+def test_chat_endpoint_keeps_history_in_the_store(store, monkeypatch):
+    seen_histories = []
+
+    async def handle_conversation(conversation_id, user_message, conversation_history=[]):
+        seen_histories.append(list(conversation_history))
+        return {"response": f"echo {user_message}", "needsMoreInfo": True, "extractedData": {}, "nextQuestion": None}
+
+    monkeypatch.setattr(server, "handle_conversation", handle_conversation)
+
+    first = asyncio.run(server.chat_endpoint(ChatRequest(message="pothole")))
+    asyncio.run(server.chat_endpoint(ChatRequest(message="MG Road", conversationId=first.conversationId)))
+
+    assert seen_histories[0] == []
+    assert [m["content"] for m in seen_histories[1]] == ["pothole", "echo pothole"]
+    assert len(asyncio.run(conversation_store.get(first.conversationId))) == 4
@@ -0,0 +1,113 @@
+"""
+Tests for the declared indexes and the startup query plan report.
+"""
+
+import asyncio
+
+import pytest
+from pymongo.errors import OperationFailure, ServerSelectionTimeoutError
+
+from services import db_indexes
+
+
+def _index_for(query):
+    """The declared index whose leading keys serve the query's filter, then its sort."""
+    sort = query["sort"] or []
+    # A range on a sort field is served by the sort keys
+    filter_fields = {field for field in query["filter"] if not field.startswith("$")} - {field for field, _ in sort}
+
+    for keys, _ in db_indexes.INDEXES[query["collection"]]:
+        leading = keys[:len(filter_fields)]
+        following = keys[len(filter_fields):len(filter_fields) + len(sort)]
+        if {field for field, _ in leading} == filter_fields and following == sort:
+            return keys
+    return None
+
+
+@pytest.mark.parametrize("query", db_indexes.hot_queries(), ids=lambda query: query["name"])
+def test_every_hot_query_has_a_matching_index(query):
+    assert _index_for(query) is not None
+
+
+class FakeCursor:
+    def __init__(self, collection, query):
+        self.collection = collection
+        self.query = query
+
+    def sort(self, keys):
+        return self
+
+    def limit(self, count):
+        return self
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self.collection.plan}}
+
+
+class FakeCollection:
+    def __init__(self, name, database):
+        self.name = name
+        self.database = database
+        self.plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "id_1"}}
+
+    async def create_index(self, keys, **options):
+        if self.database.unavailable:
+            raise ServerSelectionTimeoutError("no servers")
+        if (self.name, tuple(keys)) in self.database.conflicts:
+            raise OperationFailure("E11000 duplicate key error")
+        self.database.created.append((self.name, keys, options))
+
+    def find(self, query):
+        return FakeCursor(self, query)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections = {}
+        self.created = []
+        self.conflicts = set()
+        self.unavailable = False
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection(name, self))
+
+
+def test_indexes_are_created_and_failures_skipped():
+    database = FakeDatabase()
+    database.conflicts.add(("complaints", (("complaint_id", 1),)))
+    declared = sum(len(indexes) for indexes in db_indexes.INDEXES.values())
+
+    ready = asyncio.run(db_indexes.ensure_indexes(database))
+
+    assert ready == declared - 1
+    assert ("officers", [("officer_id", 1)], {"unique": True}) in database.created
+    assert not any(name == "complaints" and keys == [("complaint_id", 1)] for name, keys, _ in database.created)
+
+
+def test_unavailable_database_stops_index_creation():
+    database = FakeDatabase()
+    database.unavailable = True
+
+    assert asyncio.run(db_indexes.ensure_indexes(database)) == 0
+
+
+def test_collection_scans_are_reported():
+    database = FakeDatabase()
+    database["supervisors"].plan = {"stage": "COLLSCAN"}
+    # Slot-based engine explain output nests the classic plan in queryPlan
+    database["complaints"].plan = {"queryPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}
+
+    report = asyncio.run(db_indexes.explain_report(database))
+    scanning = {entry["collection"] for entry in report if entry["collscan"]}
+
+    assert scanning == {"supervisors", "complaints"}
+    assert len(report) == len(db_indexes.hot_queries())
+    assert next(entry for entry in report if entry["collection"] == "issues")["stages"] == ["FETCH", "IXSCAN"]
+
+
+def test_plan_stages_walks_nested_plans():
+    plan = {"stage": "SORT_MERGE", "inputStages": [
+        {"stage": "IXSCAN"}, {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+    ]}
+
+    assert db_indexes.plan_stages(plan) == ["SORT_MERGE", "IXSCAN", "FETCH", "IXSCAN"]
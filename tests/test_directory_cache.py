@@ -0,0 +1,135 @@
+"""
+Tests for the in-process officer and supervisor directory.
+"""
+
+import asyncio
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from services import directory_cache, officer_routing
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return self.documents
+
+
+class FakeCollection:
+    def __init__(self, database, documents):
+        self.database = database
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        self.database.round_trips += 1
+        hidden = {field for field, include in (projection or {}).items() if not include}
+        return FakeCursor([{k: v for k, v in d.items() if k not in hidden} for d in self.documents])
+
+    async def find_one(self, query):
+        self.database.round_trips += 1
+        return next((d for d in self.documents if all(d.get(k) == v for k, v in query.items())), None)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.round_trips = 0
+        self.officers = FakeCollection(self, [
+            {"officer_id": "OFF-1", "name": "Asha", "title": "AE", "department": "roads", "wards": [1, 2], "password": "x"},
+            {"officer_id": "OFF-2", "name": "Ravi", "title": "JE", "department": "water", "wards": [2], "password": "x"},
+        ])
+        self.supervisors = FakeCollection(self, [
+            {"supervisor_id": "SUP-1", "name": "Meera", "department": "roads", "password": "x"},
+            {"supervisor_id": "SUP-2", "name": "Karan", "department": "water", "password": "x"},
+        ])
+
+    def watch(self, pipeline):
+        raise OperationFailure("The $changeStream stage is only supported on replica sets")
+
+
+@pytest.fixture
+def database(monkeypatch):
+    monkeypatch.setattr(directory_cache, "_directory", None)
+    monkeypatch.setattr(directory_cache, "_database", None)
+    monkeypatch.setattr(directory_cache, "_reload_task", None)
+    database = FakeDatabase()
+    asyncio.run(directory_cache.load(database))
+    database.round_trips = 0
+    return database
+
+
+def test_routing_lookups_need_no_round_trips(database):
+    async def lookups():
+        officer = await officer_routing.get_officer_details(database, "OFF-1")
+        supervisor = await directory_cache.find_supervisor("water")
+        return officer, supervisor
+
+    officer, supervisor = asyncio.run(lookups())
+
+    assert officer["name"] == "Asha" and officer["ward"] == 1
+    assert supervisor["supervisor_id"] == "SUP-2"
+    assert database.round_trips == 0
+
+
+def test_passwords_are_not_cached(database):
+    assert "password" not in asyncio.run(directory_cache.get_officer("OFF-1"))
+    assert "password" not in asyncio.run(directory_cache.get_supervisor("SUP-1"))
+
+
+def test_unknown_department_falls_back_to_any_supervisor(database):
+    assert asyncio.run(directory_cache.find_supervisor("parks"))["supervisor_id"] == "SUP-1"
+
+
+def test_officers_by_ward_and_department(database):
+    ward_2 = asyncio.run(directory_cache.officers_for(ward=2))
+    water_in_ward_2 = asyncio.run(directory_cache.officers_for(department="water", ward=2))
+
+    assert {o["officer_id"] for o in ward_2} == {"OFF-1", "OFF-2"}
+    assert [o["officer_id"] for o in water_in_ward_2] == ["OFF-2"]
+
+
+def test_officer_added_after_load_is_fetched_from_database(database):
+    database.officers.documents.append({"officer_id": "OFF-3", "name": "Nisha", "department": "parks", "wards": []})
+
+    officer = asyncio.run(officer_routing.get_officer_details(database, "OFF-3"))
+
+    assert officer["name"] == "Nisha"
+    assert database.round_trips == 1
+
+
+def test_stale_directory_is_served_while_reloading(database, monkeypatch):
+    monkeypatch.setattr(directory_cache, "DIRECTORY_CACHE_TTL", 0)
+    database.supervisors.documents[0]["name"] = "Meera S."
+
+    async def lookups():
+        stale = await directory_cache.get_supervisor("SUP-1")
+        await directory_cache._reload_task
+        return stale, await directory_cache.get_supervisor("SUP-1")
+
+    stale, fresh = asyncio.run(lookups())
+
+    assert stale["name"] == "Meera"
+    assert fresh["name"] == "Meera S."
+
+
+def test_invalidate_reloads_on_next_lookup(database):
+    database.officers.documents[1]["name"] = "Ravi K."
+    directory_cache.invalidate()
+
+    assert asyncio.run(directory_cache.get_officer("OFF-2"))["name"] == "Ravi K."
+    assert database.round_trips == 2
+
+
+def test_watcher_reloads_periodically_without_change_streams(database):
+    database.officers.documents.pop()
+
+    async def watch_briefly():
+        watcher = asyncio.create_task(directory_cache.run_watcher(interval=0.01))
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+
+    asyncio.run(watch_briefly())
+
+    assert asyncio.run(directory_cache.get_officer("OFF-2")) is None
@@ -0,0 +1,89 @@
+"""
+Tests for the forensics process pool.
+
+The pool is started once for the module with a single spawned worker.
+"""
+
+import asyncio
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from services import forensics_pool, validation_pipeline
+from services.image_context import ImageContext
+from utils.imageForensics import ImageSourceForensics
+
+
+def _jpeg_bytes():
+    buffer = io.BytesIO()
+    Image.linear_gradient("L").resize((320, 240)).convert("RGB").save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _large_jpeg_bytes():
+    """A 12 MP noise photo - takes long enough to classify to hit a short timeout."""
+    pixels = np.random.default_rng(0).integers(0, 256, (3000, 4000, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    workers = asyncio.run(forensics_pool.start_pool(workers=1))
+    try:
+        yield workers
+    finally:
+        asyncio.run(forensics_pool.shutdown_pool())
+
+
+def test_pool_result_matches_in_process_classification(pool):
+    data = _jpeg_bytes()
+
+    result = asyncio.run(forensics_pool.classify(data, "IMG_0001.jpg"))
+    expected = ImageSourceForensics().classify_image(data, ImageContext(data, "IMG_0001.jpg"), "IMG_0001.jpg")
+
+    assert pool == 1
+    assert result == expected
+
+
+def test_timeout_raises_and_pool_keeps_working(pool):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(forensics_pool.classify(_large_jpeg_bytes(), "slow.jpg", timeout=0.01))
+
+    result = asyncio.run(forensics_pool.classify(_jpeg_bytes(), "IMG_0001.jpg"))
+    assert result["source"] in ("WHATSAPP", "SCREENSHOT", "ORIGINAL_PHOTO", "UNKNOWN")
+
+
+def test_pipeline_forensics_step_uses_pool(pool, monkeypatch):
+    def in_thread_forensics(*args):
+        raise AssertionError("forensics should run in the pool")
+
+    monkeypatch.setattr(validation_pipeline, "run_forensics", in_thread_forensics)
+    context = ImageContext(_jpeg_bytes(), "IMG_0001.jpg")
+
+    analysis = asyncio.run(validation_pipeline._run_forensics_step(context, "IMG_0001.jpg"))
+
+    assert analysis["forensics_version"] == "3.0"
+    assert "error" not in analysis["classification_result"]
+
+
+def test_pipeline_forensics_step_falls_back_on_timeout(pool, monkeypatch):
+    monkeypatch.setattr(forensics_pool, "FORENSICS_TIMEOUT", 0.01)
+    context = ImageContext(_large_jpeg_bytes(), "IMG_0001.jpg")
+
+    analysis = asyncio.run(validation_pipeline._run_forensics_step(context, "IMG_0001.jpg"))
+
+    assert analysis["source_type"] == "UNKNOWN"
+    assert analysis["classification_result"]["recommendation"] == "ACCEPT"
+    assert "timed out" in analysis["classification_result"]["error"]
+
+
+def test_classify_requires_a_running_pool(monkeypatch):
+    monkeypatch.setattr(forensics_pool, "_pool", None)
+
+    assert not forensics_pool.is_running()
+    with pytest.raises(RuntimeError):
+        asyncio.run(forensics_pool.classify(b"", "empty.jpg"))
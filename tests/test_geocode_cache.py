@@ -0,0 +1,279 @@
+"""
+Tests for the spatially bucketed reverse geocoding cache.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from services import geocode_cache, exif_service
+
+
+def _address(city):
+    return {"address": f"Main Road, {city}", "city": city, "state": None, "country": "India", "postcode": None}
+
+
+_PER_POINT = object()
+
+
+class CountingFetcher:
+    """Upstream stand-in recording every request."""
+
+    def __init__(self, delay=0.0, result=_PER_POINT, error=None):
+        self.calls = []
+        self.delay = delay
+        self.result = result
+        self.error = error
+
+    async def __call__(self, latitude, longitude):
+        self.calls.append((latitude, longitude, time.monotonic()))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return _address(f"{latitude:.4f}") if self.result is _PER_POINT else self.result
+
+
+@pytest.fixture
+def fast_rate(monkeypatch):
+    monkeypatch.setattr(geocode_cache, "GEOCODE_RATE_PER_SECOND", 1000.0)
+
+
+def test_geohash_matches_reference_values():
+    assert geocode_cache.geohash(42.605, -5.603, precision=5) == "ezs42"
+    assert geocode_cache.geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+
+
+def test_nearby_points_share_a_cell(fast_rate):
+    fetch = CountingFetcher()
+
+    async def scenario():
+        first = await geocode_cache.lookup(26.91240, 75.78730, fetch)
+        nearby = await geocode_cache.lookup(26.91245, 75.78735, fetch)
+        elsewhere = await geocode_cache.lookup(26.95000, 75.80000, fetch)
+        return first, nearby, elsewhere
+
+    first, nearby, elsewhere = asyncio.run(scenario())
+
+    assert nearby == first
+    assert elsewhere != first
+    assert len(fetch.calls) == 2
+
+
+def test_concurrent_lookups_share_one_request(fast_rate):
+    fetch = CountingFetcher(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(geocode_cache.lookup(26.9124, 75.7873, fetch) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+
+    assert len(fetch.calls) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_missing_address_is_cached_but_errors_are_not(fast_rate):
+    no_address = CountingFetcher(result=None)
+    broken = CountingFetcher(error=RuntimeError("502 Bad Gateway"))
+
+    async def scenario():
+        first = await geocode_cache.lookup(0.0, 0.0, no_address)
+        second = await geocode_cache.lookup(0.0, 0.0, no_address)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await geocode_cache.lookup(10.0, 10.0, broken)
+        return first, second
+
+    assert asyncio.run(scenario()) == (None, None)
+    assert len(no_address.calls) == 1
+    assert len(broken.calls) == 2
+
+
+def test_upstream_requests_are_spaced(monkeypatch):
+    monkeypatch.setattr(geocode_cache, "GEOCODE_RATE_PER_SECOND", 20.0)
+    fetch = CountingFetcher()
+
+    async def scenario():
+        await asyncio.gather(*(geocode_cache.lookup(20.0 + i, 75.0, fetch) for i in range(4)))
+
+    asyncio.run(scenario())
+
+    times = sorted(called_at for _, _, called_at in fetch.calls)
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert len(times) == 4
+    assert min(gaps) >= 0.045
+
+
+def test_burst_beyond_max_wait_is_refused(monkeypatch):
+    monkeypatch.setattr(geocode_cache, "GEOCODE_RATE_PER_SECOND", 10.0)
+    monkeypatch.setattr(geocode_cache, "GEOCODE_MAX_WAIT", 0.15)
+    fetch = CountingFetcher()
+
+    async def scenario():
+        return await asyncio.gather(
+            *(geocode_cache.lookup(20.0 + i, 75.0, fetch) for i in range(5)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    refused = [result for result in results if isinstance(result, geocode_cache.GeocodeRateLimited)]
+    assert len(fetch.calls) == 2
+    assert len(refused) == 3
+
+
+def test_reverse_geocode_returns_none_when_rate_limited(monkeypatch):
+    async def limited(latitude, longitude, fetch):
+        raise geocode_cache.GeocodeRateLimited("busy")
+
+    monkeypatch.setattr(geocode_cache, "lookup", limited)
+
+    assert asyncio.run(exif_service.reverse_geocode(26.9, 75.8)) is None
+
+
+def test_stale_entry_is_served_and_renewed(fast_rate, monkeypatch):
+    monkeypatch.setattr(geocode_cache, "GEOCODE_REFRESH_AFTER", 60.0)
+    fetch = CountingFetcher(result=_address("Jaipur"))
+    cell = geocode_cache.geohash(26.9124, 75.7873)
+    geocode_cache._memory.set(cell, {
+        "result": _address("Old Jaipur"),
+        "fetched_at": datetime.utcnow() - timedelta(seconds=120),
+        "latitude": 26.9124,
+        "longitude": 75.7873
+    }, ttl=3600)
+
+    async def scenario():
+        served = await geocode_cache.lookup(26.9124, 75.7873, fetch)
+        await asyncio.sleep(0.05)
+        renewed = await geocode_cache.lookup(26.9124, 75.7873, fetch)
+        return served, renewed
+
+    served, renewed = asyncio.run(scenario())
+
+    assert served["city"] == "Old Jaipur"
+    assert renewed["city"] == "Jaipur"
+    assert len(fetch.calls) == 1
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, field, direction):
+        self.documents = sorted(self.documents, key=lambda document: document[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeGeocodeCollection:
+    """Minimal stand-in for the geocode_cache collection."""
+
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query):
+        return self.documents.get(query["_id"])
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = dict(document, _id=query["_id"])
+
+    async def insert_one(self, document):
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError("duplicate key")
+        self.documents[document["_id"]] = dict(document)
+
+    async def find_one_and_update(self, query, pipeline, return_document=None):
+        document = self.documents.get(query["_id"])
+        if document is None or document["next_slot"] > query["next_slot"]["$lte"]:
+            return None
+        # [{"$set": {"next_slot": {"$add": [{"$max": ["$next_slot", now]}, interval]}}}]
+        latest, interval = pipeline[0]["$set"]["next_slot"]["$add"]
+        document["next_slot"] = max(document["next_slot"], latest["$max"][1]) + interval
+        return dict(document)
+
+    def find(self, query, projection=None):
+        cutoff = query["fetched_at"]["$lt"]
+        return FakeCursor([
+            document for document in self.documents.values()
+            if "fetched_at" in document and document["fetched_at"] < cutoff
+        ])
+
+
+def test_mongo_tier_and_periodic_refresh(fast_rate, monkeypatch):
+    collection = FakeGeocodeCollection()
+    monkeypatch.setattr(geocode_cache, "geocode_cache_collection", collection)
+    monkeypatch.setattr(geocode_cache, "_store_ready", True)
+    monkeypatch.setattr(geocode_cache, "GEOCODE_REFRESH_AFTER", 60.0)
+    fetch = CountingFetcher()
+
+    async def scenario():
+        await geocode_cache.lookup(26.9124, 75.7873, fetch)
+        # Another worker with an empty in-process tier
+        geocode_cache._memory.clear()
+        from_store = await geocode_cache.lookup(26.9124, 75.7873, fetch)
+
+        # Age the stored entry and let the refresher renew it
+        cell = geocode_cache.geohash(26.9124, 75.7873)
+        collection.documents[cell]["fetched_at"] -= timedelta(seconds=120)
+        refreshed = await geocode_cache.refresh_stale(fetch)
+        return from_store, refreshed, collection.documents[cell]
+
+    from_store, refreshed, document = asyncio.run(scenario())
+
+    assert from_store["city"] == "26.9124"
+    assert refreshed == 1
+    assert len(fetch.calls) == 2
+    assert (datetime.utcnow() - document["fetched_at"]).total_seconds() < 5
+
+
+def test_rate_limit_is_shared_by_workers(monkeypatch):
+    collection = FakeGeocodeCollection()
+    monkeypatch.setattr(geocode_cache, "geocode_cache_collection", collection)
+    monkeypatch.setattr(geocode_cache, "_store_ready", True)
+    monkeypatch.setattr(geocode_cache, "GEOCODE_RATE_PER_SECOND", 10.0)
+    monkeypatch.setattr(geocode_cache, "GEOCODE_MAX_WAIT", 0.05)
+
+    async def scenario():
+        await geocode_cache._wait_for_slot()
+        # Another worker, with an idle in-process limiter
+        geocode_cache.clear()
+        with pytest.raises(geocode_cache.GeocodeRateLimited):
+            await geocode_cache._wait_for_slot()
+
+        # The refused request did not use up the next slot
+        await asyncio.sleep(0.1)
+        started = time.monotonic()
+        await geocode_cache._wait_for_slot()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 0.05
+
+
+def test_unreachable_limiter_falls_back_to_the_worker_limit(fast_rate, monkeypatch):
+    collection = FakeGeocodeCollection()
+
+    async def unreachable(*args, **kwargs):
+        raise ConnectionError("connection refused")
+
+    collection.find_one_and_update = unreachable
+    monkeypatch.setattr(geocode_cache, "geocode_cache_collection", collection)
+    monkeypatch.setattr(geocode_cache, "_store_ready", True)
+    fetch = CountingFetcher()
+
+    assert asyncio.run(geocode_cache.lookup(26.9124, 75.7873, fetch))["city"] == "26.9124"
+    assert len(fetch.calls) == 1
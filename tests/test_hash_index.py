@@ -0,0 +1,185 @@
+"""
+Tests for the in-process Hamming index used for duplicate-image detection.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from services import hash_service
+import numpy as np
+
+from services.hash_index import (
+    HammingIndex, hamming_distance, hex_to_int, int_to_hex, to_int64, from_int64
+)
+from utils.bit_ops import popcount
+
+
+def _brute_force(entries, query, radius):
+    return sorted(key for key, value in entries.items() if hamming_distance(query, value) <= radius)
+
+
+def test_search_matches_brute_force():
+    rng = random.Random(7)
+    index = HammingIndex()
+    entries = {}
+    for i in range(2000):
+        value = rng.getrandbits(64)
+        entries[f"issue-{i}"] = value
+        index.add(f"issue-{i}", value)
+
+    stored = list(entries.values())
+    for i in range(200):
+        query = rng.choice(stored)
+        for position in rng.sample(range(64), i % 8):
+            query ^= 1 << position
+        for radius in (0, 3, 5, 7):
+            found = sorted(key for key, _, _ in index.search(query, radius))
+            assert found == _brute_force(entries, query, radius)
+
+
+def test_results_are_sorted_by_distance():
+    index = HammingIndex()
+    index.add("far", 0b111)
+    index.add("exact", 0)
+    index.add("near", 0b1)
+
+    assert [(key, distance) for key, distance, _ in index.search(0, 5)] == [
+        ("exact", 0), ("near", 1), ("far", 3)
+    ]
+
+
+def test_add_replaces_and_remove_deletes():
+    index = HammingIndex()
+    index.add("issue-1", 0xFFFF, "a")
+    index.add("issue-1", 0, "b")
+
+    assert len(index) == 1
+    assert index.search(0xFFFF, 2) == []
+    assert index.search(0, 0) == [("issue-1", 0, "b")]
+
+    assert index.remove("issue-1") is True
+    assert index.remove("issue-1") is False
+    assert index.search(0, 5) == []
+
+
+def test_remove_keeps_remaining_entries_searchable():
+    index = HammingIndex(capacity=2)
+    index.add_many([(f"issue-{i}", i, i) for i in range(10)])
+
+    index.remove("issue-3")
+    index.remove("issue-0")
+
+    assert len(index) == 8
+    assert index.get("issue-9") == (9, 9)
+    assert sorted(key for key, _, _ in index.search(0, 64)) == sorted(
+        f"issue-{i}" for i in range(10) if i not in (0, 3)
+    )
+
+
+def test_popcount_matches_python():
+    rng = random.Random(3)
+    values = [rng.getrandbits(64) for _ in range(500)] + [0, 2**64 - 1]
+
+    counts = popcount(np.array(values, dtype=np.uint64))
+
+    assert counts.tolist() == [bin(value).count("1") for value in values]
+
+
+def test_hex_and_int64_round_trip():
+    assert int_to_hex(hex_to_int("00f0e0d0c0b0a090")) == "00f0e0d0c0b0a090"
+    for value in (0, 1, 2**63 - 1, 2**63, 2**64 - 1):
+        stored = to_int64(value)
+        assert -2**63 <= stored < 2**63
+        assert from_int64(stored) == value
+
+
+def test_only_resolved_hashes_are_indexed(monkeypatch):
+    index = HammingIndex()
+    monkeypatch.setattr(hash_service, "resolved_hash_index", index)
+
+    hash_service._apply_to_index({"issue_id": "GG-1", "image_hash": "99996666cc993366", "status": "pending"})
+    assert "GG-1" not in index
+
+    hash_service._apply_to_index({"issue_id": "GG-1", "image_hash": "99996666cc993366", "status": "resolved"})
+    assert "GG-1" in index
+
+    hash_service._apply_to_index({"issue_id": "GG-1", "phash_int": to_int64(0xf0f0f0f0f0f0f0f0), "status": "resolved"})
+    assert index.get("GG-1")[0] == 0xf0f0f0f0f0f0f0f0
+
+    hash_service._apply_to_index({"issue_id": "GG-1", "image_hash": "99996666cc993366", "status": "rejected"})
+    assert "GG-1" not in index
+
+
+def test_find_similar_hashes_uses_index(monkeypatch):
+    index = HammingIndex()
+    monkeypatch.setattr(hash_service, "resolved_hash_index", index)
+    monkeypatch.setattr(hash_service, "_index_ready", True)
+
+    hash_service._apply_to_index({"issue_id": "GG-1", "image_hash": "99996666cc993366", "status": "resolved"})
+    hash_service._apply_to_index({"issue_id": "GG-2", "image_hash": "0000000000000000", "status": "resolved"})
+
+    matches = asyncio.run(hash_service.find_similar_hashes("99996666cc993367", threshold=5))
+
+    assert [match["issue_id"] for match in matches] == ["GG-1"]
+    assert matches[0]["distance"] == 1
+    assert matches[0]["image_hash"] == "99996666cc993366"
+    assert matches[0]["similarity_score"] == pytest.approx(0.8)
+
+
+def test_hash_distance():
+    assert hash_service.hash_distance("99996666cc993366", "99996666cc993367") == 1
+    assert hash_service.hash_distance("99996666cc993366", "not-a-hash") == 999
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self._documents = documents
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        self._iterator = iter(self._documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeHashCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.bulk_writes = []
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.documents if "phash_int" not in doc])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append(len(operations))
+        by_id = {doc["_id"]: doc for doc in self.documents}
+        for operation in operations:
+            by_id[operation._filter["_id"]].update(operation._doc["$set"])
+
+
+def test_migrate_hex_hashes(monkeypatch):
+    collection = FakeHashCollection([
+        {"_id": 1, "image_hash": "ffffffffffffffff"},
+        {"_id": 2, "image_hash": "0000000000000001"},
+        {"_id": 3, "image_hash": "0000000000000002", "phash_int": 2},
+        {"_id": 4, "image_hash": "not-a-hash"},
+    ])
+    monkeypatch.setattr(hash_service, "image_hashes_collection", collection)
+
+    migrated = asyncio.run(hash_service.migrate_hex_hashes(batch_size=1))
+
+    assert migrated == 2
+    assert collection.bulk_writes == [1, 1]
+    assert collection.documents[0]["phash_int"] == -1
+    assert collection.documents[1]["phash_int"] == 1
+    assert "phash_int" not in collection.documents[3]
+    assert asyncio.run(hash_service.migrate_hex_hashes()) == 0
@@ -0,0 +1,219 @@
+"""
+Tests for the shared async HTTP session and the services that use it
+(Sightengine AI detection and Nominatim reverse geocoding).
+
+A real aiohttp server on localhost stands in for the third-party APIs.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+from services import http_client, sightengine_service, exif_service
+
+
+@asynccontextmanager
+async def local_server(handler, path="/"):
+    """Serve a single route on an ephemeral localhost port and yield its URL."""
+    app = web.Application()
+    app.router.add_route("*", path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}{path}"
+    finally:
+        await runner.cleanup()
+
+
+def _configure_sightengine(monkeypatch, url, timeout=5.0):
+    monkeypatch.setattr(sightengine_service, "SIGHTENGINE_API_USER", "test-user")
+    monkeypatch.setattr(sightengine_service, "SIGHTENGINE_API_SECRET", "test-secret")
+    monkeypatch.setattr(sightengine_service, "SIGHTENGINE_URL", url)
+    monkeypatch.setattr(sightengine_service, "SIGHTENGINE_TIMEOUT", timeout)
+
+
+def _write_image(tmp_path):
+    image_path = tmp_path / "photo.jpg"
+    image_path.write_bytes(b"\xff\xd8\xff\xe0" + b"\x00" * 64)
+    return str(image_path)
+
+
+def test_sightengine_success(monkeypatch, tmp_path):
+    async def handler(request):
+        form = await request.post()
+        assert form["api_user"] == "test-user"
+        assert form["models"] == "genai"
+        return web.json_response({"status": "success", "type": {"ai_generated": 0.95}})
+
+    async def scenario():
+        async with local_server(handler) as url:
+            _configure_sightengine(monkeypatch, url)
+            try:
+                return await sightengine_service.detect_ai_generated(_write_image(tmp_path))
+            finally:
+                await http_client.close_session()
+
+    result = asyncio.run(scenario())
+
+    assert result["skipped"] is False
+    assert result["is_ai_generated"] is True
+    assert result["ai_probability"] == 0.95
+
+
+def test_sightengine_timeout_is_skipped(monkeypatch, tmp_path):
+    async def handler(request):
+        await asyncio.sleep(2)
+        return web.json_response({"status": "success", "type": {"ai_generated": 0.99}})
+
+    async def scenario():
+        async with local_server(handler) as url:
+            _configure_sightengine(monkeypatch, url, timeout=0.2)
+            try:
+                return await sightengine_service.detect_ai_generated(_write_image(tmp_path))
+            finally:
+                await http_client.close_session()
+
+    result = asyncio.run(scenario())
+
+    assert result["skipped"] is True
+    assert result["is_ai_generated"] is False
+    assert result["error"].startswith("API request failed")
+
+
+def test_sightengine_api_failure_is_skipped(monkeypatch, tmp_path):
+    async def handler(request):
+        return web.json_response({"status": "failure", "error": {"message": "quota exceeded"}})
+
+    async def scenario():
+        async with local_server(handler) as url:
+            _configure_sightengine(monkeypatch, url)
+            try:
+                return await sightengine_service.detect_ai_generated(_write_image(tmp_path))
+            finally:
+                await http_client.close_session()
+
+    result = asyncio.run(scenario())
+
+    assert result["skipped"] is True
+    assert result["error"] == "quota exceeded"
+
+
+def test_in_flight_requests_are_capped(monkeypatch):
+    state = {"active": 0, "peak": 0}
+
+    async def handler(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.05)
+        state["active"] -= 1
+        return web.json_response({})
+
+    async def fetch(url):
+        async with http_client.request("GET", url, timeout=5) as response:
+            return response.status
+
+    async def scenario():
+        monkeypatch.setattr(http_client, "HTTP_MAX_IN_FLIGHT", 2)
+        async with local_server(handler) as url:
+            await http_client.start_session()
+            try:
+                return await asyncio.gather(*(fetch(url) for _ in range(8)))
+            finally:
+                await http_client.close_session()
+
+    statuses = asyncio.run(scenario())
+
+    assert statuses == [200] * 8
+    assert state["peak"] == 2
+
+
+def test_session_lifecycle():
+    async def scenario():
+        session = await http_client.start_session()
+        same_session = await http_client.start_session()
+        await http_client.close_session()
+        return session, same_session
+
+    session, same_session = asyncio.run(scenario())
+
+    assert session is same_session
+    assert session.closed
+
+
+def test_reverse_geocode_success(monkeypatch):
+    async def handler(request):
+        assert request.query["lat"] == "26.9"
+        return web.json_response({
+            "address": {
+                "road": "MI Road",
+                "suburb": "Sanganer",
+                "city": "Jaipur",
+                "state": "Rajasthan",
+                "country": "India",
+                "postcode": "302029"
+            }
+        })
+
+    async def scenario():
+        async with local_server(handler) as url:
+            monkeypatch.setattr(exif_service, "NOMINATIM_URL", url)
+            try:
+                return await exif_service.reverse_geocode(26.9, 75.8)
+            finally:
+                await http_client.close_session()
+
+    result = asyncio.run(scenario())
+
+    assert result["city"] == "Jaipur"
+    assert result["address"] == "MI Road, Sanganer, Jaipur, Rajasthan, India - 302029"
+
+
+def test_reverse_geocode_error_response_returns_none(monkeypatch):
+    async def handler(request):
+        return web.json_response({"error": "Unable to geocode"})
+
+    async def scenario():
+        async with local_server(handler) as url:
+            monkeypatch.setattr(exif_service, "NOMINATIM_URL", url)
+            try:
+                return await exif_service.reverse_geocode(0.0, 0.0)
+            finally:
+                await http_client.close_session()
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_reverse_geocode_http_error_returns_none(monkeypatch):
+    async def handler(request):
+        return web.Response(status=503)
+
+    async def scenario():
+        async with local_server(handler) as url:
+            monkeypatch.setattr(exif_service, "NOMINATIM_URL", url)
+            try:
+                return await exif_service.reverse_geocode(26.9, 75.8)
+            finally:
+                await http_client.close_session()
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_reverse_geocode_timeout_returns_none(monkeypatch):
+    async def handler(request):
+        await asyncio.sleep(2)
+        return web.json_response({})
+
+    async def scenario():
+        async with local_server(handler) as url:
+            monkeypatch.setattr(exif_service, "NOMINATIM_URL", url)
+            monkeypatch.setattr(exif_service, "GEOCODE_TIMEOUT", 0.2)
+            try:
+                return await exif_service.reverse_geocode(26.9, 75.8)
+            finally:
+                await http_client.close_session()
+
+    assert asyncio.run(scenario()) is None
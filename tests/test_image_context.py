@@ -0,0 +1,107 @@
+"""
+Tests for the decode-once image context shared by the validators.
+"""
+
+import io
+
+import piexif
+import pytest
+from PIL import Image
+
+from services import exif_service, hash_service, image_context
+from services.image_context import ImageContext
+from utils.imageForensics import ImageSourceForensics
+
+
+def _jpeg(tmp_path, name="IMG_0001.jpg"):
+    exif = piexif.dump({
+        "0th": {piexif.ImageIFD.Make: b"Apple", piexif.ImageIFD.Model: b"iPhone 13"},
+        "Exif": {piexif.ExifIFD.DateTimeOriginal: b"2024:01:02 03:04:05"},
+        "GPS": {
+            piexif.GPSIFD.GPSLatitudeRef: b"N",
+            piexif.GPSIFD.GPSLatitude: ((26, 1), (54, 1), (0, 1)),
+            piexif.GPSIFD.GPSLongitudeRef: b"E",
+            piexif.GPSIFD.GPSLongitude: ((75, 1), (48, 1), (0, 1)),
+        },
+    })
+    image = Image.linear_gradient("L").resize((320, 240)).convert("RGB")
+    path = tmp_path / name
+    image.save(path, quality=90, exif=exif)
+    return path
+
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (255, 255, 255)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_image_is_decoded_once(tmp_path, monkeypatch):
+    path = _jpeg(tmp_path)
+    context = ImageContext.from_path(str(path))
+    opened = []
+    real_open = Image.open
+
+    def counting_open(*args, **kwargs):
+        opened.append(args[0])
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(Image, "open", counting_open)
+
+    assert exif_service.extract_gps_coordinates(context) == pytest.approx((26.9, 75.8))
+    assert exif_service.extract_timestamp(context).isoformat() == "2024-01-02T03:04:05"
+    assert exif_service.extract_camera_info(context) == {"camera_make": "Apple", "camera_model": "iPhone 13"}
+    hash_service.generate_phash(context)
+    ImageSourceForensics().classify_image(context.data, context, "IMG_0001.jpg")
+
+    assert len(opened) == 1
+
+
+def test_results_match_path_based_calls(tmp_path):
+    path = str(_jpeg(tmp_path))
+    context = ImageContext.from_path(path)
+
+    assert hash_service.generate_phash(context) == hash_service.generate_phash(path)
+    assert exif_service.extract_exif(context) == exif_service.extract_exif(path)
+
+    forensics = ImageSourceForensics()
+    with open(path, "rb") as f:
+        data = f.read()
+    assert forensics.classify_image(data, context, "IMG_0001.jpg") == forensics.classify_image(data, path, "IMG_0001.jpg")
+
+
+def test_png_has_no_piexif_data():
+    context = ImageContext(_png_bytes(), filename="Screenshot.png")
+
+    with pytest.raises(piexif.InvalidImageDataError):
+        context.piexif_dict()
+    assert context.exif == {}
+    assert exif_service.extract_gps_coordinates(context) is None
+
+
+def test_decode_errors_are_cached_and_name_the_upload():
+    context = ImageContext(b"\xff\xd8 not an image", filename="broken.jpg")
+
+    with pytest.raises(Exception, match="broken.jpg"):
+        context.image
+    with pytest.raises(Exception, match="broken.jpg"):
+        context.grayscale
+
+
+def test_derived_images_are_cached():
+    context = ImageContext(_png_bytes())
+
+    assert context.grayscale is context.grayscale
+    assert context.grayscale.mode == "L"
+    assert context.grayscale_array.shape == (64, 64)
+    assert context.downscaled((32, 32)).size == (32, 32)
+    assert context.downscaled((32, 32)) is context.downscaled((32, 32))
+
+
+def test_resolve_accepts_paths_and_contexts(tmp_path):
+    path = _jpeg(tmp_path)
+    context = image_context.resolve(str(path))
+
+    assert context.path == str(path)
+    assert context.filename == "IMG_0001.jpg"
+    assert image_context.resolve(context) is context
@@ -0,0 +1,215 @@
+"""
+Tests for the issue list/detail queries.
+
+The endpoint coroutines are called directly against a fake database that
+records every round trip.
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from fastapi import Response
+
+import server
+from models import VerificationCreate
+from services import verification_counters
+
+
+def _issue(issue_id, **fields):
+    now = datetime(2026, 1, 1)
+    document = {
+        "_id": ObjectId(), "id": issue_id, "citizen_name": "Asha", "category": "roads", "category_name": "Roads",
+        "severity": "High", "description": "Pothole", "location": "MI Road",
+        "coordinates": {"lat": 26.9, "lng": 75.8}, "department": "PWD", "status": "reported",
+        "reported_at": now, "updated_at": now
+    }
+    document.update(fields)
+    return document
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents = sorted(self.documents, key=lambda document: document[field], reverse=direction < 0)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class RecordingCollection:
+    """Collection stand-in counting the requests sent to MongoDB."""
+
+    def __init__(self, documents=None):
+        self.documents = documents or []
+        self.calls = []
+
+    def find(self, query, projection=None):
+        self.calls.append(("find", query))
+        documents = [document for document in self.documents if _matches(document, query)]
+        if projection:
+            documents = [{key: document[key] for key in document if key in projection or key == "_id"} for document in documents]
+        return FakeCursor(documents)
+
+    async def find_one(self, query, projection=None):
+        self.calls.append(("find_one", query))
+        return next((document for document in self.documents if _matches(document, query)), None)
+
+    async def insert_one(self, document):
+        self.calls.append(("insert_one", document))
+        self.documents.append(document)
+
+    async def update_one(self, query, update):
+        self.calls.append(("update_one", query))
+        for document in self.documents:
+            if _matches(document, query):
+                for path, amount in update.get("$inc", {}).items():
+                    parent, field = path.split(".")
+                    counters = document.setdefault(parent, {})
+                    counters[field] = counters.get(field, 0) + amount
+                for field, value in update.get("$set", {}).items():
+                    document[field] = value
+                return
+
+    async def bulk_write(self, operations, ordered=True):
+        self.calls.append(("bulk_write", operations))
+        modified = 0
+        for operation in operations:
+            if any(_matches(document, operation._filter) for document in self.documents):
+                await self.update_one(operation._filter, operation._doc)
+                modified += 1
+        return type("BulkWriteResult", (), {"modified_count": modified})()
+
+    def aggregate(self, pipeline):
+        # Only the reconciler's {issue_id, response} $group is supported
+        self.calls.append(("aggregate", pipeline))
+        groups = Counter((document["issue_id"], document["response"]) for document in self.documents)
+        return FakeCursor([
+            {"_id": {"issue_id": issue_id, "response": response}, "count": count}
+            for (issue_id, response), count in groups.items()
+        ])
+
+
+def _matches(document, query):
+    for path, condition in query.items():
+        value = document
+        for part in path.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if isinstance(condition, dict) and "$gte" in condition:
+            if value is None or value < condition["$gte"]:
+                return False
+        elif isinstance(condition, dict) and "$not" in condition:
+            if value is not None and value >= condition["$not"]["$gte"]:
+                return False
+        elif isinstance(condition, dict) and "$exists" in condition:
+            if (value is not None) != condition["$exists"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeDB:
+    def __init__(self, issues):
+        self.issues = RecordingCollection(issues)
+        self.verifications = RecordingCollection()
+
+
+@pytest.fixture
+def issue_db(monkeypatch):
+    issues = [_issue(f"GG-{i}", verifications={"yes": i % 5, "no": 1, "not_sure": 0, "total": i % 5 + 1}) for i in range(50)]
+    # Created before the counters existed
+    issues.append(_issue("GG-old"))
+    fake_db = FakeDB(issues)
+    monkeypatch.setattr(server, "db", fake_db)
+    monkeypatch.setattr(verification_counters, "issues_collection", fake_db.issues)
+    monkeypatch.setattr(verification_counters, "verifications_collection", fake_db.verifications)
+    return fake_db
+
+
+def _list_issues(response=None, **params):
+    params = dict({"status": None, "category": "roads", "verification": None,
+                   "limit": 1000, "cursor": None, "fields": None}, **params)
+    return asyncio.run(server.get_issues(response or Response(), **params))
+
+
+@pytest.mark.parametrize("verification, expected", [(None, 51), ("all", 51), ("verified", 20), ("unverified", 31)])
+def test_issue_list_is_one_round_trip(issue_db, verification, expected):
+    issues = _list_issues(verification=verification)
+
+    assert len(issues) == expected
+    assert len(issue_db.issues.calls) == 1
+    assert issue_db.verifications.calls == []
+
+
+def test_issue_list_pages_through_a_header_cursor(issue_db):
+    response = Response()
+    first = _list_issues(response, limit=20)
+    _list_issues(limit=20, cursor=response.headers["X-Next-Cursor"])
+
+    # The fake ignores the cursor, so only the request for page 2 is checked
+    _, query = issue_db.issues.calls[-1]
+    assert len(first) == 20
+    assert query["$and"][0] == {"category": "roads"}
+    assert {"reported_at": None} in query["$and"][1]["$or"]
+
+
+def test_issue_fields_projection_returns_plain_documents(issue_db):
+    issues = _list_issues(fields="id,status")
+
+    assert set(issues[0]) >= {"id", "status", "reported_at"}
+    assert "_id" not in issues[0]
+
+
+def test_verifications_update_the_issue_counters(issue_db):
+    async def scenario():
+        for response in ["yes", "yes", "no", "not_sure"]:
+            await server.create_verification(VerificationCreate(issue_id="GG-old", response=response))
+        return await server.get_issue_verifications("GG-old")
+
+    stats = asyncio.run(scenario())
+
+    assert stats.model_dump() == {"yes": 2, "no": 1, "not_sure": 1, "total": 4}
+    assert not any(kind == "find" for kind, _ in issue_db.verifications.calls)
+
+
+def test_unknown_issue_has_no_verifications(issue_db):
+    assert asyncio.run(server.get_issue_verifications("GG-missing")).total == 0
+
+
+def test_reconcile_rebuilds_drifted_counters(issue_db):
+    issue_db.verifications.documents = [
+        {"issue_id": "GG-1", "response": "yes"},
+        {"issue_id": "GG-1", "response": "no"},
+        {"issue_id": "GG-old", "response": "not_sure"},
+    ]
+
+    corrected = asyncio.run(verification_counters.reconcile())
+    issues = {issue["id"]: issue for issue in issue_db.issues.documents}
+
+    # GG-1 already matched its verifications
+    assert corrected == 50
+    assert issues["GG-1"]["verifications"] == {"yes": 1, "no": 1, "not_sure": 0, "total": 2}
+    assert issues["GG-old"]["verifications"] == {"yes": 0, "no": 0, "not_sure": 1, "total": 1}
+    assert issues["GG-7"]["verifications"] == verification_counters.empty_counts()
+    # Nothing left to correct
+    assert asyncio.run(verification_counters.reconcile()) == 0
@@ -0,0 +1,146 @@
+"""
+Tests for the JPEG header segment walker, byte-block statistics and quality estimation.
+"""
+
+import io
+import random
+
+import piexif
+import pytest
+from PIL import Image
+
+from services.image_context import ImageContext
+from utils import jpeg_parser, imageForensics
+from utils.imageForensics import ImageSourceForensics
+
+
+def _jpeg_bytes(with_exif=True, **save_options):
+    buffer = io.BytesIO()
+    image = Image.linear_gradient("L").resize((320, 240)).convert("RGB")
+    if with_exif:
+        save_options["exif"] = piexif.dump({"0th": {piexif.ImageIFD.Make: b"Apple"}})
+    save_options.setdefault("quality", 90)
+    image.save(buffer, "JPEG", **save_options)
+    return buffer.getvalue()
+
+
+def _reference_artifact_count(data):
+    """The original byte-by-byte implementation."""
+    count = 0
+    for i in range(0, len(data) - 8, 8):
+        block = data[i:i + 8]
+        if block.count(block[0]) > 6:
+            count += 1
+    return count
+
+
+def test_walker_follows_segment_lengths_and_stops_at_sos():
+    data = _jpeg_bytes()
+
+    segments = list(jpeg_parser.iter_segments(data))
+    markers = [segment.marker for segment in segments]
+
+    assert markers[0] == jpeg_parser.SOI
+    assert markers[-1] == jpeg_parser.SOS
+    assert 0xE1 in markers  # EXIF APP1
+    assert markers.count(jpeg_parser.DQT) >= 1
+    assert bytes(segments[markers.index(0xE1)].payload).startswith(b"Exif\x00\x00")
+
+
+def test_header_markers_are_limited_and_formatted():
+    data = _jpeg_bytes()
+
+    assert jpeg_parser.header_markers(data, limit=3)[:2] == ["0xFFD8", "0xFFE0"]
+    assert len(jpeg_parser.header_markers(data, limit=3)) == 3
+    assert ImageSourceForensics()._extract_jpeg_markers(data) == jpeg_parser.header_markers(data)
+
+
+def test_walker_skips_fill_bytes():
+    data = _jpeg_bytes(with_exif=False)
+    padded = data[:2] + b"\xff\xff" + data[2:]
+
+    assert jpeg_parser.header_markers(padded) == jpeg_parser.header_markers(data)
+
+
+def test_walker_stops_on_truncated_or_non_jpeg_data():
+    data = _jpeg_bytes()
+
+    assert jpeg_parser.header_markers(b"\x89PNG\r\n\x1a\n") == []
+    assert jpeg_parser.header_markers(b"") == []
+    assert jpeg_parser.header_markers(data[:30]) == ["0xFFD8", "0xFFE0"]
+
+
+def test_artifact_count_matches_reference_implementation():
+    rng = random.Random(0)
+    for size in list(range(0, 40)) + [1001, 4096, 70001]:
+        data = bytes(rng.choice([0, 0, 0, 1, 255]) for _ in range(size))
+        assert jpeg_parser.count_repetitive_blocks(data, limit=10 ** 9) == _reference_artifact_count(data)
+
+    data = _jpeg_bytes()
+    assert ImageSourceForensics()._count_compression_artifacts(data) == min(_reference_artifact_count(data), 100)
+
+
+def test_artifact_count_is_capped():
+    assert jpeg_parser.count_repetitive_blocks(bytes(8 * 500 + 1)) == 100
+
+
+@pytest.mark.parametrize("quality", [5, 30, 50, 68, 75, 90, 100])
+def test_quality_is_read_from_ijg_tables(quality):
+    estimate = jpeg_parser.estimate_quality(_jpeg_bytes(quality=quality))
+
+    assert estimate.quality == quality
+    assert estimate.exact
+
+
+def test_custom_tables_give_closest_quality():
+    estimate = jpeg_parser.estimate_quality(_jpeg_bytes(qtables="web_high"))
+
+    assert not estimate.exact
+    assert 80 <= estimate.quality <= 100
+
+
+def test_sixteen_bit_tables_are_parsed():
+    values = list(range(1, 65))
+    dqt = bytes([0x10]) + b"".join(value.to_bytes(2, "big") for value in values)
+    data = b"\xff\xd8" + b"\xff\xdb" + (len(dqt) + 2).to_bytes(2, "big") + dqt + b"\xff\xd9"
+
+    tables = jpeg_parser.parse_quantization_tables(data)
+
+    assert list(tables) == [0]
+    assert tables[0][jpeg_parser.ZIGZAG].tolist() == values
+
+
+def test_fingerprint_identifies_the_tables():
+    first = jpeg_parser.estimate_quality(_jpeg_bytes(quality=70))
+    same_settings = jpeg_parser.estimate_quality(_jpeg_bytes(with_exif=False, quality=70))
+    other = jpeg_parser.estimate_quality(_jpeg_bytes(quality=71))
+
+    assert first.fingerprint == same_settings.fingerprint
+    assert first.fingerprint != other.fingerprint
+    assert jpeg_parser.estimate_quality(b"\x89PNG\r\n\x1a\n") is None
+
+
+def test_quality_estimate_does_not_decode_pixels():
+    context = ImageContext(_jpeg_bytes(quality=65), "IMG-20241214-WA0001.jpg")
+
+    assert ImageSourceForensics()._estimate_jpeg_quality_advanced(context) == 65
+    assert "image" not in context._cache
+
+
+def test_detect_whatsapp_matches_reencoder_signature(monkeypatch):
+    data = _jpeg_bytes(quality=70)
+    fingerprint = jpeg_parser.estimate_quality(data).fingerprint
+    forensics = ImageSourceForensics()
+
+    unmatched = forensics.detect_whatsapp(data, ImageContext(data, "photo.jpg"), "photo.jpg")
+    monkeypatch.setattr(imageForensics, "JPEG_SIGNATURES", {fingerprint: "WHATSAPP"})
+    matched = forensics.detect_whatsapp(data, ImageContext(data, "photo.jpg"), "photo.jpg")
+
+    assert unmatched["jpeg_fingerprint"] == matched["jpeg_fingerprint"] == fingerprint
+    assert not unmatched["markers"]["reencoder_signature"]
+    assert matched["markers"]["reencoder_signature"]
+    assert matched["active_markers"] == unmatched["active_markers"] + 1
+
+
+def test_signature_config_loads():
+    assert isinstance(imageForensics.load_jpeg_signatures(), dict)
@@ -0,0 +1,162 @@
+"""
+Tests for the pooled chat models, their circuit breakers and the latency budget.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+import server
+from services import llm_router
+
+REPLY = {"response": "Where is it?", "needsMoreInfo": True, "extractedData": {}, "nextQuestion": "Location?"}
+FALLBACK = {"response": "rules", "needsMoreInfo": True, "extractedData": {}, "nextQuestion": None}
+
+
+class FakeReply:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, delay=0.0, fail=False, text=None):
+        self.delay = delay
+        self.fail = fail
+        self.text = text or json.dumps(REPLY)
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("503 model overloaded")
+        return FakeReply(self.text)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    models = {"primary": FakeModel(), "secondary": FakeModel(), "tertiary": FakeModel()}
+    monkeypatch.setattr(llm_router, "_pool", [llm_router.ModelHealth(name, handle) for name, handle in models.items()])
+    return models
+
+
+def _respond(budget=None):
+    return asyncio.run(llm_router.respond("prompt", parse=json.loads, fallback=lambda: FALLBACK, budget=budget))
+
+
+def test_preferred_model_answers(pool):
+    assert _respond() == REPLY
+    assert [model.calls for model in pool.values()] == [1, 0, 0]
+
+
+def _fail_until_circuits_open(pool):
+    for model in pool.values():
+        model.fail = True
+    for _ in range(llm_router.CHAT_BREAKER_FAILURES):
+        assert _respond() == FALLBACK
+    for model in pool.values():
+        model.fail = False
+        model.calls = 0
+
+
+def test_failing_models_open_their_circuits_and_are_skipped(pool, monkeypatch):
+    _fail_until_circuits_open(pool)
+
+    assert {entry["state"] for entry in llm_router.health()} == {"open"}
+    assert _respond() == FALLBACK
+    assert sum(model.calls for model in pool.values()) == 0
+
+    # After the cooldown one trial request closes a circuit again
+    monkeypatch.setattr(llm_router, "CHAT_BREAKER_COOLDOWN", 0)
+    assert _respond() == REPLY
+    assert [entry["state"] for entry in llm_router.health()][0] == "closed"
+
+
+def test_failed_trial_reopens_the_circuit(pool, monkeypatch):
+    _fail_until_circuits_open(pool)
+    pool["primary"].fail = True
+    monkeypatch.setattr(llm_router, "CHAT_BREAKER_COOLDOWN", 0)
+
+    assert _respond() == REPLY
+
+    primary = llm_router._pool[0]
+    assert primary.opened_at is not None and not primary.trial_in_flight
+    assert pool["primary"].calls == 1 and pool["secondary"].calls == 1
+
+
+def test_degraded_model_is_ranked_behind_healthy_ones(pool):
+    pool["primary"].fail = True
+    _respond()
+
+    assert [model.name for model in llm_router.ranked_models()] == ["secondary", "tertiary", "primary"]
+
+
+def test_demoted_model_recovers_its_rank_over_time(pool, monkeypatch):
+    pool["primary"].fail = True
+    _respond()
+    monkeypatch.setattr(llm_router, "CHAT_BREAKER_COOLDOWN", 0.01)
+    time.sleep(0.1)
+
+    assert llm_router.ranked_models()[0].name == "primary"
+
+
+def test_slow_models_cannot_exceed_the_latency_budget(pool):
+    for model in pool.values():
+        model.delay = 1.0
+
+    started = time.monotonic()
+    assert _respond(budget=0.1) == FALLBACK
+    assert time.monotonic() - started < 0.5
+
+
+def test_unparseable_reply_counts_as_failure(pool):
+    pool["primary"].text = "Sure! Here is your answer."
+
+    assert _respond() == REPLY
+    assert llm_router.health()[0]["consecutive_failures"] == 1
+
+
+def test_no_api_key_uses_fallback_only(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.setattr(llm_router, "_pool", None)
+
+    assert _respond() == FALLBACK
+    assert llm_router.health() == []
+
+
+def test_handle_conversation_parses_fenced_json(pool):
+    pool["primary"].text = "```json\n" + json.dumps(REPLY) + "\n```"
+
+    result = asyncio.run(server.handle_conversation("conv-1", "There is a pothole", []))
+
+    assert result == REPLY
+
+
+def test_models_cut_short_by_the_budget_are_not_charged(pool, monkeypatch):
+    monkeypatch.setattr(llm_router, "CHAT_MIN_MODEL_SLICE", 0.05)
+    pool["primary"].delay, pool["primary"].fail = 0.05, True
+    pool["secondary"].delay = 0.5
+
+    assert _respond(budget=0.15) == FALLBACK
+
+    failures = {entry["model"]: entry["consecutive_failures"] for entry in llm_router.health()}
+    assert failures == {"primary": 1, "secondary": 0, "tertiary": 0}
+    # Too little budget left to be worth trying
+    assert pool["tertiary"].calls == 0
+
+
+def test_only_one_concurrent_trial_per_half_open_model(pool, monkeypatch):
+    _fail_until_circuits_open(pool)
+    monkeypatch.setattr(llm_router, "CHAT_BREAKER_COOLDOWN", 0)
+    for model in pool.values():
+        model.delay = 0.05
+
+    async def concurrent_requests():
+        return await asyncio.gather(*(
+            llm_router.respond("prompt", parse=json.loads, fallback=lambda: FALLBACK) for _ in range(3)
+        ))
+
+    assert asyncio.run(concurrent_requests()) == [REPLY] * 3
+    assert [model.calls for model in pool.values()] == [1, 1, 1]
@@ -0,0 +1,120 @@
+"""
+Tests for the compiled routing table and its hot reload.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+
+import pytest
+
+from services import directory_cache, officer_routing
+
+
+CONFIG = {
+    "ward_1": {"roads": "roads_w1", "water": "water_w1", "general": "gen_w1"},
+    "ward_2": {"roads": "roads_w2"},
+    "default_city": {"roads": "head_roads", "drainage": "head_drain", "general": "city_admin"},
+}
+
+
+def _reference(config, ward, department):
+    """The nested-dict fallback walk the compiled table replaces."""
+    ward_config = config.get(f"ward_{ward}")
+    if ward_config is not None:
+        if department in ward_config:
+            return ward_config[department]
+        if "general" in ward_config:
+            return ward_config["general"]
+    city = config.get("default_city", {})
+    return city.get(department, city.get("general"))
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "routing_config.json"
+    path.write_text(json.dumps(CONFIG))
+    monkeypatch.setattr(officer_routing, "CONFIG_PATH", path)
+    monkeypatch.setattr(officer_routing, "ROUTING_CONFIG", officer_routing.ROUTING_CONFIG)
+    monkeypatch.setattr(officer_routing, "ROUTING_TABLE", officer_routing.ROUTING_TABLE)
+    assert officer_routing.reload_routing_config()
+    return path
+
+
+def test_compiled_table_matches_fallback_walk(config_file):
+    wards = [1, 2, 3, "1", None]
+    departments = ["roads", "water", "drainage", "general", "parks"]
+
+    for ward, department in itertools.product(wards, departments):
+        expected = _reference(CONFIG, ward, department)
+        assert officer_routing.assign_officer(ward, department) == expected, (ward, department)
+
+
+def test_city_without_general_leaves_complaints_unassigned():
+    table = officer_routing.compile_routing_table({"ward_1": {"roads": "roads_w1"}, "default_city": {}})
+
+    assert table.lookup(1, "roads") == "roads_w1"
+    assert table.lookup(1, "water") is None
+    assert table.lookup(7, "roads") is None
+
+
+def test_unknown_officers_fall_through_to_next_level():
+    known = {"roads_w1", "gen_w1", "head_roads", "city_admin"}
+    table = officer_routing.compile_routing_table(CONFIG, known_officers=known)
+
+    assert table.unknown_officers == {"water_w1", "roads_w2", "head_drain"}
+    assert table.lookup(1, "water") == "gen_w1"
+    assert table.lookup(2, "roads") == "head_roads"
+    assert table.lookup(5, "drainage") == "city_admin"
+
+
+@pytest.mark.parametrize("config", [
+    {"ward_x": {"roads": "a"}},
+    {"zone_1": {"roads": "a"}},
+    {"ward_1": ["a"]},
+    {"ward_1": {"roads": 42}},
+])
+def test_malformed_configs_are_rejected(config):
+    with pytest.raises(ValueError):
+        officer_routing.compile_routing_table(config)
+
+
+def test_bad_reload_keeps_current_table(config_file):
+    config_file.write_text("{not json")
+
+    assert not officer_routing.reload_routing_config()
+    assert officer_routing.assign_officer(1, "roads") == "roads_w1"
+
+    config_file.write_text(json.dumps({"ward_1": {"roads": 7}}))
+
+    assert not officer_routing.reload_routing_config()
+    assert officer_routing.assign_officer(1, "roads") == "roads_w1"
+
+
+def test_assign_officers_routes_a_batch(config_file):
+    batch = [(1, "water"), (2, "water"), (9, "drainage"), (9, "parks")]
+
+    assert officer_routing.assign_officers(batch) == ["water_w1", "city_admin", "head_drain", "city_admin"]
+
+
+def test_watcher_reloads_changed_config(config_file, monkeypatch):
+    async def officers_for(department=None, ward=None):
+        return [{"officer_id": "roads_w1_new"}, {"officer_id": "city_admin"}]
+
+    monkeypatch.setattr(directory_cache, "officers_for", officers_for)
+
+    async def edit_while_watching():
+        watcher = asyncio.create_task(officer_routing.run_config_watcher(interval=0.01))
+        await asyncio.sleep(0.02)
+        config_file.write_text(json.dumps(dict(CONFIG, ward_1={"roads": "roads_w1_new"})))
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+
+    asyncio.run(edit_while_watching())
+
+    assert officer_routing.assign_officer(1, "roads") == "roads_w1_new"
+    # Officers missing from the directory are routed past
+    assert officer_routing.assign_officer(2, "roads") == "city_admin"
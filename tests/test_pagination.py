@@ -0,0 +1,201 @@
+"""
+Tests for keyset pagination and field projection.
+"""
+
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId, json_util
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+import server
+from utils.pagination import KeysetPage, PaginationError, decode_cursor, encode_cursor, projection
+
+
+def _value(document, path):
+    for part in path.split("."):
+        document = document.get(part) if isinstance(document, dict) else None
+    return document
+
+
+def _matches(document, query):
+    """Evaluate the subset of the MongoDB query language the endpoints use."""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(_matches(document, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = _value(document, key)
+            for operator, operand in condition.items():
+                if operator == "$ne" and value == operand:
+                    return False
+                if operator in ("$gt", "$lt") and (value is None or operand is None):
+                    return False
+                if operator == "$gt" and not value > operand:
+                    return False
+                if operator == "$lt" and not value < operand:
+                    return False
+        elif _value(document, key) != condition:
+            return False
+    return True
+
+
+def _sort_key(field):
+    # MongoDB sorts null/missing before every value
+    return lambda document: (_value(document, field) is not None, _value(document, field) or 0, document["_id"])
+
+
+class FakeCursor:
+    def __init__(self, documents, projection):
+        self.documents = documents
+        self.projection = projection
+
+    def sort(self, keys):
+        (field, direction), _ = keys
+        self.documents = sorted(self.documents, key=_sort_key(field), reverse=direction == DESCENDING)
+        return self
+
+    async def to_list(self, length):
+        documents = self.documents[:length]
+        if self.projection:
+            documents = [
+                {key: value for key, value in document.items() if key in self.projection or key == "_id"}
+                for document in documents
+            ]
+        return [dict(document) for document in documents]
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append((query, projection))
+        return FakeCursor([document for document in self.documents if _matches(document, query)], projection)
+
+    async def find_one(self, query, projection=None):
+        return next((document for document in self.documents if _matches(document, query)), None)
+
+
+def _documents():
+    start = datetime(2026, 3, 1)
+    documents = []
+    for i in range(23):
+        # Repeated timestamps (ties broken by _id) and some without a value
+        when = None if i % 7 == 0 else start + timedelta(hours=i // 3)
+        documents.append({"_id": ObjectId(), "n": i, "when": when, "status": "open" if i % 2 else "closed"})
+    return documents
+
+
+def _collect(collection, direction, limit, query=None):
+    pages, cursor = [], None
+    while True:
+        page = KeysetPage("when", direction, limit, cursor)
+        documents = asyncio.run(
+            collection.find(page.filter(query or {})).sort(page.sort).to_list(page.fetch_length)
+        )
+        documents, cursor = page.split(documents)
+        pages.append(documents)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("direction", [ASCENDING, DESCENDING])
+@pytest.mark.parametrize("limit", [1, 4, 23, 50])
+def test_pages_cover_every_document_once_in_order(direction, limit):
+    collection = FakeCollection(_documents())
+    expected = sorted(collection.documents, key=_sort_key("when"), reverse=direction == DESCENDING)
+
+    pages = _collect(collection, direction, limit)
+
+    assert [document["n"] for page in pages for document in page] == [document["n"] for document in expected]
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_pages_combine_with_the_filter_query():
+    collection = FakeCollection(_documents())
+    query = {"$or": [{"status": "open"}, {"status": None}]}
+
+    pages = _collect(collection, DESCENDING, 3, query)
+
+    assert sorted(document["n"] for page in pages for document in page) == list(range(1, 23, 2))
+
+
+def test_cursor_round_trips_dates_and_object_ids():
+    document_id = ObjectId()
+    cursor = encode_cursor(datetime(2026, 3, 1, 12, 30), document_id)
+
+    assert decode_cursor(cursor) == (datetime(2026, 3, 1, 12, 30), document_id)
+    assert "=" not in cursor
+
+    with pytest.raises(PaginationError):
+        decode_cursor("not-a-cursor")
+
+
+def test_projection_defaults_and_validation():
+    assert projection(None, ["a", "b"], required=["when"]) == {"a": 1, "b": 1, "when": 1}
+    assert projection("a, c.d", ["a", "b"]) == {"a": 1, "c.d": 1}
+    assert projection("all", ["a"]) is None
+
+    with pytest.raises(PaginationError):
+        projection("a,$where", ["a"])
+
+
+@pytest.fixture
+def complaint_db(monkeypatch):
+    start = datetime(2026, 3, 1)
+    complaints = FakeCollection([
+        {
+            "_id": ObjectId(), "complaint_id": f"C-{i}", "category": "roads", "status": "assigned",
+            "assigned_officer": {"officer_id": "OFF-1"}, "created_at": start + timedelta(minutes=i),
+            "timeline": [{"action": "created"}] * 50, "status_history": [{"status": "assigned"}] * 50
+        }
+        for i in range(5)
+    ])
+    monkeypatch.setattr(server, "db", type("FakeDB", (), {"complaints": complaints})())
+    return complaints
+
+
+def test_officer_complaints_are_slim_and_paginated(complaint_db):
+    first = asyncio.run(server.get_officer_complaints(officer_id="OFF-1", limit=2, cursor=None, fields=None))
+    second = asyncio.run(server.get_officer_complaints(
+        officer_id="OFF-1", limit=2, cursor=first["next_cursor"], fields=None
+    ))
+
+    assert [c["complaint_id"] for c in first["complaints"]] == ["C-4", "C-3"]
+    assert [c["complaint_id"] for c in second["complaints"]] == ["C-2", "C-1"]
+    assert "timeline" not in first["complaints"][0]
+    assert "status_history" not in first["complaints"][0]
+
+    full = asyncio.run(server.get_officer_complaints(officer_id="OFF-1", limit=10, cursor=None, fields="all"))
+    assert full["next_cursor"] is None
+    assert len(full["complaints"][0]["timeline"]) == 50
+
+
+def test_malformed_cursor_is_a_bad_request(complaint_db):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.get_officer_complaints(officer_id="OFF-1", limit=2, cursor="garbage", fields=None))
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("payload", [
+    {"k": {"$ne": None}, "id": ObjectId()},
+    {"k": {"$regex": ".*"}, "id": ObjectId()},
+    {"k": datetime(2026, 3, 1), "id": {"$gt": ""}},
+    {"k": datetime(2026, 3, 1), "id": "C-1"},
+])
+def test_forged_cursor_operators_are_a_bad_request(complaint_db, payload):
+    forged = base64.urlsafe_b64encode(json_util.dumps(payload).encode("utf-8")).decode("ascii")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.get_officer_complaints(officer_id="OFF-1", limit=2, cursor=forged, fields=None))
+
+    assert error.value.status_code == 400
@@ -0,0 +1,207 @@
+"""
+Tests for the content-addressed validation result cache.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import (
+    result_cache, validation_pipeline, sightengine_service, exif_service,
+    hash_service, vision_service
+)
+from services.image_context import ImageContext
+
+IMAGE_BYTES = b"\xff\xd8 not decoded by the stubs"
+
+
+@pytest.fixture
+def counting_services(monkeypatch):
+    """Replace every validation step with an instant stub counting its calls."""
+    calls = Counter()
+
+    async def detect_ai_generated(image_path):
+        calls["ai_detection"] += 1
+        return {"is_ai_generated": False, "ai_probability": 0.1, "error": None, "skipped": False}
+
+    def extract_gps_coordinates(image_path):
+        calls["exif"] += 1
+        return (26.9, 75.8)
+
+    async def reverse_geocode(latitude, longitude):
+        calls["geocode"] += 1
+        return {"address": "MI Road, Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"}
+
+    def generate_phash(image_path):
+        calls["phash"] += 1
+        return "99996666cc993366"
+
+    async def find_similar_hashes(phash, threshold=None):
+        calls["duplicate_lookup"] += 1
+        return []
+
+    def run_forensics(image_path, filename):
+        calls["forensics"] += 1
+        return {"source_type": "ORIGINAL_PHONE_PHOTO", "confidence_score": 0.9, "evidence": []}
+
+    def analyze_image_content(image_path, user_issue_type, additional_context=None):
+        calls["vision"] += 1
+        return {"issue_type_detected": user_issue_type, "issue_match_status": "MATCH", "final_flag": "VALID_ISSUE"}
+
+    monkeypatch.setattr(sightengine_service, "detect_ai_generated", detect_ai_generated)
+    monkeypatch.setattr(exif_service, "extract_gps_coordinates", extract_gps_coordinates)
+    monkeypatch.setattr(exif_service, "extract_timestamp", lambda path: None)
+    monkeypatch.setattr(exif_service, "extract_camera_info", lambda path: {})
+    monkeypatch.setattr(exif_service, "reverse_geocode", reverse_geocode)
+    monkeypatch.setattr(hash_service, "generate_phash", generate_phash)
+    monkeypatch.setattr(hash_service, "find_similar_hashes", find_similar_hashes)
+    monkeypatch.setattr(validation_pipeline, "run_forensics", run_forensics)
+    monkeypatch.setattr(vision_service, "analyze_image_content", analyze_image_content)
+    return calls
+
+
+def _validate(**kwargs):
+    params = {
+        "image_path": ImageContext(IMAGE_BYTES, filename="photo.jpg"),
+        "filename": "photo.jpg",
+        "issue_type": "roads",
+        "latitude": 26.9,
+        "longitude": 75.8
+    }
+    params.update(kwargs)
+    return asyncio.run(validation_pipeline.run_validation(**params))
+
+
+def test_repeat_validation_is_served_from_cache(counting_services):
+    first = _validate()
+    # A retry builds a new context from the same bytes
+    second = _validate(latitude=26.90001)
+
+    assert second == first
+    assert counting_services["ai_detection"] == 1
+    assert counting_services["exif"] == 1
+    assert counting_services["geocode"] == 1
+    assert counting_services["forensics"] == 1
+    assert counting_services["vision"] == 1
+    # Duplicate detection always checks the current resolved issues
+    assert counting_services["duplicate_lookup"] == 2
+
+
+def test_inputs_that_matter_are_part_of_the_key(counting_services):
+    _validate()
+    _validate(issue_type="garbage")
+    _validate(latitude=27.5)
+
+    assert counting_services["ai_detection"] == 1
+    assert counting_services["forensics"] == 1
+    assert counting_services["vision"] == 2
+    assert counting_services["exif"] == 2
+
+
+def test_failed_steps_are_not_cached(counting_services, monkeypatch):
+    async def unavailable(image_path):
+        counting_services["ai_detection"] += 1
+        raise RuntimeError("sightengine down")
+
+    async def no_address(latitude, longitude):
+        counting_services["geocode"] += 1
+        return None
+
+    monkeypatch.setattr(sightengine_service, "detect_ai_generated", unavailable)
+    monkeypatch.setattr(exif_service, "reverse_geocode", no_address)
+
+    first = _validate()
+    _validate()
+
+    assert first["ai_detection"]["skipped"] is True
+    assert counting_services["ai_detection"] == 2
+    assert counting_services["geocode"] == 2
+    assert counting_services["vision"] == 1
+
+
+def test_cache_can_be_bypassed(counting_services):
+    _validate(use_cache=False)
+    _validate(use_cache=False)
+
+    assert counting_services["vision"] == 2
+
+
+def test_cached_results_are_copies(counting_services):
+    first = _validate()
+    first["vision_analysis"]["issue_type_detected"] = "mutated"
+
+    assert _validate()["vision_analysis"]["issue_type_detected"] == "roads"
+
+
+def test_lru_evicts_least_recently_used_and_expires():
+    cache = result_cache.LRUCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+
+def test_stage_key_rounds_coordinates():
+    digest = result_cache.content_digest(IMAGE_BYTES)
+
+    near = result_cache.stage_key("exif", digest, lat=result_cache.round_coordinate(26.90001))
+    same = result_cache.stage_key("exif", digest, lat=result_cache.round_coordinate(26.9))
+    far = result_cache.stage_key("exif", digest, lat=result_cache.round_coordinate(26.91))
+
+    assert near == same != far
+    assert result_cache.stage_key("vision", digest).startswith(f"vision:{digest}")
+
+
+class FakeCacheCollection:
+    """Minimal stand-in for the validation_cache collection."""
+
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query):
+        document = self.documents.get(query["_id"])
+        if document and document["expires_at"] > query["expires_at"]["$gt"]:
+            return document
+        return None
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = dict(document, _id=query["_id"])
+
+
+def test_mongo_tier_serves_other_workers(counting_services, monkeypatch):
+    collection = FakeCacheCollection()
+    monkeypatch.setattr(result_cache, "validation_cache_collection", collection)
+    monkeypatch.setattr(result_cache, "_store_ready", True)
+
+    _validate()
+    # Another worker (or a restart) has an empty in-process tier
+    result_cache.clear()
+    _validate()
+
+    assert counting_services["vision"] == 1
+    assert {document["stage"] for document in collection.documents.values()} == {
+        "ai_detection", "exif", "forensics", "vision"
+    }
+
+
+def test_expired_mongo_entries_are_ignored(monkeypatch):
+    collection = FakeCacheCollection()
+    collection.documents["vision:abc"] = {
+        "_id": "vision:abc", "stage": "vision", "value": {"cached": True},
+        "expires_at": datetime.utcnow() - timedelta(seconds=1)
+    }
+    monkeypatch.setattr(result_cache, "validation_cache_collection", collection)
+    monkeypatch.setattr(result_cache, "_store_ready", True)
+
+    assert asyncio.run(result_cache.get("vision", "vision:abc")) is None
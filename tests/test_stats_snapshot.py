@@ -0,0 +1,149 @@
+"""
+Tests for the materialized dashboard stats.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import server
+from services import stats_snapshot
+
+
+def _field(document, path):
+    for part in path.split("."):
+        document = document.get(part) if isinstance(document, dict) else None
+    return document
+
+
+def _evaluate(expression, document):
+    """Evaluate the aggregation expressions used by the stats pipeline."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _field(document, expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+
+    (operator, operands), = expression.items()
+    values = [_evaluate(operand, document) for operand in operands]
+    if operator == "$cond":
+        return values[1] if values[0] else values[2]
+    if operator == "$and":
+        return all(values)
+    if operator == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if operator == "$eq":
+        return values[0] == values[1]
+    if operator == "$gte":
+        return values[0] is not None and values[0] >= values[1]
+    raise NotImplementedError(operator)
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+
+class FakeIssues:
+    def __init__(self, documents):
+        self.documents = documents
+        self.aggregations = 0
+
+    def aggregate(self, pipeline):
+        self.aggregations += 1
+        group = pipeline[-1]["$group"]
+        totals = {name: 0 for name in group if name != "_id"}
+        for document in self.documents:
+            for name in totals:
+                totals[name] += _evaluate(group[name]["$sum"], document)
+        return FakeCursor([dict(totals, _id=None)] if self.documents else [])
+
+
+class FakeSnapshots:
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query):
+        document = self.documents.get(query["_id"])
+        return dict(document) if document else None
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = dict(document, _id=query["_id"])
+
+
+@pytest.fixture
+def stats_db(monkeypatch):
+    now = datetime.utcnow()
+    issues = FakeIssues([
+        {"status": "verifying", "reported_at": now, "updated_at": now},
+        {"status": "verifying", "reported_at": now - timedelta(days=2), "updated_at": now,
+         "verifications": {"yes": 1, "no": 0, "not_sure": 0, "total": 1}},
+        {"status": "in_progress", "reported_at": now - timedelta(days=3), "updated_at": now,
+         "verifications": {"yes": 0, "no": 0, "not_sure": 0, "total": 0}},
+        {"status": "resolved", "reported_at": now - timedelta(days=20), "updated_at": now - timedelta(days=1),
+         "verifications": {"yes": 4, "no": 0, "not_sure": 0, "total": 4}},
+        {"status": "resolved", "reported_at": now - timedelta(days=40), "updated_at": now - timedelta(days=30),
+         "verifications": {"yes": 3, "no": 1, "not_sure": 0, "total": 4}},
+    ])
+    snapshots = FakeSnapshots()
+    monkeypatch.setattr(stats_snapshot, "issues_collection", issues)
+    monkeypatch.setattr(stats_snapshot, "stats_snapshots_collection", snapshots)
+    return issues, snapshots
+
+
+def test_counters_come_from_one_aggregation(stats_db):
+    issues, _ = stats_db
+
+    stats = asyncio.run(server.get_stats())
+
+    assert stats.model_dump() == {
+        "new_today": 1, "verifying": 2, "in_progress": 1, "resolved_this_week": 1, "unverified": 2
+    }
+    assert issues.aggregations == 1
+
+
+def test_dashboard_reads_the_stored_snapshot(stats_db):
+    issues, snapshots = stats_db
+
+    async def scenario():
+        await stats_snapshot.refresh()
+        first = await server.get_stats()
+        second = await server.get_stats()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second
+    assert issues.aggregations == 1
+    assert snapshots.documents["dashboard"]["verifying"] == 2
+
+
+def test_stale_snapshot_is_recomputed(stats_db):
+    issues, snapshots = stats_db
+    snapshots.documents["dashboard"] = dict(
+        {counter: 0 for counter in stats_snapshot.COUNTERS},
+        _id="dashboard", computed_at=datetime.utcnow() - timedelta(hours=1)
+    )
+
+    assert asyncio.run(server.get_stats()).verifying == 2
+    assert issues.aggregations == 1
+
+
+def test_refresher_wakes_up_after_writes(stats_db, monkeypatch):
+    issues, _ = stats_db
+    monkeypatch.setattr(stats_snapshot, "STATS_SNAPSHOT_MIN_INTERVAL", 0.01)
+
+    async def scenario():
+        task = asyncio.create_task(stats_snapshot.run_refresher(interval=60))
+        await asyncio.sleep(0.05)
+        stats_snapshot.request_refresh()
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(scenario())
+
+    # The initial refresh plus one for the write, not waiting for the interval
+    assert issues.aggregations == 2
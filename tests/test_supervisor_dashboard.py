@@ -0,0 +1,260 @@
+"""
+Tests for the supervisor dashboard aggregation and complaint date normalization.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import server
+from services import supervisor_dashboard
+
+
+def _field(document, path):
+    for part in path.split("."):
+        document = document.get(part) if isinstance(document, dict) else None
+    return document
+
+
+def _matches(document, query):
+    """Evaluate the subset of the MongoDB query language used here."""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(_matches(document, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(document, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = _field(document, key)
+            for operator, operand in condition.items():
+                if operator == "$in" and value not in operand:
+                    return False
+                if operator == "$ne" and value == operand:
+                    return False
+                if operator in ("$lt", "$gt") and (value is None or operand is None or type(value) is not type(operand)):
+                    return False
+                if operator == "$lt" and not value < operand:
+                    return False
+                if operator == "$gt" and not value > operand:
+                    return False
+        elif _field(document, key) != condition:
+            return False
+    return True
+
+
+def _evaluate(expression, document):
+    """Evaluate the aggregation expressions used by the dashboard pipeline."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _field(document, expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+
+    (operator, operands), = expression.items()
+    if operator == "$type":
+        value = _evaluate(operands, document)
+        return "date" if isinstance(value, datetime) else "missing" if value is None else "other"
+    values = [_evaluate(operand, document) for operand in operands]
+    if operator == "$cond":
+        return values[1] if values[0] else values[2]
+    if operator == "$and":
+        return all(values)
+    if operator == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if operator == "$in":
+        return values[0] in values[1]
+    if operator == "$eq":
+        return values[0] == values[1]
+    if operator == "$lt":
+        return values[0] < values[1]
+    if operator == "$gte":
+        return values[0] >= values[1]
+    raise NotImplementedError(operator)
+
+
+def _run(documents, pipeline):
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            documents = [document for document in documents if _matches(document, spec)]
+        elif name == "$facet":
+            documents = [{facet: _run(documents, stages) for facet, stages in spec.items()}]
+        elif name == "$group":
+            totals = {key: sum(_evaluate(value["$sum"], d) for d in documents) for key, value in spec.items() if key != "_id"}
+            documents = [dict(totals, _id=None)] if documents else []
+        elif name == "$sort":
+            for field, direction in reversed(list(spec.items())):
+                documents = sorted(
+                    documents,
+                    key=lambda d: (_field(d, field) is not None, _field(d, field) or datetime.min),
+                    reverse=direction < 0
+                )
+        elif name == "$limit":
+            documents = documents[:spec]
+        elif name == "$project":
+            documents = [{key: value for key, value in d.items() if key in spec or key == "_id"} for d in documents]
+        else:
+            raise NotImplementedError(name)
+    return documents
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length):
+        return self.documents[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeComplaints:
+    def __init__(self, documents):
+        self.documents = documents
+        self.round_trips = 0
+
+    def aggregate(self, pipeline):
+        self.round_trips += 1
+        return FakeCursor(_run(self.documents, pipeline))
+
+    def find(self, query, projection=None):
+        # normalize_complaint_dates: every escalated complaint is a candidate
+        return FakeCursor([dict(d) for d in self.documents if "supervisor_id" in d])
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            for document in self.documents:
+                if document["_id"] == operation._filter["_id"]:
+                    document.update(operation._doc["$set"])
+
+
+class FakeSupervisors:
+    async def find_one(self, query):
+        return {"supervisor_id": query["supervisor_id"]} if query["supervisor_id"] == "SUP-1" else None
+
+
+# MongoDB stores dates with millisecond precision
+NOW = datetime.utcnow().replace(microsecond=0)
+
+
+def _complaint(number, status=None, deadline_hours=24.0, escalated_hours_ago=48.0, supervisor_id="SUP-1"):
+    return {
+        "_id": ObjectId(), "complaint_id": f"C-{number}", "supervisor_id": supervisor_id,
+        "supervisor_status": status, "category": "roads",
+        "supervisor_deadline": NOW + timedelta(hours=deadline_hours),
+        "escalated_at": NOW - timedelta(hours=escalated_hours_ago),
+        "timeline": [{"action": "sent_to_supervisor", "timestamp": NOW - timedelta(hours=escalated_hours_ago)}]
+    }
+
+
+@pytest.fixture
+def dashboard_db(monkeypatch):
+    complaints = FakeComplaints([
+        _complaint(1, "PENDING", deadline_hours=-2),
+        _complaint(2, None, deadline_hours=5, escalated_hours_ago=2),
+        _complaint(3, "PENDING", deadline_hours=30, escalated_hours_ago=1),
+        _complaint(4, "APPROVED", deadline_hours=-10, escalated_hours_ago=3),
+        _complaint(5, "PENDING", deadline_hours=-1),
+        _complaint(6, "PENDING", supervisor_id="SUP-2"),
+    ])
+    fake_db = type("FakeDB", (), {"complaints": complaints, "supervisors": FakeSupervisors()})()
+    monkeypatch.setattr(server, "db", fake_db)
+    monkeypatch.setattr(supervisor_dashboard, "complaints_collection", complaints)
+    return complaints
+
+
+def _dashboard(filter, **params):
+    params = dict({"limit": 100, "cursor": None, "fields": None}, **params)
+    return asyncio.run(server.get_supervisor_complaints(supervisor_id="SUP-1", filter=filter, **params))
+
+
+def test_counters_and_list_come_from_one_round_trip(dashboard_db):
+    result = _dashboard("pending")
+
+    assert result["stats"] == {"new_today": 3, "pending": 4, "overdue": 2}
+    assert [c["complaint_id"] for c in result["complaints"]] == ["C-1", "C-5", "C-2", "C-3"]
+    assert "timeline" not in result["complaints"][0]
+    assert dashboard_db.round_trips == 1
+
+
+def test_filters_only_change_the_list(dashboard_db):
+    overdue = _dashboard("overdue")
+    everything = _dashboard("all")
+
+    assert [c["complaint_id"] for c in overdue["complaints"]] == ["C-1", "C-5"]
+    assert len(everything["complaints"]) == 5
+    assert overdue["stats"] == everything["stats"]
+
+
+def test_list_pages_keep_the_counters(dashboard_db):
+    first = _dashboard("all", limit=3)
+    second = _dashboard("all", limit=3, cursor=first["next_cursor"])
+
+    assert [c["complaint_id"] for c in first["complaints"]] == ["C-4", "C-1", "C-5"]
+    assert [c["complaint_id"] for c in second["complaints"]] == ["C-2", "C-3"]
+    assert second["next_cursor"] is None
+    assert second["stats"] == first["stats"]
+
+
+def test_unknown_supervisor_is_not_found(dashboard_db):
+    with pytest.raises(server.HTTPException) as error:
+        asyncio.run(server.get_supervisor_complaints(
+            supervisor_id="SUP-404", filter="all", limit=10, cursor=None, fields=None
+        ))
+
+    assert error.value.status_code == 404
+
+
+def test_legacy_string_dates_are_normalized(dashboard_db):
+    legacy = {
+        "_id": ObjectId(), "complaint_id": "C-legacy", "supervisor_id": "SUP-1", "supervisor_status": "PENDING",
+        "supervisor_deadline": (NOW - timedelta(hours=1)).isoformat(),
+        "timeline": [
+            {"action": "created", "timestamp": (NOW - timedelta(days=3)).isoformat() + "+00:00"},
+            {"action": "sent_to_supervisor", "datetime": (NOW - timedelta(hours=2)).isoformat()},
+        ]
+    }
+    dashboard_db.documents.append(legacy)
+
+    assert asyncio.run(supervisor_dashboard.normalize_complaint_dates()) == 1
+
+    assert isinstance(legacy["supervisor_deadline"], datetime)
+    assert all(isinstance(event["timestamp"], datetime) for event in legacy["timeline"])
+    assert abs(legacy["escalated_at"] - (NOW - timedelta(hours=2))) < timedelta(seconds=1)
+    # Already normalized complaints are left alone
+    assert asyncio.run(supervisor_dashboard.normalize_complaint_dates()) == 0
+
+    stats = _dashboard("pending")["stats"]
+    assert stats == {"new_today": 4, "pending": 5, "overdue": 3}
+
+
+def test_unparseable_dates_are_left_untouched(dashboard_db):
+    legacy = {
+        "_id": ObjectId(), "complaint_id": "C-garbled", "supervisor_id": "SUP-1", "supervisor_status": "PENDING",
+        "supervisor_deadline": "next tuesday",
+        "timeline": [
+            {"action": "created", "timestamp": "yesterday-ish"},
+            {"action": "sent_to_supervisor", "timestamp": (NOW - timedelta(hours=2)).isoformat()},
+        ]
+    }
+    dashboard_db.documents.append(legacy)
+
+    asyncio.run(supervisor_dashboard.normalize_complaint_dates())
+
+    assert legacy["supervisor_deadline"] == "next tuesday"
+    assert legacy["timeline"][0]["timestamp"] == "yesterday-ish"
+    assert legacy["timeline"][1]["timestamp"] == NOW - timedelta(hours=2)
+    assert legacy["escalated_at"] == NOW - timedelta(hours=2)
@@ -0,0 +1,146 @@
+"""
+Tests for the image upload endpoints.
+
+The endpoint coroutines are called directly with in-memory UploadFiles; MongoDB
+and the validation pipeline are replaced with fakes.
+"""
+
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+
+import server
+from services import validation_pipeline, hash_service
+from services.image_context import ImageContext
+
+ACCEPTED = {
+    "ai_detection": {"is_ai_generated": False, "ai_probability": 0.1, "skipped": False},
+    "exif_data": {"has_gps": False, "location_valid": False, "timestamp": None},
+    "hash_match": {"is_duplicate": False, "similarity_score": 0.0, "original_issue_id": None, "hash_value": "99996666cc993366"},
+    "issue_match": {"is_match": True, "expected_type": "roads", "detected_type": "pothole"},
+    "vision_analysis": {"skipped": True},
+    "forensics_analysis": {"source_type": "UNKNOWN", "confidence_score": 0.0, "evidence": []},
+}
+AI_GENERATED = dict(ACCEPTED, ai_detection={"is_ai_generated": True, "ai_probability": 0.99, "skipped": False})
+
+
+class FakeCollection:
+    def __init__(self, documents=None):
+        self.documents = documents or []
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        for document in self.documents:
+            if all(document.get(key) == value for key, value in query.items()):
+                return document
+        return None
+
+    async def insert_one(self, document):
+        self.documents.append(document)
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append((query, update))
+
+
+class FakeDB:
+    def __init__(self):
+        self.issues = FakeCollection([{"id": "GG-1", "category": "roads", "coordinates": {"lat": 26.9, "lng": 75.8}}])
+        self.image_validations = FakeCollection()
+
+
+@pytest.fixture
+def upload_env(monkeypatch, tmp_path):
+    """Fake database, temporary upload directory and a scripted pipeline."""
+    fake_db = FakeDB()
+    outcomes = {}
+    seen = []
+
+    async def run_validation(image_path, filename, **kwargs):
+        seen.append(image_path)
+        return outcomes.get(filename, ACCEPTED)
+
+    async def store_hash(**kwargs):
+        pass
+
+    monkeypatch.setattr(server, "db", fake_db)
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(validation_pipeline, "run_validation", run_validation)
+    monkeypatch.setattr(hash_service, "store_hash", store_hash)
+    return fake_db, outcomes, seen, tmp_path
+
+
+def _upload(filename, content=b"\xff\xd8\xff photo bytes"):
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+def test_validation_runs_in_memory_and_saves_accepted_image(upload_env):
+    fake_db, outcomes, seen, upload_dir = upload_env
+
+    result = asyncio.run(server.validate_image(image=_upload("photo.jpg"), issue_type="roads", latitude=None, longitude=None))
+
+    assert result.status == "accepted"
+    assert isinstance(seen[0], ImageContext) and seen[0].path is None
+    saved = list(upload_dir.iterdir())
+    assert len(saved) == 1 and saved[0].read_bytes() == b"\xff\xd8\xff photo bytes"
+    assert fake_db.image_validations.documents[0]["image"]["path"] == str(saved[0])
+
+
+def test_rejected_image_never_reaches_disk(upload_env):
+    fake_db, outcomes, seen, upload_dir = upload_env
+    outcomes["fake.jpg"] = AI_GENERATED
+
+    result = asyncio.run(server.validate_image(image=_upload("fake.jpg"), issue_type="roads", latitude=None, longitude=None))
+
+    assert result.status == "rejected"
+    assert list(upload_dir.iterdir()) == []
+    assert fake_db.image_validations.documents[0]["image"]["path"] is None
+
+
+def test_oversized_image_is_rejected_without_writing(upload_env, monkeypatch):
+    fake_db, outcomes, seen, upload_dir = upload_env
+    monkeypatch.setenv("MAX_IMAGE_SIZE_MB", "1")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.validate_image(image=_upload("big.jpg", b"\xff\xd8\xff" + b"0" * (2 * 1024 * 1024)), issue_type="roads", latitude=None, longitude=None))
+
+    assert error.value.status_code == 400
+    assert seen == []
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_issue_photos_only_write_accepted_files(upload_env):
+    fake_db, outcomes, seen, upload_dir = upload_env
+    outcomes["fake.jpg"] = AI_GENERATED
+
+    response = asyncio.run(server.upload_issue_photos("GG-1", photos=[_upload("good.jpg"), _upload("fake.jpg")]))
+
+    assert [r["status"] for r in response["validation_results"]] == ["accepted", "rejected"]
+    saved = list(upload_dir.iterdir())
+    assert [path.name.split("_")[0] for path in saved] == ["GG-1"]
+    assert response["photos"] == [response["validation_results"][0]["url"]]
+
+
+def test_non_image_photo_is_rejected_before_validation(upload_env):
+    fake_db, outcomes, seen, upload_dir = upload_env
+
+    response = asyncio.run(server.upload_issue_photos("GG-1", photos=[_upload("notes.jpg", b"%PDF-1.7 not a photo")]))
+
+    assert response["validation_results"][0]["status"] == "rejected"
+    assert "not a supported image" in response["validation_results"][0]["reason"]
+    assert seen == []
+
+
+def test_issue_photos_reject_in_batch_duplicates(upload_env, monkeypatch):
+    fake_db, outcomes, seen, upload_dir = upload_env
+    monkeypatch.setattr(hash_service, "generate_phash", lambda context: "99996666cc993366")
+
+    response = asyncio.run(server.upload_issue_photos("GG-1", photos=[_upload("a.jpg"), _upload("b.jpg"), _upload("notes.txt")]))
+
+    assert [(r["filename"], r["status"]) for r in response["validation_results"]] == [
+        ("a.jpg", "accepted"), ("b.jpg", "rejected"), ("notes.txt", "rejected")
+    ]
+    assert response["validation_results"][1]["reason"] == "Duplicate of a.jpg in the same upload"
+    assert [context.filename for context in seen] == ["a.jpg"]
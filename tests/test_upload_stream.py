@@ -0,0 +1,170 @@
+"""
+Tests for bounded, chunked reading of uploaded images.
+"""
+
+import asyncio
+import io
+
+import pytest
+from fastapi import FastAPI, File, UploadFile as FastAPIUploadFile
+from starlette.datastructures import Headers, UploadFile
+
+from utils.upload_stream import RequestSizeLimitMiddleware, UploadRejected, read_upload, sniff_format
+
+JPEG_HEAD = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+PNG_HEAD = b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0d"
+WEBP_HEAD = b"RIFF\x00\x00\x00\x00WEBPVP8 "
+ALLOWED = ["jpg", "jpeg", "png", "webp"]
+
+
+class CountingFile(io.BytesIO):
+    """File object recording how many bytes were read from it."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def _read(content, max_bytes=1024 * 1024, allowed=ALLOWED, size=None):
+    file = CountingFile(content)
+    upload = UploadFile(file=file, filename="photo", size=size)
+    return file, asyncio.run(read_upload(upload, max_bytes, allowed, chunk_size=1024))
+
+
+@pytest.mark.parametrize("head, image_format", [(JPEG_HEAD, "jpeg"), (PNG_HEAD, "png"), (WEBP_HEAD, "webp"), (b"GIF89a\x00\x00\x00\x00\x00\x00", None)])
+def test_sniff_format(head, image_format):
+    assert sniff_format(head) == image_format
+
+
+def test_reads_complete_image():
+    content = JPEG_HEAD + b"x" * 5000
+
+    file, data = _read(content)
+
+    assert data == content
+
+
+def test_oversized_upload_stops_at_the_limit():
+    file = CountingFile(JPEG_HEAD + b"x" * (10 * 1024 * 1024))
+
+    with pytest.raises(UploadRejected, match="exceeds limit"):
+        asyncio.run(read_upload(UploadFile(file=file, filename="big.jpg"), 64 * 1024, ALLOWED, chunk_size=1024))
+
+    assert file.bytes_read <= 65 * 1024
+
+
+def test_known_size_is_rejected_without_reading():
+    with pytest.raises(UploadRejected, match="exceeds limit"):
+        _read(JPEG_HEAD + b"x" * 100, max_bytes=50, size=2 * 1024 * 1024)
+
+
+def test_non_image_is_rejected_after_the_first_chunk():
+    file = CountingFile(b"MZ\x90\x00 not an image" + b"x" * 100_000)
+
+    with pytest.raises(UploadRejected, match="not a supported image"):
+        asyncio.run(read_upload(UploadFile(file=file, filename="photo.jpg"), 1024 * 1024, ALLOWED, chunk_size=1024))
+
+    assert file.bytes_read == 1024
+
+
+def test_format_must_be_allowed():
+    with pytest.raises(UploadRejected, match="not a supported image"):
+        _read(PNG_HEAD + b"x" * 100, allowed=["jpg", "jpeg"])
+
+
+@pytest.mark.parametrize("filename, content_type", [
+    ("photo.jpg", None),
+    ("photo", "image/jpeg"),
+    ("photo.JPG", "image/jpeg"),
+])
+def test_declared_format_must_match_the_content(filename, content_type):
+    headers = Headers({"content-type": content_type}) if content_type else None
+    upload = UploadFile(file=io.BytesIO(PNG_HEAD + b"x" * 100), filename=filename, headers=headers)
+
+    with pytest.raises(UploadRejected, match="does not match"):
+        asyncio.run(read_upload(upload, 1024 * 1024, ALLOWED, chunk_size=1024))
+
+
+def test_matching_declared_format_is_accepted():
+    headers = Headers({"content-type": "image/png"})
+    upload = UploadFile(file=io.BytesIO(PNG_HEAD + b"x" * 100), filename="photo.PNG", headers=headers)
+
+    assert asyncio.run(read_upload(upload, 1024 * 1024, ALLOWED)) == PNG_HEAD + b"x" * 100
+
+
+def test_tiny_non_image_is_rejected():
+    with pytest.raises(UploadRejected):
+        _read(b"\xff")
+
+
+def _call(app, body_chunks, content_length=None):
+    """Send a POST through an ASGI app; return (status, body chunks consumed)."""
+    headers = [(b"content-type", b"multipart/form-data; boundary=b")]
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode()))
+    scope = {"type": "http", "method": "POST", "path": "/upload", "headers": headers,
+             "query_string": b"", "root_path": "", "scheme": "http", "server": ("test", 80)}
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(body_chunks) - 1}
+                for i, chunk in enumerate(body_chunks)]
+    consumed = 0
+    sent = []
+
+    async def receive():
+        nonlocal consumed
+        if consumed < len(messages):
+            consumed += 1
+            return messages[consumed - 1]
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], consumed
+
+
+def _upload_app(max_bytes):
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: FastAPIUploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return RequestSizeLimitMiddleware(app, max_bytes=max_bytes)
+
+
+def _multipart(size):
+    return (
+        b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.jpg\"\r\n"
+        b"Content-Type: image/jpeg\r\n\r\n" + b"x" * size + b"\r\n--b--\r\n"
+    )
+
+
+def test_middleware_passes_small_requests():
+    body = _multipart(1000)
+
+    status, consumed = _call(_upload_app(10_000), [body])
+
+    assert status == 200
+
+
+def test_middleware_rejects_declared_oversized_body_without_reading():
+    status, consumed = _call(_upload_app(10_000), [b"x"], content_length=50_000)
+
+    assert status == 413
+    assert consumed == 0
+
+
+def test_middleware_aborts_streamed_body_at_the_limit():
+    body = _multipart(100_000)
+    chunks = [body[i:i + 4096] for i in range(0, len(body), 4096)]
+
+    status, consumed = _call(_upload_app(10_000), chunks)
+
+    assert status == 413
+    assert consumed == 3
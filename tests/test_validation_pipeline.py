@@ -0,0 +1,256 @@
+"""
+Tests for the concurrent image validation orchestrator.
+
+Every service is replaced with a stub that sleeps, so the tests measure how the
+pipeline schedules the checks rather than the checks themselves.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from services import (
+    validation_pipeline, sightengine_service, exif_service,
+    hash_service, vision_service, decision_engine
+)
+from services.image_context import ImageContext
+
+STEP_DELAY = 0.3
+
+VISION_RESULT = {
+    "visual_summary": "Pothole on a road",
+    "detected_objects": ["pothole"],
+    "issue_type_detected": "pothole",
+    "issue_match_status": "MATCH",
+    "severity": "HIGH",
+    "confidence_score": 90,
+    "final_flag": "VALID_ISSUE",
+    "reasoning": "Clear pothole visible"
+}
+
+
+@pytest.fixture
+def slow_services(monkeypatch):
+    """Replace every validation step with a stub taking STEP_DELAY seconds."""
+    async def detect_ai_generated(image_path):
+        await asyncio.sleep(STEP_DELAY)
+        return {"is_ai_generated": False, "ai_probability": 0.1, "error": None, "skipped": False}
+
+    def extract_gps_coordinates(image_path):
+        time.sleep(STEP_DELAY)
+        return (26.9, 75.8)
+
+    async def reverse_geocode(latitude, longitude):
+        return {"address": "MI Road, Jaipur", "city": "Jaipur", "state": "Rajasthan", "country": "India"}
+
+    def generate_phash(image_path):
+        time.sleep(STEP_DELAY)
+        return "99996666cc993366"
+
+    async def find_similar_hashes(phash, threshold=None):
+        await asyncio.sleep(STEP_DELAY)
+        return []
+
+    def run_forensics(image_path, filename):
+        time.sleep(STEP_DELAY)
+        return {"source_type": "ORIGINAL_PHONE_PHOTO", "confidence_score": 0.9, "evidence": []}
+
+    def analyze_image_content(image_path, user_issue_type, additional_context=None):
+        time.sleep(STEP_DELAY)
+        return dict(VISION_RESULT)
+
+    monkeypatch.setattr(sightengine_service, "detect_ai_generated", detect_ai_generated)
+    monkeypatch.setattr(exif_service, "extract_gps_coordinates", extract_gps_coordinates)
+    monkeypatch.setattr(exif_service, "extract_timestamp", lambda path: datetime(2024, 1, 1, 10, 0))
+    monkeypatch.setattr(exif_service, "extract_camera_info", lambda path: {"camera_make": "Apple", "camera_model": "iPhone"})
+    monkeypatch.setattr(exif_service, "reverse_geocode", reverse_geocode)
+    monkeypatch.setattr(hash_service, "generate_phash", generate_phash)
+    monkeypatch.setattr(hash_service, "find_similar_hashes", find_similar_hashes)
+    monkeypatch.setattr(validation_pipeline, "run_forensics", run_forensics)
+    monkeypatch.setattr(vision_service, "analyze_image_content", analyze_image_content)
+
+
+def _run(**kwargs):
+    params = {
+        "image_path": ImageContext(b"\xff\xd8 not decoded by the stubs", filename="photo.jpg"),
+        "filename": "photo.jpg",
+        "issue_type": "roads",
+        "latitude": 26.9,
+        "longitude": 75.8
+    }
+    params.update(kwargs)
+    return asyncio.run(validation_pipeline.run_validation(**params))
+
+
+def test_latency_is_bounded_by_slowest_step(slow_services):
+    start = time.perf_counter()
+    _run()
+    elapsed = time.perf_counter() - start
+
+    # The hash chain (pHash + lookup) is the slowest path at 2 * STEP_DELAY;
+    # running the six steps one after another would take 6 * STEP_DELAY
+    assert elapsed < 3 * STEP_DELAY
+
+
+def test_results_feed_the_decision_engine(slow_services):
+    results = _run()
+
+    assert set(results) == {
+        "ai_detection", "exif_data", "hash_match",
+        "issue_match", "vision_analysis", "forensics_analysis"
+    }
+    assert results["exif_data"]["has_gps"] is True
+    assert results["exif_data"]["gps_city"] == "Jaipur"
+    assert results["exif_data"]["timestamp"] == "2024-01-01T10:00:00"
+    assert results["hash_match"]["hash_value"] == "99996666cc993366"
+    assert results["issue_match"] == {"is_match": True, "expected_type": "roads", "detected_type": "pothole"}
+
+    decision = decision_engine.make_decision(results)
+
+    assert decision["status"] == "accepted"
+
+
+def test_reverse_geocode_can_be_disabled(slow_services, monkeypatch):
+    async def fail_geocode(latitude, longitude):
+        raise AssertionError("reverse_geocode should not be called")
+
+    monkeypatch.setattr(exif_service, "reverse_geocode", fail_geocode)
+
+    results = _run(reverse_geocode=False)
+
+    assert results["exif_data"]["has_gps"] is True
+    assert results["exif_data"]["gps_address"] is None
+
+
+def test_failed_duplicate_lookup_keeps_hash(slow_services, monkeypatch):
+    async def broken_lookup(phash, threshold=None):
+        raise RuntimeError("mongo unavailable")
+
+    monkeypatch.setattr(hash_service, "find_similar_hashes", broken_lookup)
+
+    results = _run()
+
+    assert results["hash_match"]["is_duplicate"] is False
+    assert results["hash_match"]["hash_value"] == "99996666cc993366"
+    assert results["hash_match"]["error"] == "mongo unavailable"
+    assert results["ai_detection"]["ai_probability"] == 0.1
+
+
+def test_failed_steps_degrade_to_skipped_results(slow_services, monkeypatch):
+    async def broken_ai(image_path):
+        raise RuntimeError("sightengine down")
+
+    def broken_phash(image_path):
+        raise OSError("cannot decode")
+
+    def broken_vision(image_path, user_issue_type, additional_context=None):
+        raise RuntimeError("gemini down")
+
+    def broken_forensics(image_path, filename):
+        raise RuntimeError("forensics crashed")
+
+    monkeypatch.setattr(sightengine_service, "detect_ai_generated", broken_ai)
+    monkeypatch.setattr(hash_service, "generate_phash", broken_phash)
+    monkeypatch.setattr(vision_service, "analyze_image_content", broken_vision)
+    monkeypatch.setattr(validation_pipeline, "run_forensics", broken_forensics)
+
+    results = _run()
+
+    assert results["ai_detection"]["skipped"] is True
+    assert results["hash_match"]["hash_value"] is None
+    assert results["vision_analysis"]["skipped"] is True
+    assert results["issue_match"]["is_match"] is True
+    assert results["forensics_analysis"]["source_type"] == "UNKNOWN"
+    assert results["exif_data"]["has_gps"] is True
+
+    decision = decision_engine.make_decision(results)
+
+    assert decision["status"] == "accepted"
+
+
+def test_path_is_read_once_and_shared(slow_services, monkeypatch, tmp_path):
+    image_file = tmp_path / "photo.jpg"
+    image_file.write_bytes(b"\xff\xd8 image bytes")
+    seen = []
+
+    def record_phash(image_path):
+        seen.append(image_path)
+        return "99996666cc993366"
+
+    def record_forensics(image_path, filename):
+        seen.append(image_path)
+        return {"source_type": "UNKNOWN", "confidence_score": 0.0, "evidence": []}
+
+    monkeypatch.setattr(hash_service, "generate_phash", record_phash)
+    monkeypatch.setattr(validation_pipeline, "run_forensics", record_forensics)
+
+    _run(image_path=str(image_file))
+
+    assert len(seen) == 2
+    assert seen[0] is seen[1]
+    assert isinstance(seen[0], ImageContext)
+    assert seen[0].data == b"\xff\xd8 image bytes"
+
+
+@pytest.fixture
+def batch_pipeline(monkeypatch):
+    """Stub run_validation, recording concurrency; pHash is taken from the image bytes."""
+    state = {"active": 0, "peak": 0, "validated": []}
+
+    async def run_validation(image_path, filename, issue_type, image_phash=None, **kwargs):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        # Later photos finish first, to check the result order
+        await asyncio.sleep(0.05 * (10 - int(filename.split(".")[0])))
+        state["active"] -= 1
+        state["validated"].append(filename)
+        if filename.startswith("9"):
+            raise RuntimeError("pipeline crashed")
+        return {"filename": filename, "hash_value": image_phash}
+
+    monkeypatch.setattr(validation_pipeline, "run_validation", run_validation)
+    monkeypatch.setattr(hash_service, "generate_phash", lambda context: context.data.decode())
+    return state
+
+
+def _contexts(*phashes):
+    return [ImageContext(phash.encode(), filename=f"{i}.jpg") for i, phash in enumerate(phashes)]
+
+
+def test_batch_runs_photos_concurrently_in_order(batch_pipeline):
+    contexts = _contexts(*(format(i, "016x") for i in (0x0, 0xFF, 0xFF00, 0xFF0000, 0xFF000000)))
+
+    results = asyncio.run(validation_pipeline.run_batch_validation(contexts, "roads", concurrency=2))
+
+    assert [result["filename"] for result in results] == ["0.jpg", "1.jpg", "2.jpg", "3.jpg", "4.jpg"]
+    assert results[1]["hash_value"] == "00000000000000ff"
+    assert batch_pipeline["peak"] == 2
+
+
+def test_batch_duplicates_skip_validation(batch_pipeline):
+    contexts = _contexts("99996666cc993366", "0000000000000000", "99996666cc993367")
+
+    results = asyncio.run(validation_pipeline.run_batch_validation(contexts, "roads"))
+
+    assert results[2] == {"duplicate_of": 0, "hash_value": "99996666cc993367"}
+    assert sorted(batch_pipeline["validated"]) == ["0.jpg", "1.jpg"]
+
+
+def test_batch_failures_stay_with_their_photo(batch_pipeline):
+    contexts = [ImageContext(b"0000000000000000", filename="0.jpg"), ImageContext(b"ffffffffffffffff", filename="9.jpg")]
+
+    results = asyncio.run(validation_pipeline.run_batch_validation(contexts, "roads"))
+
+    assert results[0]["filename"] == "0.jpg"
+    assert isinstance(results[1], RuntimeError)
+
+
+def test_find_batch_duplicates():
+    duplicates = validation_pipeline.find_batch_duplicates(
+        ["0000000000000000", None, "0000000000000001", "ffffffffffffffff", "fffffffffffffff0"],
+        threshold=5
+    )
+
+    assert duplicates == {2: 0, 4: 3}
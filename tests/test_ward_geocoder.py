@@ -0,0 +1,128 @@
+"""
+Tests for the offline ward reverse geocoder.
+"""
+
+import asyncio
+import io
+import json
+import random
+
+import pytest
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+
+import server
+from services import ward_geocoder, validation_pipeline, exif_service
+from services.ward_geocoder import WardIndex
+
+
+def _square(min_lng, min_lat, size):
+    return [
+        [min_lng, min_lat], [min_lng + size, min_lat], [min_lng + size, min_lat + size],
+        [min_lng, min_lat + size], [min_lng, min_lat]
+    ]
+
+
+def _feature(geometry_type, coordinates, **properties):
+    return {"type": "Feature", "geometry": {"type": geometry_type, "coordinates": coordinates}, "properties": properties}
+
+
+WARDS = {
+    "type": "FeatureCollection",
+    "features": [
+        _feature("Polygon", [_square(75.80, 26.90, 0.02)], ward=1, locality="C-Scheme", city="Jaipur"),
+        _feature("Polygon", [_square(75.82, 26.90, 0.02)], ward=2, locality="Raja Park", city="Jaipur"),
+        # Ward 12 surrounds a hole that belongs to no ward
+        _feature("Polygon", [_square(75.70, 26.80, 0.10), _square(75.74, 26.84, 0.02)], ward=12, city="Jaipur"),
+        # Ward 20 is split in two parts; the second ring is left open
+        _feature("MultiPolygon", [[_square(75.60, 26.60, 0.01)], [_square(75.65, 26.60, 0.01)[:-1]]], ward=20),
+        # Skipped: no ward number
+        _feature("Polygon", [_square(0.0, 0.0, 1.0)], locality="Nowhere"),
+    ]
+}
+
+
+@pytest.fixture
+def ward_index():
+    return WardIndex.from_geojson(WARDS)
+
+
+def test_points_resolve_to_their_ward(ward_index):
+    assert ward_index.locate(26.91, 75.81) == {"ward": 1, "locality": "C-Scheme", "city": "Jaipur"}
+    assert ward_index.locate(26.91, 75.83) == {"ward": 2, "locality": "Raja Park", "city": "Jaipur"}
+    assert ward_index.locate(26.81, 75.71)["ward"] == 12
+    assert ward_index.locate(26.605, 75.605)["ward"] == 20
+    assert ward_index.locate(26.605, 75.655)["ward"] == 20
+    assert len(ward_index) == 4
+
+
+def test_points_outside_wards_and_in_holes_resolve_to_nothing(ward_index):
+    assert ward_index.locate(26.85, 75.75) is None  # hole in ward 12
+    assert ward_index.locate(26.605, 75.63) is None  # between the parts of ward 20
+    assert ward_index.locate(0.5, 0.5) is None  # feature without ward number
+    assert ward_index.locate(28.6, 77.2) is None
+
+
+def test_grid_lookup_matches_scanning_every_polygon(ward_index):
+    rng = random.Random(0)
+    for _ in range(2000):
+        latitude, longitude = rng.uniform(26.55, 26.95), rng.uniform(75.55, 75.85)
+        expected = next((area.properties["ward"] for area in ward_index.areas if area.contains(longitude, latitude)), None)
+        found = ward_index.locate(latitude, longitude)
+        assert (found["ward"] if found else None) == expected
+
+
+def test_boundaries_load_from_geojson_file(tmp_path, monkeypatch):
+    path = tmp_path / "wards.geojson"
+    path.write_text(json.dumps(WARDS))
+    monkeypatch.setattr(ward_geocoder, "WARD_BOUNDARIES_PATH", path)
+    monkeypatch.setattr(ward_geocoder, "WARD_INDEX", ward_geocoder.WARD_INDEX)
+
+    ward_geocoder.reload_ward_boundaries()
+
+    assert ward_geocoder.locate(26.91, 75.81)["ward"] == 1
+    assert ward_geocoder.locate(None, 75.81) is None
+
+
+def test_missing_boundaries_file_gives_empty_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(ward_geocoder, "WARD_BOUNDARIES_PATH", tmp_path / "missing.geojson")
+
+    assert len(ward_geocoder.load_ward_index()) == 0
+
+
+def test_exif_checks_report_the_photo_ward_without_geocoding(ward_index, monkeypatch):
+    monkeypatch.setattr(ward_geocoder, "WARD_INDEX", ward_index)
+    monkeypatch.setattr(exif_service, "extract_gps_coordinates", lambda path: (26.91, 75.81))
+    monkeypatch.setattr(exif_service, "extract_timestamp", lambda path: None)
+    monkeypatch.setattr(exif_service, "extract_camera_info", lambda path: {})
+
+    exif = asyncio.run(validation_pipeline._run_exif_checks("photo.jpg", 26.91, 75.81, reverse_geocode=False))
+
+    assert exif["gps_ward"] == 1
+    assert exif["gps_locality"] == "C-Scheme"
+    assert exif["gps_city"] == "Jaipur"
+    assert exif["gps_address"] is None
+
+
+def test_complaint_ward_falls_back_to_reported_location(ward_index, monkeypatch):
+    monkeypatch.setattr(ward_geocoder, "WARD_INDEX", ward_index)
+
+    # The photo has no GPS, so the reported location decides
+    assert asyncio.run(server._resolve_ward(b"\xff\xd8\xff no exif", 26.91, 75.83)) == 2
+    assert asyncio.run(server._resolve_ward(b"\xff\xd8\xff no exif", 28.6, 77.2)) is None
+
+
+def test_complaint_outside_known_wards_needs_a_ward(ward_index, monkeypatch, tmp_path):
+    monkeypatch.setattr(ward_geocoder, "WARD_INDEX", ward_index)
+    monkeypatch.setattr(server, "UPLOAD_DIR", tmp_path)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.create_complaint(
+            citizen_name="Asha", citizen_phone=None, category="roads", severity="High",
+            description="Pothole", ward=None, location="Somewhere", latitude=28.6, longitude=77.2,
+            image=UploadFile(file=io.BytesIO(b"\xff\xd8\xff photo bytes"), filename="photo.jpg"),
+            validation_record_id=None
+        ))
+
+    assert error.value.status_code == 400
+    assert not any(path.is_file() for path in tmp_path.rglob("*"))